@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify, request, send_file, redirect, url_for
 from services.triz.triz_service import (
     analyze_patent,
-    get_all_analyses,
+    list_analyses,
     get_analysis_by_id,
     update_analysis,
     delete_analysis,
@@ -11,7 +11,13 @@ from services.triz.triz_service import (
     get_triz_principles,
     get_engineering_parameters,
     get_triz_matrix,
-    get_all_patents,
+    find_matrix_cells,
+    get_principle_contradictions,
+    get_principle_pair_contradictions,
+    get_parameter_contradictions,
+    get_related_principles,
+    what_if_contradiction,
+    list_patents,
     upload_patent,
     get_patent_file,
     get_analyses_for_patent,
@@ -21,6 +27,8 @@ import os
 import sys
 import uuid
 from werkzeug.utils import secure_filename
+from services.triz.pagination import parse_fields, parse_page_size
+from api.static_responses import precompressed_response
 
 # Add parent directory to path to import automated_analysis
 sys.path.append(
@@ -40,15 +48,24 @@ def register_routes(app):
 
     @app.route("/api/patents", methods=["GET"])
     def get_patents():
-        """Get list of available patents with optional filtering"""
+        """Get a page of patents with optional filtering"""
         try:
             search_term = request.args.get("search", "")
             status_filter = request.args.getlist("status")
             sort_order = request.args.get("sort", "newest")
 
-            patents = get_all_patents(search_term, status_filter, sort_order)
-
-            return jsonify({"patents": patents, "count": len(patents)})
+            return jsonify(
+                list_patents(
+                    search_term,
+                    status_filter,
+                    sort_order,
+                    cursor=request.args.get("cursor"),
+                    limit=parse_page_size(request.args.get("limit")),
+                    fields=parse_fields(request.args.get("fields")),
+                )
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -193,10 +210,18 @@ def register_routes(app):
 
     @app.route("/api/analyses", methods=["GET"])
     def get_analyses_route():
-        """Get list of all analyses"""
+        """Get a page of analyses, newest first"""
         try:
-            analyses = get_all_analyses()
-            return jsonify(analyses)
+            return jsonify(
+                list_analyses(
+                    patent_id=request.args.get("patent_id"),
+                    cursor=request.args.get("cursor"),
+                    limit=parse_page_size(request.args.get("limit")),
+                    fields=parse_fields(request.args.get("fields")),
+                )
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -232,7 +257,7 @@ def register_routes(app):
                 return jsonify(
                     {"message": f"Analysis {analysis_id} deleted successfully"}
                 )
-            return jsonify({"error": "Failed to delete analysis"}), 500
+            return jsonify({"error": "Analysis not found"}), 404
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -251,8 +276,7 @@ def register_routes(app):
     def get_triz_principles_route():
         """Get all TRIZ principles"""
         try:
-            principles = get_triz_principles()
-            return jsonify(principles)
+            return precompressed_response("principles", get_triz_principles, request)
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -260,8 +284,7 @@ def register_routes(app):
     def get_engineering_parameters_route():
         """Get all engineering parameters"""
         try:
-            parameters = get_engineering_parameters()
-            return jsonify(parameters)
+            return precompressed_response("parameters", get_engineering_parameters, request)
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -269,7 +292,92 @@ def register_routes(app):
     def get_triz_matrix_route():
         """Get the TRIZ contradiction matrix"""
         try:
-            matrix = get_triz_matrix()
-            return jsonify(matrix)
+            return precompressed_response("matrix", get_triz_matrix, request)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+
+    @app.route("/api/triz/matrix/cells", methods=["GET"])
+    def find_matrix_cells_route():
+        """Get matrix cells that recommend all of the given principles"""
+        try:
+            principles = request.args.getlist("principle")
+            if not principles:
+                return jsonify({"error": "At least one principle is required"}), 400
+            cells = find_matrix_cells(principles)
+            return jsonify({"cells": cells, "count": len(cells)})
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/triz/index/principles/<principle_id>", methods=["GET"])
+    def get_principle_contradictions_route(principle_id):
+        """Get the contradictions a principle resolves"""
+        try:
+            cells = get_principle_contradictions(principle_id)
+            return jsonify({"cells": cells, "count": len(cells)})
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route(
+        "/api/triz/index/principle-pairs/<first_id>/<second_id>", methods=["GET"]
+    )
+    def get_principle_pair_contradictions_route(first_id, second_id):
+        """Get the contradictions where two principles are recommended together"""
+        try:
+            cells = get_principle_pair_contradictions(first_id, second_id)
+            return jsonify({"cells": cells, "count": len(cells)})
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/triz/index/parameters/<parameter_id>", methods=["GET"])
+    def get_parameter_contradictions_route(parameter_id):
+        """Get the matrix row and column of an engineering parameter"""
+        try:
+            return jsonify(get_parameter_contradictions(parameter_id))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/triz/principles/<principle_id>/related", methods=["GET"])
+    def get_related_principles_route(principle_id):
+        """Get the principles most often used together with a principle"""
+        try:
+            limit = int(request.args.get("limit", 10))
+            return jsonify(get_related_principles(principle_id, limit))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/triz/what-if", methods=["GET"])
+    def what_if_contradiction_route():
+        """Explore an engineering parameter's whole matrix row or column"""
+        try:
+            improving = request.args.get("improving")
+            worsening = request.args.get("worsening")
+            if bool(improving) == bool(worsening):
+                return jsonify(
+                    {"error": "Exactly one of improving or worsening is required"}
+                ), 400
+
+            limit = request.args.get("limit")
+            max_principles = request.args.get("max_principles")
+            result = what_if_contradiction(
+                improving or worsening,
+                role="improving" if improving else "worsening",
+                source=request.args.get("source", "reference"),
+                limit=int(limit) if limit else None,
+                max_principles=int(max_principles) if max_principles else None,
+            )
+            return jsonify(result)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -0,0 +1,103 @@
+"""
+Pre-encoded, precompressed responses for static reference data.
+
+The TRIZ principles, parameters and matrix never change while the process is
+running, so their JSON bodies are encoded once, hashed for an ETag and
+compressed with gzip and brotli. Requests then cost a dictionary lookup: a 304
+when the client already has the current ETag, otherwise the stored body in the
+best encoding the client accepts. Each encoding is a separate representation
+with its own strong ETag, the hash suffixed with the encoding.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # listed in requirements.txt; without it only gzip is served
+    brotli = None
+
+
+class PrecompressedBody:
+    """
+    A JSON body encoded once, with its ETag and compressed variants.
+
+    Args:
+        data: JSON-serializable data to encode
+    """
+
+    def __init__(self, data: Any):
+        self.body = json.dumps(data, sort_keys=True, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.encoded: Dict[str, bytes] = {
+            "gzip": gzip.compress(self.body, compresslevel=9, mtime=0)
+        }
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(self.body)
+
+    def _negotiate(self, request) -> str:
+        """Pick the smallest encoding the client accepts, "identity" if none"""
+        accepted = [
+            encoding
+            for encoding in self.encoded
+            if request.accept_encodings[encoding] > 0
+        ]
+        if not accepted:
+            return "identity"
+        return min(accepted, key=lambda encoding: len(self.encoded[encoding]))
+
+    def etag_for(self, encoding: str) -> str:
+        """ETag of the representation in the given content encoding"""
+        if encoding == "identity":
+            return self.etag
+        return f"{self.etag}-{encoding}"
+
+    def response(self, request) -> Response:
+        """Build the response for a request, honouring If-None-Match."""
+        encoding = self._negotiate(request)
+        etag = self.etag_for(encoding)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        elif encoding == "identity":
+            response = Response(self.body, mimetype="application/json")
+        else:
+            response = Response(self.encoded[encoding], mimetype="application/json")
+            response.headers["Content-Encoding"] = encoding
+
+        response.set_etag(etag)
+        # Clients may reuse their copy but must revalidate it with the ETag
+        response.headers["Cache-Control"] = "no-cache"
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+_BODIES: Dict[str, PrecompressedBody] = {}
+_lock = threading.Lock()
+
+
+def precompressed_response(name: str, load: Callable[[], Any], request) -> Response:
+    """
+    Serve static data from its precompressed body, building it on first use.
+
+    Args:
+        name: Cache key for the body
+        load: Function returning the data to encode
+        request: The current Flask request
+
+    Returns:
+        Flask response with ETag and content negotiation applied
+    """
+    body = _BODIES.get(name)
+    if body is None:
+        with _lock:
+            body = _BODIES.get(name)
+            if body is None:
+                body = _BODIES[name] = PrecompressedBody(load())
+    return body.response(request)
@@ -5,6 +5,7 @@ from services.triz.triz_constants import (
     ENGINEERING_PARAMETERS,
     CONTRADICTION_MATRIX,
 )
+from services.triz.triz_binary import BINARY_FILENAME, write_triz_binary
 
 # Define directories for data
 TRIZ_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "triz")
@@ -151,12 +152,23 @@ def create_triz_data_files():
     first_row = next(iter(numeric_matrix.values()), {})
     print("Matrix columns (from first row):", list(first_row.keys()))
 
+    # Create compact binary file for memory-mapped loading
+    print("\nCreating binary data file...")
+    binary_file = write_triz_binary(
+        os.path.join(TRIZ_DATA_DIR, BINARY_FILENAME),
+        TRIZ_PRINCIPLES,
+        parameters,
+        numeric_matrix,
+    )
+    print(f"Created binary data file: {binary_file}")
+
     # Check if files were actually created
     print("\nVerifying file creation:")
     for path, label in [
         (principles_file, "Principles file"),
         (params_file, "Parameters file"),
         (matrix_file, "Matrix file"),
+        (binary_file, "Binary data file"),
     ]:
         if os.path.exists(path):
             size = os.path.getsize(path)
@@ -168,6 +180,7 @@ def create_triz_data_files():
         "principles": principles_file,
         "parameters": params_file,
         "matrix": matrix_file,
+        "binary": binary_file,
     }
 
 
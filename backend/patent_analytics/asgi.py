@@ -3,6 +3,10 @@ ASGI config for patent_analytics project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server, e.g. ``uvicorn patent_analytics.asgi:application``,
+so the async analyze views in patent_api.async_views run on the event loop
+instead of tying up a worker thread per request.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -78,13 +80,54 @@ WSGI_APPLICATION = "patent_analytics.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# DJANGO_DATABASE_PROFILE selects how SQLite is tuned:
+#   "default"     rollback journal, new connection per request
+#   "concurrent"  WAL journaling, synchronous=NORMAL, a 64 MiB page cache and
+#                 persistent connections, for several workers sharing the file
+# DJANGO_DB_BUSY_TIMEOUT (seconds a connection waits for a lock) and
+# DJANGO_CONN_MAX_AGE override the profile.
+DATABASE_PROFILE = os.environ.get('DJANGO_DATABASE_PROFILE', 'default')
+
+DATABASE_PROFILES = {
+    'default': {
+        'busy_timeout': 5,
+        'conn_max_age': 0,
+        'pragmas': {},
+    },
+    'concurrent': {
+        'busy_timeout': 30,
+        'conn_max_age': 600,
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,
+            'temp_store': 'MEMORY',
+            'mmap_size': 268435456,
+        },
+    },
+}
+
+if DATABASE_PROFILE not in DATABASE_PROFILES:
+    raise ImproperlyConfigured(
+        f"DJANGO_DATABASE_PROFILE must be one of: {', '.join(DATABASE_PROFILES)}"
+    )
+_profile = DATABASE_PROFILES[DATABASE_PROFILE]
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "timeout": float(os.environ.get('DJANGO_DB_BUSY_TIMEOUT', _profile['busy_timeout'])),
+        },
+        "CONN_MAX_AGE": int(os.environ.get('DJANGO_CONN_MAX_AGE', _profile['conn_max_age'])),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Applied to every new connection by patent_api.db.configure_connection
+SQLITE_PRAGMAS = _profile['pragmas']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -141,9 +184,43 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'patent_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'patent_api.renderers.ORJSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'patent_api.pagination.ApiCursorPagination',
+    'PAGE_SIZE': 50,
 }
+
+# Largest ?page_size= a client may request from paginated endpoints
+API_MAX_PAGE_SIZE = 200
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# Holds rendered TRIZ reference responses and the matrix snapshot version.
+# The local-memory cache is private to each process, so deployments running
+# several workers set DJANGO_CACHE_DIR to share a file-based cache and have
+# invalidations reach every worker.
+if os.environ.get('DJANGO_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['DJANGO_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'patent-analytics',
+        }
+    }
+
+# Seconds superseded reference responses may linger in the cache
+REFERENCE_CACHE_TIMEOUT = 24 * 60 * 60
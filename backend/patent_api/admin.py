@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import TrizPrinciple, EngineeringParameter, ContradictionMatrix, Patent, PatentAnalysis, PatentCitation
+from django.db.models import Q
+from .models import TrizPrinciple, EngineeringParameter, ContradictionMatrix, Patent, PatentAnalysis, PatentCitation, PatentSearchEntry
+from .search import fts_available, match_expression
 
 @admin.register(TrizPrinciple)
 class TrizPrincipleAdmin(admin.ModelAdmin):
@@ -26,6 +28,19 @@ class PatentAdmin(admin.ModelAdmin):
     list_filter = ('filing_date', 'publication_date')
     date_hierarchy = 'publication_date'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the FTS5 index instead of LIKE '%term%' scans of every column.
+        # Patent numbers are not in the index, so they are matched by prefix.
+        search_term = search_term.strip()
+        if search_term and fts_available():
+            condition = Q(patent_number__istartswith=search_term)
+            expression = match_expression(search_term)
+            if expression is not None:
+                matches = PatentSearchEntry.objects.filter(document__match=expression)
+                condition |= Q(pk__in=matches.values('patent'))
+            return queryset.filter(condition), False
+        return super().get_search_results(request, queryset, search_term)
+
 @admin.register(PatentAnalysis)
 class PatentAnalysisAdmin(admin.ModelAdmin):
     list_display = ('patent', 'analysis_date')
@@ -0,0 +1,88 @@
+"""
+Patent analysis backend used by the analyze endpoints.
+
+``analyze_document`` is a coroutine so the views can await the analysis
+without holding a worker thread. The current backend is a mock that returns
+random contradictions; an LLM-backed one awaits its client inside
+``analyze_document``.
+"""
+
+import random
+from datetime import datetime
+
+IMPROVING_PARAMETERS = ["Speed", "Reliability", "Accuracy", "Strength", "Power"]
+WORSENING_PARAMETERS = ["Weight", "Complexity", "Cost", "Size", "Energy consumption"]
+PRINCIPLES = [
+    "Segmentation", "Asymmetry", "Merging", "Nested doll",
+    "Feedback", "Intermediary", "Dynamicity", "Mechanical vibration",
+    "Preliminary action", "Composite materials", "Counterweight"
+]
+
+
+def mock_cdn_url(filename):
+    """Generate a mock CDN URL for testing"""
+    timestamp = int(datetime.now().timestamp())
+    return f"https://mock-cdn.example.com/patents/{timestamp}-{filename}"
+
+
+def mock_contradictions():
+    """1-3 random contradictions, each with 1-4 suggested principles"""
+    contradictions = []
+    num_contradictions = random.randint(1, 3)
+
+    for _ in range(num_contradictions):
+        improving = random.choice(IMPROVING_PARAMETERS)
+        worsening = random.choice(WORSENING_PARAMETERS)
+
+        # Make sure they're different
+        while improving == worsening:
+            worsening = random.choice(WORSENING_PARAMETERS)
+
+        # Select 1-4 random principles
+        num_principles = random.randint(1, 4)
+        selected_principles = random.sample(PRINCIPLES, num_principles)
+
+        contradictions.append({
+            "contradiction": {
+                "improving_parameter": improving,
+                "worsening_parameter": worsening
+            },
+            "suggested_principles": selected_principles
+        })
+    return contradictions
+
+
+async def analyze_document(file_url, patent=None):
+    """
+    Analyze a patent PDF and extract TRIZ contradictions.
+
+    Args:
+        file_url: URL of the patent PDF
+        patent: The stored Patent being analyzed, if any; its bibliographic
+            data is returned as the metadata
+
+    Returns:
+        Dict with the file URL, the contradictions and the patent metadata
+    """
+    if patent is not None:
+        metadata = {
+            "title": patent.title,
+            "abstract": patent.abstract,
+            "inventors": patent.inventors,
+            "assignee": patent.assignee,
+            "patent_number": patent.patent_number,
+        }
+    else:
+        metadata = {
+            "title": f"Patent {datetime.now().strftime('%Y%m%d%H%M%S')}",
+            "abstract": "This patent describes an innovative solution using TRIZ principles.",
+            "inventors": "John Smith, Jane Doe",
+            "assignee": "Tech Innovations Inc.",
+            "patent_number": f"US{random.randint(10000000, 99999999)}"
+        }
+
+    return {
+        "fileUrl": file_url,
+        "contradictions": mock_contradictions(),
+        "metadata": metadata,
+    }
@@ -0,0 +1,66 @@
+"""
+Async views for the endpoints that wait on I/O.
+
+Under an ASGI server (see patent_analytics/asgi.py) each request is a
+coroutine on the worker's event loop, so while an analysis waits on its
+backend the worker keeps serving other requests, and one worker can hold
+hundreds of analyses in flight. Database access goes through the async ORM.
+Under WSGI these views still work; Django runs each one on its own event loop.
+
+DRF 3.14 viewsets are synchronous, so these are plain Django views that accept
+the same JSON and multipart bodies and return the same payloads and
+``{"error": ...}`` responses as the DRF API.
+"""
+
+import orjson
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .analysis import analyze_document, mock_cdn_url
+from .models import Patent
+
+
+def _error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+@csrf_exempt
+@require_POST
+async def analyze_patent(request):
+    """
+    Analyze a patent PDF and extract TRIZ contradictions.
+
+    Accepts a JSON or form body with one of ``file_url``, ``patent`` (the id
+    of a stored patent, whose PDF and metadata are used) or a ``file`` upload.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = orjson.loads(request.body or b'{}')
+        except orjson.JSONDecodeError as e:
+            return _error(f"JSON parse error - {e}", 400)
+        if not isinstance(data, dict):
+            return _error("Expected a JSON object", 400)
+    else:
+        data = request.POST
+
+    patent = None
+    file_url = data.get('file_url')
+    patent_id = data.get('patent')
+    if not file_url and patent_id:
+        try:
+            patent = await Patent.objects.filter(pk=int(patent_id)).afirst()
+        except (TypeError, ValueError):
+            return _error("patent must be a number", 400)
+        if patent is None:
+            return _error("Patent not found", 404)
+        file_url = patent.pdf_file
+
+    # Or if we have a direct file upload
+    if not file_url and 'file' in request.FILES:
+        file_url = mock_cdn_url(request.FILES['file'].name)
+
+    if not file_url:
+        return _error("No file or file URL provided", 400)
+
+    return JsonResponse(await analyze_document(file_url, patent))
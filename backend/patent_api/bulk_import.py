@@ -0,0 +1,162 @@
+"""
+Bulk patent import with upsert on ``patent_number``.
+
+Rows arrive as NDJSON (one object per line, read from the request stream as
+the import proceeds) or as a JSON array. They are validated and written in
+batches: each batch is checked field by field with ``PatentImportSerializer``
+without touching the database, then written with a single ``bulk_create``
+whose ``ON CONFLICT (patent_number) DO UPDATE`` clause updates the patents that
+already exist. Progress is reported as one NDJSON line per batch, with the
+errors of the rows that were rejected, followed by a summary line. Each batch
+is written in its own transaction: when a batch fails with a database error its
+progress line carries the error instead and the import goes on with the next
+batch, since the response has already started streaming.
+
+Batches are written through the serialized write queue (see patent_api.db).
+``bulk_create`` skips model signals; the FTS5 index is kept in sync by its
+database triggers.
+"""
+
+import orjson
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from .db import serialized_write
+from .models import Patent
+from .serializers import PatentSerializer
+
+IMPORT_BATCH_SIZE = 1000
+MAX_IMPORT_BATCH_SIZE = 5000
+
+# Everything but the key and the original upload date is overwritten on update
+UPDATE_FIELDS = [
+    'title', 'abstract', 'filing_date', 'publication_date', 'inventors',
+    'assignee', 'pdf_file', 'pdf_file_name',
+]
+
+
+class PatentImportSerializer(PatentSerializer):
+    """
+    PatentSerializer without the uniqueness check on ``patent_number``, which
+    would cost a query per row and reject the rows meant as updates.
+    """
+
+    class Meta(PatentSerializer.Meta):
+        extra_kwargs = {'patent_number': {'validators': []}}
+
+
+def read_ndjson(stream):
+    """
+    Yield ``(row number, record)`` for each non-blank line of an NDJSON stream.
+    Lines that are not valid JSON yield a ``ValidationError`` as the record.
+    """
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield number, serializers.ValidationError({'non_field_errors': [f'Invalid JSON: {e}']})
+
+
+def read_json_array(records):
+    """Yield ``(row number, record)`` for each element of a parsed JSON array"""
+    return enumerate(records, start=1)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate(serializer, number, record):
+    """The validated fields of one row, or a per-row error entry"""
+    if isinstance(record, serializers.ValidationError):
+        return None, {'row': number, 'errors': record.detail}
+    if not isinstance(record, dict):
+        return None, {'row': number, 'errors': {'non_field_errors': ['Expected a JSON object']}}
+    try:
+        return serializer.run_validation(record), None
+    except serializers.ValidationError as e:
+        return None, {
+            'row': number,
+            'patent_number': record.get('patent_number'),
+            'errors': e.detail,
+        }
+
+
+def import_batch(rows):
+    """
+    Validate and upsert one batch of ``(row number, record)`` pairs.
+
+    When a batch holds several rows with the same patent number, the last one
+    is written.
+
+    Returns:
+        Dict with the batch's ``rows``, ``created``, ``updated`` and ``failed``
+        counts and the per-row ``errors``
+    """
+    serializer = PatentImportSerializer()
+    patents = {}
+    errors = []
+    for number, record in rows:
+        validated, error = _validate(serializer, number, record)
+        if error is not None:
+            errors.append(error)
+        else:
+            patents[validated['patent_number']] = Patent(**validated)
+
+    with serialized_write(), transaction.atomic():
+        existing = set(
+            Patent.objects.filter(patent_number__in=list(patents)).values_list(
+                'patent_number', flat=True
+            )
+        )
+        Patent.objects.bulk_create(
+            patents.values(),
+            update_conflicts=True,
+            unique_fields=['patent_number'],
+            update_fields=UPDATE_FIELDS,
+        )
+
+    return {
+        'rows': len(rows),
+        'created': len(patents) - len(existing),
+        'updated': len(existing),
+        'failed': len(errors),
+        'errors': errors,
+    }
+
+
+def import_patents(rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import ``(row number, record)`` pairs batch by batch.
+
+    Yields:
+        One NDJSON progress line per batch, then a summary line with
+        ``"done": true`` and the totals. A batch whose write failed counts
+        all of its rows as failed and reports the database ``error``.
+    """
+    totals = {'rows': 0, 'created': 0, 'updated': 0, 'failed': 0}
+    for index, batch in enumerate(_batches(rows, batch_size), start=1):
+        try:
+            progress = import_batch(batch)
+        except DatabaseError as e:
+            progress = {
+                'rows': len(batch),
+                'created': 0,
+                'updated': 0,
+                'failed': len(batch),
+                'errors': [],
+                'error': f'Database error: {e}',
+            }
+        for key in totals:
+            totals[key] += progress[key]
+        yield orjson.dumps({'batch': index, **progress}) + b'\n'
+    yield orjson.dumps({'done': True, **totals}) + b'\n'
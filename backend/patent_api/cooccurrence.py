@@ -0,0 +1,106 @@
+"""
+Per-process principle co-occurrence model for the Django API.
+
+The model starts from the matrix snapshot and adds the principles recorded on
+each ``PatentAnalysis`` and the contradictions in the ``extracted_data`` of the
+mock PATENT_ANALYSES. Analysis signals apply incremental updates for a single
+analysis; a version counter in Django's cache tells other workers, or this one
+after missing an update, to rebuild from the database. The Flask service keeps
+its own model over its own analyses (services.triz.triz_service).
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from data.mock_data import PATENT_ANALYSES
+from services.triz.cooccurrence import PrincipleCooccurrence, analysis_principle_sets
+from .matrix_snapshot import get_matrix_snapshot
+from .models import PatentAnalysis
+
+VERSION_CACHE_KEY = 'patent_api:cooccurrence_version'
+
+_model = None
+_matrix_version = None
+_analyses_version = None
+_lock = threading.RLock()
+
+
+def _analysis_principles(analysis_ids=None):
+    """Principle numbers per analysis id"""
+    rows = PatentAnalysis.applied_principles.through.objects.values_list(
+        'patentanalysis_id', 'trizprinciple__number'
+    )
+    if analysis_ids is not None:
+        rows = rows.filter(patentanalysis_id__in=analysis_ids)
+
+    principles = {}
+    for analysis_id, number in rows:
+        principles.setdefault(analysis_id, []).append(number)
+    return principles
+
+
+def get_principle_cooccurrence():
+    """
+    Get the co-occurrence model, rebuilding it if the matrix or the analyses
+    changed in a way this worker has not applied.
+    """
+    global _model, _matrix_version, _analyses_version
+    snapshot = get_matrix_snapshot()
+    version = cache.get_or_set(VERSION_CACHE_KEY, time.time_ns, timeout=None)
+
+    with _lock:
+        if (
+            _model is None
+            or _matrix_version != snapshot.version
+            or _analyses_version != version
+        ):
+            model = PrincipleCooccurrence.from_matrix(snapshot.engine)
+            for analysis_id, numbers in _analysis_principles().items():
+                model.update(analysis_id, [numbers])
+            # Their ids are strings, so they never clash with PatentAnalysis pks
+            for analysis in PATENT_ANALYSES:
+                model.update(
+                    analysis['id'], analysis_principle_sets(analysis['extracted_data'])
+                )
+            _model, _matrix_version, _analyses_version = model, snapshot.version, version
+        return _model
+
+
+def _refresh_analysis(analysis_id):
+    global _model, _analyses_version
+    numbers = _analysis_principles([analysis_id]).get(analysis_id)
+
+    with _lock:
+        try:
+            version = cache.incr(VERSION_CACHE_KEY)
+            # Some backends implement incr() as a set with the default timeout
+            cache.touch(VERSION_CACHE_KEY, None)
+        except ValueError:
+            version = None
+
+        if _model is not None and version is not None and version == _analyses_version + 1:
+            _model.update(analysis_id, [numbers] if numbers else [])
+            _analyses_version = version
+        else:
+            # Another worker changed analyses too, rebuild on next access
+            _model = None
+
+
+def _invalidate():
+    global _model
+    with _lock:
+        cache.set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        _model = None
+
+
+def refresh_analysis_cooccurrence(analysis_id):
+    """Re-apply one analysis' principles once the current transaction commits"""
+    transaction.on_commit(lambda: _refresh_analysis(analysis_id))
+
+
+def invalidate_principle_cooccurrence():
+    """Force a full rebuild once the current transaction commits"""
+    transaction.on_commit(_invalidate)
@@ -0,0 +1,118 @@
+"""
+SQLite tuning for concurrent workers and a serialized write queue.
+
+``configure_connection`` runs on every new database connection and applies
+the ``SQLITE_PRAGMAS`` of the selected ``DATABASE_PROFILE``. The "concurrent"
+profile enables WAL journaling, so readers never block the writer and the
+writer never blocks readers, with ``synchronous=NORMAL`` and a larger page
+cache.
+
+SQLite still allows one writer at a time. A transaction that reads first and
+writes later fails with "database is locked" straight away when another
+connection wrote in between, without waiting out the busy timeout. Bulk write
+paths therefore run inside ``serialized_write()``. It admits writers one at a
+time and in arrival order: a FIFO queue across the threads of a process, and
+an ``fcntl`` lock file next to the database across processes.
+"""
+
+import contextlib
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+try:
+    import fcntl
+except ImportError:  # Windows; writers are then only serialized per process
+    fcntl = None
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver applying the profile's SQLite PRAGMAs"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+class WriteQueue:
+    """
+    Admits one writer at a time, first come first served.
+
+    Args:
+        lock_path: File locked while a writer is admitted, shared by every
+            process using the same database; None to serialize only within
+            this process
+    """
+
+    def __init__(self, lock_path=None):
+        self.lock_path = lock_path
+        self._condition = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if self.lock_path is None or fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Wait for this writer's turn and hold it for the block"""
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while self._serving != ticket:
+                self._condition.wait()
+        try:
+            with self._file_lock():
+                yield
+        finally:
+            with self._condition:
+                self._serving += 1
+                self._condition.notify_all()
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def _lock_path(alias):
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return None
+    name = str(connection.settings_dict['NAME'])
+    if connection.is_in_memory_db():
+        return None
+    return f'{name}.write-lock'
+
+
+def get_write_queue(alias='default'):
+    """The process-wide write queue of a database"""
+    with _queues_lock:
+        queue = _queues.get(alias)
+        if queue is None:
+            queue = _queues[alias] = WriteQueue(_lock_path(alias))
+        return queue
+
+
+def serialized_write(alias='default'):
+    """
+    Context manager running a block of writes as the database's only writer.
+    Open the transaction inside it, so the wait happens before any read.
+
+        with serialized_write(), transaction.atomic():
+            ...
+    """
+    return get_write_queue(alias).slot()
@@ -0,0 +1,106 @@
+"""
+Streaming NDJSON and CSV exports of patents and analyses.
+
+Rows are read with ``QuerySet.iterator(chunk_size=EXPORT_CHUNK_SIZE)`` and
+encoded one at a time into a ``StreamingHttpResponse``, so an export holds at
+most one chunk of rows in memory however large the table is. Patents are read
+as plain value tuples; analyses load their parameters with a join and their
+applied principles with one prefetch query per chunk.
+"""
+
+import csv
+
+import orjson
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+PATENT_EXPORT_COLUMNS = [
+    'id', 'patent_number', 'title', 'abstract', 'filing_date',
+    'publication_date', 'inventors', 'assignee', 'pdf_file', 'pdf_file_name',
+    'upload_date',
+]
+
+ANALYSIS_EXPORT_COLUMNS = [
+    'id', 'patent_id', 'patent_number', 'improving_parameter',
+    'worsening_parameter', 'applied_principles', 'analysis_date', 'notes',
+]
+
+
+class _Echo:
+    """File-like object whose write returns the text, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def patent_rows(queryset):
+    """Patent rows as tuples in PATENT_EXPORT_COLUMNS order"""
+    return queryset.values_list(*PATENT_EXPORT_COLUMNS).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+
+def analysis_rows(queryset):
+    """
+    Analysis rows as tuples in ANALYSIS_EXPORT_COLUMNS order, with parameters
+    and principles given by their TRIZ numbers.
+    """
+    queryset = queryset.select_related(
+        'patent', 'improving_parameter', 'worsening_parameter'
+    ).prefetch_related('applied_principles')
+    for analysis in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield (
+            analysis.id,
+            analysis.patent_id,
+            analysis.patent.patent_number,
+            analysis.improving_parameter.number,
+            analysis.worsening_parameter.number,
+            sorted(principle.number for principle in analysis.applied_principles.all()),
+            analysis.analysis_date,
+            analysis.notes,
+        )
+
+
+def _ndjson(columns, rows):
+    for row in rows:
+        yield orjson.dumps(dict(zip(columns, row))) + b'\n'
+
+
+def _csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(
+            ';'.join(map(str, value)) if isinstance(value, list) else value
+            for value in row
+        )
+
+
+def export_response(columns, rows, file_format, filename):
+    """
+    Stream rows as an attachment in the requested format.
+
+    Args:
+        columns: Column names, in row order
+        rows: Iterable of row tuples, consumed while the response is sent
+        file_format: "ndjson" or "csv"
+        filename: Attachment name without extension
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"file_format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    encode = _ndjson if file_format == 'ndjson' else _csv
+    response = StreamingHttpResponse(
+        encode(columns, rows), content_type=EXPORT_FORMATS[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
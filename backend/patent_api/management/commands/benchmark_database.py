@@ -0,0 +1,184 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.utils import ConnectionHandler
+from django.test import override_settings
+
+from patent_api.db import WriteQueue
+
+
+def run_mixed_workload(profile, directory, readers=8, writers=4, duration=2.0, rows_per_write=50):
+    """
+    Run readers and queued writers against a fresh file database tuned by a
+    DATABASE_PROFILES entry.
+
+    Each writer reads and then inserts ``rows_per_write`` rows in one
+    transaction, the pattern that fails with "database is locked" when writers
+    are not serialized. Readers count and fetch the newest rows.
+
+    Returns:
+        Dict with the ``reads`` and ``writes`` completed, the ``rows`` in the
+        table afterwards, their rates per second, the median and 95th
+        percentile write latency in ms (queue wait included), the SQLite
+        ``journal_mode`` and the ``errors`` raised by any worker
+    """
+    config = settings.DATABASE_PROFILES[profile]
+    path = os.path.join(directory, f'{profile}.sqlite3')
+    with override_settings(SQLITE_PRAGMAS=config['pragmas']):
+        databases = ConnectionHandler({
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': path,
+                'OPTIONS': {'timeout': config['busy_timeout']},
+            }
+        })
+        queue = WriteQueue(f'{path}.write-lock')
+        with databases['default'].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute(
+                'CREATE TABLE item (id INTEGER PRIMARY KEY, worker INTEGER, value TEXT)'
+            )
+        databases['default'].close()
+
+        counts = {'reads': 0, 'writes': 0}
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        started = time.perf_counter()
+        deadline = started + duration
+
+        def reader():
+            reads = 0
+            try:
+                with databases['default'].cursor() as cursor:
+                    while time.perf_counter() < deadline:
+                        cursor.execute('SELECT COUNT(*), MAX(id) FROM item')
+                        cursor.fetchone()
+                        cursor.execute('SELECT value FROM item ORDER BY id DESC LIMIT 20')
+                        cursor.fetchall()
+                        reads += 1
+            except Exception as e:
+                errors.append(e)
+            finally:
+                databases['default'].close()
+            with lock:
+                counts['reads'] += reads
+
+        def writer(worker):
+            timings = []
+            try:
+                with databases['default'].cursor() as cursor:
+                    while time.perf_counter() < deadline:
+                        write_started = time.perf_counter()
+                        with queue.slot():
+                            cursor.execute('BEGIN')
+                            cursor.execute('SELECT COUNT(*) FROM item')
+                            cursor.fetchone()
+                            cursor.executemany(
+                                'INSERT INTO item (worker, value) VALUES (%s, %s)',
+                                [(worker, f'row {n}') for n in range(rows_per_write)],
+                            )
+                            cursor.execute('COMMIT')
+                        timings.append((time.perf_counter() - write_started) * 1000)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                databases['default'].close()
+            with lock:
+                counts['writes'] += len(timings)
+                latencies.extend(timings)
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with databases['default'].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM item')
+            rows = cursor.fetchone()[0]
+        databases['default'].close()
+
+    latencies.sort()
+    return {
+        'journal_mode': journal_mode,
+        'reads': counts['reads'],
+        'writes': counts['writes'],
+        'rows': rows,
+        'reads_per_second': counts['reads'] / elapsed,
+        'writes_per_second': counts['writes'] / elapsed,
+        'write_p50_ms': statistics.median(latencies) if latencies else None,
+        'write_p95_ms': latencies[int(len(latencies) * 0.95)] if latencies else None,
+        'errors': errors,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the same mixed read/write workload against a temporary SQLite "
+        "file with each database profile and report throughput and write "
+        "latency. The project database is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile',
+            action='append',
+            choices=list(settings.DATABASE_PROFILES),
+            help="Profile to run; repeat for several (default: all)",
+        )
+        parser.add_argument('--readers', type=int, default=8, help="Reader threads")
+        parser.add_argument('--writers', type=int, default=4, help="Writer threads")
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help="Seconds each profile runs",
+        )
+        parser.add_argument(
+            '--rows-per-write',
+            type=int,
+            default=50,
+            help="Rows inserted by each write transaction",
+        )
+
+    def handle(self, *args, **options):
+        profiles = options['profile'] or list(settings.DATABASE_PROFILES)
+        self.stdout.write(
+            f"{'Profile':<12} {'Journal':>8} {'Reads/s':>10} {'Writes/s':>10} "
+            f"{'Rows/s':>10} {'p50 write':>11} {'p95 write':>11} {'Errors':>7}"
+        )
+        failed = False
+        for profile in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                result = run_mixed_workload(
+                    profile,
+                    directory,
+                    readers=options['readers'],
+                    writers=options['writers'],
+                    duration=options['duration'],
+                    rows_per_write=options['rows_per_write'],
+                )
+            failed = failed or bool(result['errors'])
+            p50, p95 = (
+                f"{result[key]:.1f} ms" if result[key] is not None else "-"
+                for key in ('write_p50_ms', 'write_p95_ms')
+            )
+            self.stdout.write(
+                f"{profile:<12} {result['journal_mode']:>8} "
+                f"{result['reads_per_second']:>10.0f} {result['writes_per_second']:>10.1f} "
+                f"{result['writes_per_second'] * options['rows_per_write']:>10.0f} "
+                f"{p50:>11} {p95:>11} {len(result['errors']):>7}"
+            )
+            for error in result['errors'][:3]:
+                self.stderr.write(f"  {profile}: {error}")
+        if failed:
+            raise CommandError("Some workers failed")
@@ -0,0 +1,196 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from patent_api.models import EngineeringParameter, Patent, PatentAnalysis
+
+BATCH_SIZE = 10000
+
+ASSIGNEES = [f"Assignee {n}" for n in range(5000)]
+START_DATE = date(1990, 1, 1)
+DATE_RANGE_DAYS = 35 * 365
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate synthetic patents and analyses, then time the admin and API "
+        "query patterns with and without the Patent/PatentAnalysis indexes. "
+        "Everything runs in one transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--patents',
+            type=int,
+            default=1_000_000,
+            help="Number of synthetic patents to create",
+        )
+        parser.add_argument(
+            '--analyses-per-patent',
+            type=float,
+            default=0.2,
+            help="Average number of synthetic analyses per patent",
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help="Times each query is run; the median is reported",
+        )
+        parser.add_argument('--seed', type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            patent_ids = self._populate(
+                rng, options['patents'], options['analyses_per_patent']
+            )
+            self._execute('ANALYZE')
+
+            queries = self._queries(rng, rng.choice(patent_ids))
+            indexes = [
+                (model, index)
+                for model in (Patent, PatentAnalysis)
+                for index in model._meta.indexes
+            ]
+            schema_editor = connection.schema_editor()
+
+            for model, index in indexes:
+                self._execute(index.remove_sql(model, schema_editor))
+            self._execute('ANALYZE')
+            before = self._time_queries(queries, options['repeat'])
+
+            for model, index in indexes:
+                self._execute(index.create_sql(model, schema_editor))
+            self._execute('ANALYZE')
+            after = self._time_queries(queries, options['repeat'])
+
+            # Discard the synthetic rows; the real indexes were never dropped
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"\n{'Query':<42} {'No indexes':>12} {'Indexes':>12} {'Speedup':>9}"
+        )
+        for label in queries:
+            speedup = before[label] / after[label] if after[label] else float('inf')
+            self.stdout.write(
+                f"{label:<42} {before[label]:>9.2f} ms {after[label]:>9.2f} ms "
+                f"{speedup:>8.1f}x"
+            )
+
+    def _populate(self, rng, patent_count, analyses_per_patent):
+        started = time.perf_counter()
+        existing = Patent.objects.count()
+        for start in range(0, patent_count, BATCH_SIZE):
+            Patent.objects.bulk_create(
+                [
+                    self._patent(rng, existing + n)
+                    for n in range(start, min(start + BATCH_SIZE, patent_count))
+                ],
+                batch_size=BATCH_SIZE,
+            )
+        # upload_date is auto_now_add, so spread the dates out afterwards
+        self._execute(
+            "UPDATE patent_api_patent SET upload_date = "
+            + self._random_timestamp_sql()
+            + " WHERE patent_number LIKE 'BENCH%%'"
+        )
+        self._report(f"Created {patent_count} patents", started)
+
+        started = time.perf_counter()
+        parameters = list(EngineeringParameter.objects.values_list('id', flat=True)[:2])
+        while len(parameters) < 2:
+            parameters.append(
+                EngineeringParameter.objects.create(
+                    number=-len(parameters) - 1, name='Benchmark', description=''
+                ).id
+            )
+        patent_ids = list(Patent.objects.values_list('id', flat=True))
+        analysis_count = int(patent_count * analyses_per_patent)
+        for start in range(0, analysis_count, BATCH_SIZE):
+            PatentAnalysis.objects.bulk_create(
+                [
+                    PatentAnalysis(
+                        patent_id=rng.choice(patent_ids),
+                        improving_parameter_id=parameters[0],
+                        worsening_parameter_id=parameters[1],
+                    )
+                    for _ in range(start, min(start + BATCH_SIZE, analysis_count))
+                ],
+                batch_size=BATCH_SIZE,
+            )
+        self._execute(
+            "UPDATE patent_api_patentanalysis SET analysis_date = "
+            + self._random_timestamp_sql()
+        )
+        self._report(f"Created {analysis_count} analyses", started)
+        return patent_ids
+
+    def _patent(self, rng, n):
+        filing_date = START_DATE + timedelta(days=rng.randrange(DATE_RANGE_DAYS))
+        return Patent(
+            patent_number=f"BENCH{n:09d}",
+            title=f"Synthetic patent {n}",
+            abstract="",
+            filing_date=filing_date,
+            publication_date=filing_date + timedelta(days=rng.randrange(365, 1500)),
+            inventors="Benchmark Inventor",
+            assignee=rng.choice(ASSIGNEES),
+        )
+
+    def _random_timestamp_sql(self):
+        """A per-row random timestamp within the last ten years"""
+        if connection.vendor == 'sqlite':
+            return "datetime('now', '-' || (abs(random()) % 315360000) || ' seconds')"
+        return "now() - random() * interval '10 years'"
+
+    def _queries(self, rng, patent_id):
+        """Label -> callable running one query shaped like a real access path"""
+        assignee = rng.choice(ASSIGNEES)
+        day = START_DATE + timedelta(days=rng.randrange(DATE_RANGE_DAYS))
+        month = day.replace(day=1)
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        return {
+            "Filed on one day (admin list_filter)": lambda: list(
+                Patent.objects.filter(filing_date=day)
+            ),
+            "Published in one month (date_hierarchy)": lambda: list(
+                Patent.objects.filter(
+                    publication_date__gte=month, publication_date__lt=next_month
+                ).order_by('-publication_date')[:100]
+            ),
+            "Patents of one assignee": lambda: list(
+                Patent.objects.filter(assignee=assignee)[:100]
+            ),
+            "Newest uploads": lambda: list(Patent.objects.order_by('-upload_date')[:50]),
+            "Analyses of a patent, newest first": lambda: list(
+                PatentAnalysis.objects.filter(patent_id=patent_id).order_by('-analysis_date')
+            ),
+            "Latest analyses": lambda: list(
+                PatentAnalysis.objects.order_by('-analysis_date')[:50]
+            ),
+        }
+
+    def _time_queries(self, queries, repeat):
+        timings = {}
+        for label, query in queries.items():
+            query()  # warm the page cache
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                query()
+                runs.append((time.perf_counter() - started) * 1000)
+            timings[label] = statistics.median(runs)
+        return timings
+
+    def _execute(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(str(sql))
+
+    def _report(self, label, started):
+        self.stdout.write(f"{label} in {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,137 @@
+import io
+import json
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from patent_api.models import EngineeringParameter, Patent, PatentAnalysis, TrizPrinciple
+from patent_api.renderers import ORJSONParser, ORJSONRenderer
+from patent_api.serializers import PatentAnalysisSerializer
+from patent_api.views import ANALYSIS_QUERYSET
+
+
+class Command(BaseCommand):
+    help = (
+        "Time DRF's JSONRenderer/JSONParser against the orjson renderer and "
+        "parser on serialized PatentAnalysis lists. Synthetic rows are created "
+        "in a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyses',
+            type=int,
+            default=1000,
+            help="Number of analyses in the rendered list",
+        )
+        parser.add_argument(
+            '--principles-per-analysis',
+            type=int,
+            default=4,
+            help="Applied principles nested in each analysis",
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help="Times each operation is run; the median is reported",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            data = self._payload(options['analyses'], options['principles_per_analysis'])
+            transaction.set_rollback(True)
+
+        stdlib_body = JSONRenderer().render(data)
+        orjson_body = ORJSONRenderer().render(data)
+        if json.loads(stdlib_body) != json.loads(orjson_body):
+            self.stderr.write("Renderers produced different documents")
+        self.stdout.write(
+            f"Payload: {len(data)} analyses, {len(stdlib_body) / 1024:.0f} KiB of JSON"
+        )
+
+        repeat = options['repeat']
+        timings = [
+            (
+                "Render",
+                self._time(lambda: JSONRenderer().render(data), repeat),
+                self._time(lambda: ORJSONRenderer().render(data), repeat),
+            ),
+            (
+                "Parse",
+                self._time(lambda: JSONParser().parse(io.BytesIO(stdlib_body)), repeat),
+                self._time(lambda: ORJSONParser().parse(io.BytesIO(stdlib_body)), repeat),
+            ),
+        ]
+
+        self.stdout.write(f"\n{'Operation':<10} {'DRF json':>12} {'orjson':>12} {'Speedup':>9}")
+        for label, before, after in timings:
+            speedup = before / after if after else float('inf')
+            self.stdout.write(
+                f"{label:<10} {before:>9.2f} ms {after:>9.2f} ms {speedup:>8.1f}x"
+            )
+
+    def _payload(self, analysis_count, principles_per_analysis):
+        """Serialized analyses shaped like the /api/analyses/ results"""
+        started = time.perf_counter()
+        principles = [
+            TrizPrinciple.objects.create(
+                number=-n,
+                name=f"Benchmark principle {n}",
+                description="Separate an object into independent parts " * 4,
+                examples="Modular furniture; sectional ladders",
+            )
+            for n in range(1, principles_per_analysis + 1)
+        ]
+        improving, worsening = (
+            EngineeringParameter.objects.create(
+                number=-n, name=f"Benchmark parameter {n}", description="Synthetic"
+            )
+            for n in (1, 2)
+        )
+        patent = Patent.objects.create(
+            patent_number="BENCHRENDER",
+            title="Synthetic patent for renderer benchmarks",
+            abstract="A device and method " * 40,
+            filing_date=date(2020, 1, 1),
+            publication_date=date(2021, 6, 1),
+            inventors="Benchmark Inventor; Second Inventor",
+            assignee="Benchmark Corp",
+        )
+        analyses = PatentAnalysis.objects.bulk_create(
+            PatentAnalysis(
+                patent=patent,
+                improving_parameter=improving,
+                worsening_parameter=worsening,
+                notes=f"Analysis {n}: resolved by segmentation and nesting",
+            )
+            for n in range(analysis_count)
+        )
+        PatentAnalysis.applied_principles.through.objects.bulk_create(
+            PatentAnalysis.applied_principles.through(
+                patentanalysis_id=analysis.id, trizprinciple_id=principle.id
+            )
+            for analysis in analyses
+            for principle in principles
+        )
+        queryset = ANALYSIS_QUERYSET.filter(patent=patent).order_by('-id')
+        data = PatentAnalysisSerializer(queryset, many=True).data
+        self.stdout.write(
+            f"Serialized {analysis_count} analyses in "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return data
+
+    def _time(self, operation, repeat):
+        operation()  # warm up
+        runs = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            operation()
+            runs.append((time.perf_counter() - started) * 1000)
+        return statistics.median(runs)
@@ -0,0 +1,235 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from patent_api.db import serialized_write
+from patent_api.matrix_snapshot import invalidate_matrix_snapshot
+from patent_api.models import ContradictionMatrix, EngineeringParameter, TrizPrinciple
+from patent_api.reference_cache import invalidate_reference_cache
+
+TRIZ_DATA_DIR = os.path.join(settings.BASE_DIR, 'data', 'triz')
+
+# Keep id lists in IN clauses under SQLite's bound parameter limit
+DELETE_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Load TRIZ principles, engineering parameters and the contradiction "
+        "matrix using bulk upserts in a single transaction. Matrix cells that "
+        "are not in the source are deleted, and so are principles and "
+        "parameters that are not, unless an analysis still uses them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=['constants', 'json'],
+            default='constants',
+            help="Load from services.triz.triz_constants or the data/triz JSON files",
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=TRIZ_DATA_DIR,
+            help="Directory containing principles.json, parameters.json and matrix.json",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        principles, parameters, matrix = self._read_source(
+            options['source'], options['data_dir']
+        )
+        self._report("Read source data", started)
+
+        with serialized_write(), transaction.atomic():
+            step = time.perf_counter()
+            TrizPrinciple.objects.bulk_create(
+                [
+                    TrizPrinciple(
+                        number=int(number),
+                        name=principle.get('name', ''),
+                        description=principle.get('description', ''),
+                        examples=self._examples_text(principle.get('examples', [])),
+                    )
+                    for number, principle in principles.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['number'],
+                update_fields=['name', 'description', 'examples'],
+            )
+            self._report(f"Upserted {len(principles)} principles", step)
+
+            step = time.perf_counter()
+            EngineeringParameter.objects.bulk_create(
+                [
+                    EngineeringParameter(number=int(number), name=name, description='')
+                    for number, name in parameters.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['number'],
+                update_fields=['name'],
+            )
+            self._report(f"Upserted {len(parameters)} parameters", step)
+
+            step = time.perf_counter()
+            cells = self._matrix_cells(matrix)
+            parameter_ids = dict(
+                EngineeringParameter.objects.filter(
+                    number__in=[int(n) for n in parameters]
+                ).values_list('number', 'id')
+            )
+            principle_ids = dict(
+                TrizPrinciple.objects.filter(
+                    number__in=[int(n) for n in principles]
+                ).values_list('number', 'id')
+            )
+            missing = {
+                number
+                for improving, worsening in cells
+                for number in (improving, worsening)
+                if number not in parameter_ids
+            }
+            if missing:
+                raise CommandError(f"Matrix references unknown parameters: {sorted(missing)}")
+
+            ContradictionMatrix.objects.bulk_create(
+                [
+                    ContradictionMatrix(
+                        improving_parameter_id=parameter_ids[improving],
+                        worsening_parameter_id=parameter_ids[worsening],
+                    )
+                    for improving, worsening in cells
+                ],
+                ignore_conflicts=True,
+            )
+            cell_ids = {
+                (improving, worsening): cell_id
+                for improving, worsening, cell_id in ContradictionMatrix.objects.values_list(
+                    'improving_parameter__number', 'worsening_parameter__number', 'id'
+                )
+            }
+            self._report(f"Upserted {len(cells)} matrix cells", step)
+
+            step = time.perf_counter()
+            added, removed = self._sync_cell_principles(cells, cell_ids, principle_ids)
+            self._report(
+                f"Linked matrix principles ({added} added, {removed} removed)", step
+            )
+
+            step = time.perf_counter()
+            stale_cells = [cell_id for key, cell_id in cell_ids.items() if key not in cells]
+            for i in range(0, len(stale_cells), DELETE_BATCH_SIZE):
+                ContradictionMatrix.objects.filter(
+                    id__in=stale_cells[i:i + DELETE_BATCH_SIZE]
+                ).delete()
+            self._report(f"Deleted {len(stale_cells)} matrix cells not in the source", step)
+
+            step = time.perf_counter()
+            removed_principles = self._remove_missing(
+                TrizPrinciple, principle_ids, Q(patent_applications__isnull=False)
+            )
+            removed_parameters = self._remove_missing(
+                EngineeringParameter,
+                parameter_ids,
+                Q(patent_improvements__isnull=False) | Q(patent_worsenings__isnull=False),
+            )
+            self._report(
+                f"Deleted {removed_principles} principles and {removed_parameters} "
+                f"parameters not in the source",
+                step,
+            )
+
+            # bulk operations bypass the signals that normally do this
+            invalidate_matrix_snapshot()
+            invalidate_reference_cache()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded TRIZ data from {options['source']} in "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms"
+        ))
+
+    def _read_source(self, source, data_dir):
+        if source == 'constants':
+            from services.triz.triz_constants import (
+                CONTRADICTION_MATRIX,
+                ENGINEERING_PARAMETERS,
+                TRIZ_PRINCIPLES,
+            )
+            return TRIZ_PRINCIPLES, ENGINEERING_PARAMETERS, CONTRADICTION_MATRIX
+
+        data = []
+        for name in ('principles', 'parameters', 'matrix'):
+            path = os.path.join(data_dir, f"{name}.json")
+            try:
+                with open(path) as f:
+                    data.append(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f"Could not read {path}: {e}")
+        return tuple(data)
+
+    def _examples_text(self, examples):
+        if isinstance(examples, str):
+            return examples
+        return "\n".join(examples)
+
+    def _matrix_cells(self, matrix):
+        """Map (improving, worsening) to principle numbers, skipping empty cells"""
+        cells = {}
+        for improving, row in matrix.items():
+            for worsening, principles in row.items():
+                if principles:
+                    cells[(int(improving), int(worsening))] = [int(p) for p in principles]
+        return cells
+
+    def _sync_cell_principles(self, cells, cell_ids, principle_ids):
+        """Make the M2M through rows of the loaded cells match the source"""
+        Through = ContradictionMatrix.principles.through
+        loaded_cells = {cell_ids[key] for key in cells}
+
+        desired = set()
+        for key, principles in cells.items():
+            for number in principles:
+                if number not in principle_ids:
+                    raise CommandError(f"Matrix references unknown principle: {number}")
+                desired.add((cell_ids[key], principle_ids[number]))
+
+        existing = {}
+        for row_id, cell_id, principle_id in Through.objects.values_list(
+            'id', 'contradictionmatrix_id', 'trizprinciple_id'
+        ):
+            if cell_id in loaded_cells:
+                existing[(cell_id, principle_id)] = row_id
+
+        stale = [row_id for link, row_id in existing.items() if link not in desired]
+        for i in range(0, len(stale), DELETE_BATCH_SIZE):
+            Through.objects.filter(id__in=stale[i:i + DELETE_BATCH_SIZE]).delete()
+
+        Through.objects.bulk_create([
+            Through(contradictionmatrix_id=cell_id, trizprinciple_id=principle_id)
+            for cell_id, principle_id in desired
+            if (cell_id, principle_id) not in existing
+        ])
+        return len(desired) - (len(existing) - len(stale)), len(stale)
+
+    def _remove_missing(self, model, loaded_ids, in_use):
+        """
+        Delete the rows of ``model`` that the source does not have, keeping
+        (with a warning) those that analyses still reference.
+        """
+        missing = model.objects.exclude(id__in=loaded_ids.values())
+        kept = sorted(missing.filter(in_use).values_list('number', flat=True).distinct())
+        if kept:
+            self.stderr.write(self.style.WARNING(
+                f"Kept {model._meta.verbose_name_plural} not in the source because "
+                f"analyses use them: {kept}"
+            ))
+        _, deleted = missing.exclude(number__in=kept).delete()
+        return deleted.get(model._meta.label, 0)
+
+    def _report(self, label, started):
+        self.stdout.write(f"{label} in {(time.perf_counter() - started) * 1000:.1f} ms")
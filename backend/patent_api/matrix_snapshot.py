@@ -0,0 +1,120 @@
+"""
+Per-process materialized snapshot of the TRIZ contradiction matrix.
+
+The matrix is reference data that rarely changes, so instead of joining three
+tables on every lookup each worker materializes it once into an immutable
+snapshot. Model signals replace a version kept in Django's cache and the next
+access rebuilds the snapshot; lookups in between never touch the database.
+
+The version never expires, so a snapshot is only rebuilt when the matrix
+changes. Invalidation reaches every worker only when they share the cache
+(DJANGO_CACHE_DIR, see settings.CACHES); with the default local-memory cache
+it covers the process that made the change.
+"""
+
+import threading
+import time
+from types import MappingProxyType
+
+from django.core.cache import cache
+from django.db import transaction
+
+from services.triz.matrix_engine import ContradictionMatrixEngine
+from .models import ContradictionMatrix
+from .serializers import ContradictionMatrixSerializer
+
+VERSION_CACHE_KEY = 'patent_api:matrix_snapshot_version'
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+class MatrixSnapshot:
+    """
+    Immutable view of the contradiction matrix at a given version.
+
+    ``cells`` maps ``(improving_number, worsening_number)`` to the serialized
+    ``ContradictionMatrixSerializer`` payload for that cell. The payloads are
+    shared between requests and must be treated as read-only.
+    """
+
+    __slots__ = ('_version', '_cells', '_engine')
+
+    def __init__(self, version, cells, engine):
+        self._version = version
+        self._cells = MappingProxyType(cells)
+        self._engine = engine
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def cells(self):
+        return self._cells
+
+    @property
+    def engine(self):
+        return self._engine
+
+    def cell(self, improving, worsening):
+        """Serialized cell for a parameter pair, or None if it does not exist"""
+        return self._cells.get((int(improving), int(worsening)))
+
+    @classmethod
+    def build(cls, version):
+        """Materialize the matrix from the database"""
+        queryset = ContradictionMatrix.objects.select_related(
+            'improving_parameter', 'worsening_parameter'
+        ).prefetch_related('principles')
+
+        cells = {}
+        for contradiction in queryset:
+            key = (
+                contradiction.improving_parameter.number,
+                contradiction.worsening_parameter.number,
+            )
+            cells[key] = dict(ContradictionMatrixSerializer(contradiction).data)
+
+        engine = ContradictionMatrixEngine.from_rows(
+            (improving, worsening, principle['number'])
+            for (improving, worsening), data in cells.items()
+            for principle in data['principles']
+        )
+        return cls(version, cells, engine)
+
+
+def current_version():
+    """
+    Current matrix version. Versions are nanosecond timestamps compared only
+    for equality, so a cache reset cannot bring back an older snapshot's.
+    """
+    return cache.get_or_set(VERSION_CACHE_KEY, time.time_ns, timeout=None)
+
+
+def get_matrix_snapshot():
+    """
+    Get the matrix snapshot, rebuilding it if the matrix changed since it was
+    materialized.
+    """
+    global _snapshot
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = MatrixSnapshot.build(version)
+        return _snapshot
+
+
+def _bump_version():
+    # A plain set rather than incr(), which resets the timeout on backends
+    # that implement it as get-then-set
+    cache.set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_matrix_snapshot():
+    """Mark the snapshot stale once the current transaction commits"""
+    transaction.on_commit(_bump_version)
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patent_api", "0002_patent_pdf_file_name_patent_upload_date_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="patent",
+            index=models.Index(fields=["filing_date"], name="patent_filing_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="patent",
+            index=models.Index(
+                fields=["publication_date"], name="patent_publication_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patent",
+            index=models.Index(fields=["assignee"], name="patent_assignee_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="patent",
+            index=models.Index(fields=["upload_date"], name="patent_upload_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="patentanalysis",
+            index=models.Index(
+                fields=["patent", "analysis_date"], name="analysis_patent_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patentanalysis",
+            index=models.Index(fields=["analysis_date"], name="analysis_date_idx"),
+        ),
+    ]
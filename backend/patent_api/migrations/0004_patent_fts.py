@@ -0,0 +1,113 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:10
+
+import django.db.models.deletion
+import patent_api.search
+from django.db import migrations, models
+
+# SQLite rebuilds a table for most AlterField/RemoveField operations, which
+# drops its triggers; a later migration that does so on patent_api_patent must
+# run CREATE_TRIGGERS again.
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE patent_api_patent_fts USING fts5(
+    title, abstract, inventors, assignee,
+    content='patent_api_patent', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)
+"""
+
+CREATE_TRIGGERS = [
+    """
+    CREATE TRIGGER patent_api_patent_fts_insert AFTER INSERT ON patent_api_patent BEGIN
+        INSERT INTO patent_api_patent_fts (rowid, title, abstract, inventors, assignee)
+        VALUES (new.id, new.title, new.abstract, new.inventors, new.assignee);
+    END
+    """,
+    """
+    CREATE TRIGGER patent_api_patent_fts_delete AFTER DELETE ON patent_api_patent BEGIN
+        INSERT INTO patent_api_patent_fts
+            (patent_api_patent_fts, rowid, title, abstract, inventors, assignee)
+        VALUES ('delete', old.id, old.title, old.abstract, old.inventors, old.assignee);
+    END
+    """,
+    """
+    CREATE TRIGGER patent_api_patent_fts_update
+    AFTER UPDATE OF title, abstract, inventors, assignee ON patent_api_patent BEGIN
+        INSERT INTO patent_api_patent_fts
+            (patent_api_patent_fts, rowid, title, abstract, inventors, assignee)
+        VALUES ('delete', old.id, old.title, old.abstract, old.inventors, old.assignee);
+        INSERT INTO patent_api_patent_fts (rowid, title, abstract, inventors, assignee)
+        VALUES (new.id, new.title, new.abstract, new.inventors, new.assignee);
+    END
+    """,
+]
+
+# Title matches count most, then inventors and assignee, then the abstract
+CONFIGURE_RANK = (
+    "INSERT INTO patent_api_patent_fts (patent_api_patent_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0, 2.0, 2.0)')"
+)
+
+# Index the patents that already exist
+REBUILD = (
+    "INSERT INTO patent_api_patent_fts (patent_api_patent_fts) VALUES ('rebuild')"
+)
+
+DROP = [
+    "DROP TRIGGER IF EXISTS patent_api_patent_fts_insert",
+    "DROP TRIGGER IF EXISTS patent_api_patent_fts_delete",
+    "DROP TRIGGER IF EXISTS patent_api_patent_fts_update",
+    "DROP TABLE IF EXISTS patent_api_patent_fts",
+]
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in [CREATE_TABLE, *CREATE_TRIGGERS, CONFIGURE_RANK, REBUILD]:
+        schema_editor.execute(sql)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in DROP:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patent_api", "0003_patent_and_analysis_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatentSearchEntry",
+            fields=[
+                (
+                    "patent",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="patent_api.patent",
+                    ),
+                ),
+                (
+                    "document",
+                    patent_api.search.FtsDocumentField(
+                        db_column="patent_api_patent_fts"
+                    ),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "patent_api_patent_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .search import FTS_TABLE, FtsDocumentField
+
 # Create your models here.
 
 class TrizPrinciple(models.Model):
@@ -44,9 +46,34 @@ class Patent(models.Model):
                                    help_text="Original filename of the uploaded PDF")
     upload_date = models.DateTimeField(auto_now_add=True, null=True)
 
+    class Meta:
+        # Admin date filters and hierarchy, assignee lookups, newest uploads
+        indexes = [
+            models.Index(fields=['filing_date'], name='patent_filing_date_idx'),
+            models.Index(fields=['publication_date'], name='patent_publication_date_idx'),
+            models.Index(fields=['assignee'], name='patent_assignee_idx'),
+            models.Index(fields=['upload_date'], name='patent_upload_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.patent_number} - {self.title}"
 
+class PatentSearchEntry(models.Model):
+    """
+    A row of the SQLite FTS5 index over patents, created and kept in sync by
+    migration 0004's triggers. Query it through patent_api.search.
+    """
+    patent = models.OneToOneField(
+        Patent, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_entry'
+    )
+    document = FtsDocumentField(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
 class PatentAnalysis(models.Model):
     patent = models.ForeignKey(Patent, on_delete=models.CASCADE, related_name='analyses')
     improving_parameter = models.ForeignKey(EngineeringParameter, on_delete=models.CASCADE, related_name='patent_improvements')
@@ -55,6 +82,13 @@ class PatentAnalysis(models.Model):
     analysis_date = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # A patent's analyses, newest first
+            models.Index(fields=['patent', 'analysis_date'], name='analysis_patent_date_idx'),
+            models.Index(fields=['analysis_date'], name='analysis_date_idx'),
+        ]
+
     def __str__(self):
         return f"Analysis of {self.patent.patent_number}"
 
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class ApiCursorPagination(CursorPagination):
+    """
+    Cursor pagination on the primary key, newest rows first.
+
+    Each page is one indexed range scan (``WHERE id < <cursor> ORDER BY id
+    DESC LIMIT n``), so it costs the same on page 1 and page 10,000 and rows
+    inserted between requests never shift or repeat results. Clients choose
+    ``?page_size=`` up to ``API_MAX_PAGE_SIZE``. The total row count costs a
+    full ``COUNT(*)``, so it is only included with ``?count=true``.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        """Views may set ``pagination_ordering``, e.g. to page by search rank"""
+        ordering = getattr(view, 'pagination_ordering', None)
+        if ordering:
+            return ordering
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        fields = [
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ]
+        if self.count is not None:
+            fields.append(('count', self.count))
+        fields.append(('results', data))
+        return Response(OrderedDict(fields))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {
+            'type': 'integer',
+            'example': 123,
+            'description': 'Only present when requested with ?count=true',
+        }
+        return response_schema
@@ -0,0 +1,116 @@
+"""
+Server-side cache of rendered TRIZ reference responses.
+
+Principles, engineering parameters and the contradiction matrix change maybe
+once a year, so the viewsets serving them keep each fully rendered JSON
+response in Django's cache, keyed by the absolute request URL and Accept
+header. Keys also carry a version that model signals replace with the current
+time whenever reference data changes, so a single cache write invalidates
+every stored response and the version doubles as the Last-Modified time.
+Responses carry an ETag and Last-Modified, and conditional requests that match
+are answered with 304 Not Modified.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+VERSION_CACHE_KEY = 'patent_api:reference_version'
+RESPONSE_KEY_PREFIX = 'patent_api:reference_response'
+
+# Stored responses are keyed by version, so stale ones are never served; the
+# timeout only bounds how long superseded entries occupy the cache
+TIMEOUT = getattr(settings, 'REFERENCE_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def current_version():
+    """Nanosecond timestamp of the last change to the reference data"""
+    return cache.get_or_set(VERSION_CACHE_KEY, time.time_ns, timeout=None)
+
+
+def _bump_version():
+    cache.set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_reference_cache():
+    """Drop every cached reference response once the current transaction commits"""
+    transaction.on_commit(_bump_version)
+
+
+def _response_key(request, version):
+    variant = f"{request.build_absolute_uri()}\n{request.META.get('HTTP_ACCEPT', '')}"
+    digest = hashlib.sha256(variant.encode('utf-8')).hexdigest()
+    return f'{RESPONSE_KEY_PREFIX}:{version}:{digest}'
+
+
+def _build_response(request, entry):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ('Accept',))
+    return get_conditional_response(
+        request,
+        etag=entry['etag'],
+        last_modified=int(entry['last_modified']),
+        response=response,
+    )
+
+
+class ReferenceCacheMixin:
+    """
+    Serve a viewset's read actions from the reference response cache.
+
+    The lookup happens after ``initial()``, so authentication, permissions and
+    throttling apply to cached responses too. Only successful JSON responses
+    are stored; the browsable API, errors and writes always go through the
+    view. ``cached_actions`` lists the actions whose responses depend on
+    reference data alone.
+    """
+    cached_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.reference_cache_key = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.cached_actions:
+            return
+
+        # Read the version before the data, so a change committed while this
+        # response renders leaves it under the superseded version
+        self.reference_cache_version = current_version()
+        self.reference_cache_key = _response_key(request, self.reference_cache_version)
+        entry = cache.get(self.reference_cache_key)
+        if entry is not None:
+            self.reference_cache_key = None
+
+            def cached_handler(request, *args, **kwargs):
+                return _build_response(request, entry)
+
+            setattr(self, request.method.lower(), cached_handler)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'reference_cache_key', None)
+        renderer = getattr(response, 'accepted_renderer', None)
+        if (
+            key is None
+            or response.status_code != 200
+            or getattr(renderer, 'format', None) != 'json'
+        ):
+            return response
+
+        content = response.render().content
+        entry = {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'etag': quote_etag(hashlib.sha256(content).hexdigest()[:32]),
+            'last_modified': self.reference_cache_version / 1e9,
+        }
+        cache.set(key, entry, TIMEOUT)
+        return _build_response(request, entry)
@@ -0,0 +1,65 @@
+"""
+orjson-backed JSON renderer and parser for the REST API.
+
+orjson encodes dicts, lists, strings, numbers, UUIDs and numpy arrays natively
+and several times faster than the stdlib encoder behind DRF's ``JSONRenderer``.
+Everything else (dates and datetimes, decimals, lazy translation strings,
+timedeltas, querysets, ...) is handed to DRF's own ``JSONEncoder.default``, so
+it is rendered exactly as before: datetimes keep DRF's millisecond precision
+and "Z" suffix, and decimals follow ``COERCE_DECIMAL_TO_STRING``. Serializers
+already turn model dates into strings, so this fallback is rarely hit. Output is
+compact UTF-8, like DRF's defaults.
+"""
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+    | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+_fallback_encoder = JSONEncoder()
+
+
+def _default(obj):
+    return _fallback_encoder.default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renderer which serializes to JSON with orjson.
+
+    Clients asking for ``application/json; indent=<n>`` get two-space
+    indentation, the only indent orjson supports.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = OPTIONS
+        if accepted_media_type and 'indent=' in accepted_media_type:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=options)
+
+
+class ORJSONParser(BaseParser):
+    """
+    Parses JSON-serialized data with orjson.
+    """
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,86 @@
+"""
+Full-text search over patents with SQLite FTS5.
+
+Migration 0004 creates ``patent_api_patent_fts``, an external-content FTS5
+index over the title, abstract, inventors and assignee of ``patent_api_patent``.
+Triggers keep it in sync, so bulk inserts and raw SQL writes are indexed too.
+Queries join the index to the patent table and order by its BM25 ``rank``, with
+title matches weighted highest (the weights are set by the migration). On
+databases other than SQLite, search falls back to ``icontains`` filters.
+"""
+
+import re
+
+from django.db import connection, models
+from django.db.models import F, Q
+
+FTS_TABLE = 'patent_api_patent_fts'
+FTS_COLUMNS = ('title', 'abstract', 'inventors', 'assignee')
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class FtsDocumentField(models.TextField):
+    """
+    The FTS5 table's hidden column of the same name as the table, which is
+    the left-hand side of a MATCH across every indexed column.
+    """
+
+
+@FtsDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+def fts_available():
+    """Whether the database has the FTS5 index (SQLite only)."""
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """
+    Turn free text into a safe FTS5 query.
+
+    Every word is quoted, so FTS5 operators in user input are treated as
+    plain text, and matched as a prefix ("sens" finds "sensor"). Words are
+    ANDed together.
+
+    Returns:
+        The MATCH expression, or None if the query has no words
+    """
+    tokens = TOKEN_RE.findall(query or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_patents(queryset, query):
+    """
+    Filter a Patent queryset to the patents matching a free-text query.
+
+    With FTS5 the result is annotated with ``rank`` (lower is better) and
+    ordered by it; otherwise every word must appear in one of the indexed
+    fields, matched with ``icontains``.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return queryset
+
+    if fts_available():
+        return (
+            queryset.filter(search_entry__document__match=expression)
+            .annotate(rank=F('search_entry__rank'))
+            .order_by('rank', '-id')
+        )
+
+    for token in TOKEN_RE.findall(query):
+        condition = Q()
+        for column in FTS_COLUMNS:
+            condition |= Q(**{f'{column}__icontains': token})
+        queryset = queryset.filter(condition)
+    return queryset
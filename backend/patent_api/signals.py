@@ -0,0 +1,43 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cooccurrence import invalidate_principle_cooccurrence, refresh_analysis_cooccurrence
+from .matrix_snapshot import invalidate_matrix_snapshot
+from .models import ContradictionMatrix, EngineeringParameter, PatentAnalysis, TrizPrinciple
+from .reference_cache import invalidate_reference_cache
+
+
+@receiver(post_save, sender=ContradictionMatrix)
+@receiver(post_delete, sender=ContradictionMatrix)
+@receiver(post_save, sender=EngineeringParameter)
+@receiver(post_delete, sender=EngineeringParameter)
+@receiver(post_save, sender=TrizPrinciple)
+@receiver(post_delete, sender=TrizPrinciple)
+def matrix_data_changed(sender, **kwargs):
+    invalidate_matrix_snapshot()
+    invalidate_reference_cache()
+
+
+@receiver(m2m_changed, sender=ContradictionMatrix.principles.through)
+def matrix_principles_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_matrix_snapshot()
+        invalidate_reference_cache()
+
+
+@receiver(m2m_changed, sender=PatentAnalysis.applied_principles.through)
+def analysis_principles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_analysis_cooccurrence(instance.pk)
+    elif pk_set:
+        for analysis_id in pk_set:
+            refresh_analysis_cooccurrence(analysis_id)
+    else:
+        invalidate_principle_cooccurrence()
+
+
+@receiver(post_delete, sender=PatentAnalysis)
+def analysis_deleted(sender, instance, **kwargs):
+    refresh_analysis_cooccurrence(instance.pk)
@@ -1,3 +1,861 @@
-from django.test import TestCase
+import io
+import csv
+import json
+import tempfile
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin import site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import (
+    TrizPrinciple,
+    EngineeringParameter,
+    ContradictionMatrix,
+    Patent,
+    PatentAnalysis,
+    PatentCitation,
+)
+from data.mock_data import PATENT_ANALYSES
+from services.triz.cooccurrence import analysis_principle_sets
+
+from . import cooccurrence
+from .matrix_snapshot import get_matrix_snapshot
+from .management.commands.benchmark_database import run_mixed_workload
+from .pagination import ApiCursorPagination
+from .renderers import ORJSONParser, ORJSONRenderer
+from .views import TrizPrincipleViewSet
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Each endpoint runs a fixed number of queries, however many rows it returns.
+
+    Every endpoint is requested with a few rows and again after more rows are
+    added; both requests must stay within the same budget, so an N+1 query in
+    a serializer or queryset fails here.
+    """
+
+    # (url, queries); detail urls are formatted with the first patent/analysis
+    BUDGETS = [
+        ('/api/triz/principles/', 1),
+        ('/api/triz/parameters/', 1),
+        ('/api/triz/matrix/', 2),
+        ('/api/patents/', 1),
+        ('/api/patents/{patent}/', 1),
+        ('/api/patents/{patent}/analyses/', 3),
+        ('/api/patents/{patent}/citations/', 2),
+        ('/api/analyses/', 2),
+        ('/api/analyses/{analysis}/', 2),
+        ('/api/citations/', 1),
+        ('/api/analyses/?count=true', 3),
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.rows = 0
+        self._add_rows(3)
+        self.patent = Patent.objects.order_by('id').first()
+        self.analysis = PatentAnalysis.objects.order_by('id').first()
+
+    def _add_rows(self, count):
+        """Add principles, parameters, matrix cells, patents, analyses and citations"""
+        for _ in range(count):
+            self.rows += 1
+            n = self.rows
+            principle = TrizPrinciple.objects.create(
+                number=n, name=f'Principle {n}', description='', examples=''
+            )
+            parameter = EngineeringParameter.objects.create(
+                number=n, name=f'Parameter {n}', description=''
+            )
+            first_parameter = EngineeringParameter.objects.get(number=1)
+            cell = ContradictionMatrix.objects.create(
+                improving_parameter=parameter, worsening_parameter=first_parameter
+            )
+            cell.principles.add(*TrizPrinciple.objects.all()[:3])
+
+            patent = Patent.objects.create(
+                patent_number=f'US{n:08d}',
+                title=f'Patent {n}',
+                abstract='',
+                filing_date=date(2020, 1, 1),
+                publication_date=date(2021, 1, 1),
+                inventors='Inventor',
+                assignee='Assignee',
+            )
+            first_patent = Patent.objects.order_by('id').first()
+            analysis = PatentAnalysis.objects.create(
+                patent=first_patent,
+                improving_parameter=parameter,
+                worsening_parameter=first_parameter,
+            )
+            analysis.applied_principles.add(principle)
+            if patent != first_patent:
+                PatentCitation.objects.create(
+                    citing_patent=first_patent,
+                    cited_patent=patent,
+                    citation_type='backward',
+                )
+
+    def _assert_budgets(self):
+        for url, budget in self.BUDGETS:
+            url = url.format(patent=self.patent.pk, analysis=self.analysis.pk)
+            # Budgets are for rendering, not for cached reference responses
+            cache.clear()
+            with self.subTest(url=url, rows=self.rows):
+                with self.assertNumQueries(budget):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_query_budget_does_not_grow_with_rows(self):
+        self._assert_budgets()
+        self._add_rows(7)
+        self._assert_budgets()
+
+
+class PatentIndexTests(TestCase):
+    """The Patent/PatentAnalysis indexes exist and serve the hot queries"""
+
+    def test_migrations_create_the_model_indexes(self):
+        call_command(
+            'makemigrations', 'patent_api', '--check', '--dry-run', stdout=io.StringIO()
+        )
+        for model in (Patent, PatentAnalysis):
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                )
+            for index in model._meta.indexes:
+                columns = [model._meta.get_field(name).column for name in index.fields]
+                self.assertIn(index.name, constraints)
+                self.assertEqual(constraints[index.name]['columns'], columns)
+
+    def test_query_plans_use_the_indexes(self):
+        queries = {
+            'patent_assignee_idx': Patent.objects.filter(assignee='Acme'),
+            'patent_upload_date_idx': Patent.objects.order_by('-upload_date')[:20],
+            'patent_filing_date_idx': Patent.objects.filter(
+                filing_date__range=(date(2020, 1, 1), date(2020, 12, 31))
+            ),
+            'analysis_patent_date_idx': PatentAnalysis.objects.filter(
+                patent_id=1
+            ).order_by('-analysis_date'),
+            'analysis_date_idx': PatentAnalysis.objects.order_by('-analysis_date')[:20],
+        }
+        for name, queryset in queries.items():
+            self.assertIn(name, queryset.explain(), name)
+
+
+class CursorPaginationTests(TestCase):
+    """Cursor pagination of the large list endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        Patent.objects.bulk_create(
+            Patent(
+                patent_number=f'US{n:08d}',
+                title=f'Patent {n}',
+                abstract='',
+                filing_date=date(2020, 1, 1),
+                publication_date=date(2021, 1, 1),
+                inventors='Inventor',
+                assignee='Assignee',
+            )
+            for n in range(25)
+        )
+
+    def test_pages_cover_every_row_once(self):
+        seen = []
+        url = '/api/patents/?page_size=10'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(patent['id'] for patent in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, sorted(Patent.objects.values_list('id', flat=True), reverse=True))
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(ApiCursorPagination, 'max_page_size', 10):
+            response = self.client.get('/api/patents/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_count_is_opt_in(self):
+        response = self.client.get('/api/patents/?count=true&page_size=5')
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 5)
+
+
+class PatentSearchTests(TestCase):
+    """?q= full-text search on the patent list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for n, (title, abstract) in enumerate([
+            ('Wireless sensor network', 'Low power radios'),
+            ('Pump assembly', 'Includes a pressure sensor'),
+            ('Valve', 'Hydraulic control'),
+        ]):
+            Patent.objects.create(
+                patent_number=f'US{n:08d}',
+                title=title,
+                abstract=abstract,
+                filing_date=date(2020, 1, 1),
+                publication_date=date(2021, 1, 1),
+                inventors='Inventor',
+                assignee='Assignee',
+            )
+
+    def _titles(self, query):
+        response = self.client.get('/api/patents/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [patent['title'] for patent in response.data['results']]
+
+    def test_prefix_match_ranks_title_first(self):
+        self.assertEqual(self._titles('sens'), ['Wireless sensor network', 'Pump assembly'])
+
+    def test_index_follows_updates_and_deletes(self):
+        patent = Patent.objects.get(title='Valve')
+        patent.title = 'Sensor valve'
+        patent.save()
+        self.assertIn('Sensor valve', self._titles('sensor'))
+        patent.delete()
+        self.assertNotIn('Sensor valve', self._titles('sensor'))
+
+    def test_operators_in_query_are_plain_words(self):
+        self.assertEqual(self._titles('"pump" OR ('), [])
+
+    def test_admin_search_matches_words_and_patent_numbers(self):
+        admin = site._registry[Patent]
+        queryset = Patent.objects.all()
+        for term, expected in [
+            ('sensor', ['US00000000', 'US00000001']),
+            ('US00000002', ['US00000002']),
+            ('us0000000', ['US00000000', 'US00000001', 'US00000002']),
+        ]:
+            with self.subTest(term=term):
+                results, _ = admin.get_search_results(None, queryset, term)
+                self.assertEqual(
+                    sorted(results.values_list('patent_number', flat=True)), expected
+                )
+
+
+class MatrixReverseIndexTests(TestCase):
+    """Reverse index lookups of the contradiction matrix API"""
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        improving = EngineeringParameter.objects.create(number=9, name='Speed', description='')
+        worsening = EngineeringParameter.objects.create(number=1, name='Weight', description='')
+        for n in (1, 7):
+            TrizPrinciple.objects.create(number=n, name=f'Principle {n}', description='', examples='')
+        cell = ContradictionMatrix.objects.create(
+            improving_parameter=improving, worsening_parameter=worsening
+        )
+        cell.principles.set(TrizPrinciple.objects.all())
+
+    def test_cells_recommending_every_principle(self):
+        response = self.client.get('/api/triz/matrix/cells/', {'principle': [1, 7]})
+        self.assertEqual(
+            response.json(),
+            {'cells': [{'improving': 9, 'worsening': 1, 'principles': [1, 7]}], 'count': 1},
+        )
+        none = self.client.get('/api/triz/matrix/cells/', {'principle': [1, 2]}).json()
+        self.assertEqual(none['count'], 0)
+        self.assertEqual(self.client.get('/api/triz/matrix/cells/').status_code, 400)
+
+    def test_principle_paired_with_itself_matches_single_principle(self):
+        single = self.client.get('/api/triz/matrix/by_principle/7/').json()
+        pair = self.client.get('/api/triz/matrix/by_principle_pair/7/7/').json()
+        self.assertEqual(pair, single)
+        self.assertEqual(pair['count'], 1)
+
+    def test_out_of_range_numbers_are_rejected(self):
+        for url in [
+            '/api/triz/matrix/by_principle/41/',
+            '/api/triz/matrix/by_principle_pair/1/41/',
+            '/api/triz/matrix/by_principle_pair/0/0/',
+            '/api/triz/matrix/by_parameter/40/',
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn('error', response.json())
+
+
+class PrincipleCooccurrenceTests(TestCase):
+    """Related principles combine the matrix, applied principles and mock analyses"""
+
+    def setUp(self):
+        patcher = mock.patch.object(cooccurrence, '_model', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache.clear)
+
+        for n in range(1, 41):
+            TrizPrinciple.objects.create(number=n, name=f'Principle {n}', description='', examples='')
+        improving = EngineeringParameter.objects.create(number=9, name='Speed', description='')
+        worsening = EngineeringParameter.objects.create(number=1, name='Weight', description='')
+        cell = ContradictionMatrix.objects.create(
+            improving_parameter=improving, worsening_parameter=worsening
+        )
+        cell.principles.set(TrizPrinciple.objects.filter(number__in=[1, 7]))
+        patent = Patent.objects.create(
+            patent_number='US00000001', title='Patent', abstract='', filing_date=date(2020, 1, 1),
+            publication_date=date(2021, 1, 1), inventors='Inventor', assignee='Assignee',
+        )
+        self.analysis = PatentAnalysis.objects.create(
+            patent=patent, improving_parameter=improving, worsening_parameter=worsening
+        )
+        self.analysis.applied_principles.set(TrizPrinciple.objects.filter(number__in=[7, 15]))
+
+    def _mock_count(self, first, second):
+        return sum(
+            first in numbers and second in numbers
+            for analysis in PATENT_ANALYSES
+            for numbers in analysis_principle_sets(analysis['extracted_data'])
+        )
+
+    def _related(self, number):
+        pk = TrizPrinciple.objects.get(number=number).pk
+        response = APIClient().get(f'/api/triz/principles/{pk}/related/?limit=40')
+        self.assertEqual(response.status_code, 200)
+        return {entry['principle']['number']: entry['count'] for entry in response.json()}
+
+    def test_combines_all_sources(self):
+        counts = self._related(7)
+        # Matrix cell
+        self.assertEqual(counts[1], 1 + self._mock_count(1, 7))
+        # Applied principles
+        self.assertEqual(counts[15], 1 + self._mock_count(7, 15))
+        # Extracted data of the mock analyses
+        self.assertGreater(self._mock_count(15, 35), 0)
+        self.assertEqual(self._related(15)[35], self._mock_count(15, 35))
+
+    def test_applied_principle_changes_are_applied_incrementally(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.analysis.applied_principles.add(TrizPrinciple.objects.get(number=22))
+        self.assertEqual(self._related(7)[22], 1 + self._mock_count(7, 22))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.analysis.delete()
+        self.assertEqual(self._related(7).get(22, 0), self._mock_count(7, 22))
+
+
+class MatrixSnapshotTests(TestCase):
+    """The per-process matrix snapshot and its cache-held version"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.speed = EngineeringParameter.objects.create(number=9, name='Speed', description='')
+        self.weight = EngineeringParameter.objects.create(number=1, name='Weight', description='')
+        self.segmentation = TrizPrinciple.objects.create(
+            number=1, name='Segmentation', description='', examples=''
+        )
+        self.cell = ContradictionMatrix.objects.create(
+            improving_parameter=self.speed, worsening_parameter=self.weight
+        )
+        self.cell.principles.add(self.segmentation)
+
+    def test_snapshot_is_reused_without_queries(self):
+        snapshot = get_matrix_snapshot()
+        with self.assertNumQueries(0):
+            self.assertIs(get_matrix_snapshot(), snapshot)
+            self.assertEqual(snapshot.engine.lookup(9, 1), [1])
+            self.assertIsNone(snapshot.cell(1, 9))
+            response = self.client.get('/api/triz/matrix/get_principles/', {
+                'improving': 9, 'worsening': 1,
+            })
+        self.assertEqual(response.json()['principles'][0]['name'], 'Segmentation')
+
+    def test_committed_changes_rebuild_the_snapshot(self):
+        snapshot = get_matrix_snapshot()
+        extraction = TrizPrinciple.objects.create(
+            number=2, name='Taking out', description='', examples=''
+        )
+        # Not committed yet: the old snapshot is still served
+        self.assertIs(get_matrix_snapshot(), snapshot)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cell.principles.add(extraction)
+        rebuilt = get_matrix_snapshot()
+        self.assertIsNot(rebuilt, snapshot)
+        self.assertNotEqual(rebuilt.version, snapshot.version)
+        self.assertEqual(rebuilt.engine.lookup(9, 1), [1, 2])
+        self.assertEqual(snapshot.engine.lookup(9, 1), [1])
+
+    def test_cache_reset_rebuilds_the_snapshot(self):
+        snapshot = get_matrix_snapshot()
+        cache.clear()
+        self.assertNotEqual(get_matrix_snapshot().version, snapshot.version)
+
+
+class RankPrinciplesTests(TestCase):
+    """Ranking principles across several contradictions in one request"""
+
+    URL = '/api/triz/matrix/rank_principles/'
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        parameters = {
+            n: EngineeringParameter.objects.create(number=n, name=f'Parameter {n}', description='')
+            for n in (1, 2, 3)
+        }
+        principles = {
+            n: TrizPrinciple.objects.create(number=n, name=f'Principle {n}', description='', examples='')
+            for n in (1, 2, 3)
+        }
+        for (improving, worsening), numbers in {(1, 2): (1, 2), (1, 3): (2, 3)}.items():
+            cell = ContradictionMatrix.objects.create(
+                improving_parameter=parameters[improving],
+                worsening_parameter=parameters[worsening],
+            )
+            cell.principles.set(principles[n] for n in numbers)
+
+    def _rank(self, contradictions):
+        return self.client.post(self.URL, {'contradictions': contradictions}, format='json')
+
+    def test_weighted_ranking_with_principle_details(self):
+        response = self._rank([
+            {'improving': 1, 'worsening': 2},
+            {'improving': 1, 'worsening': 3, 'weight': 3},
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [(p['principle']['number'], p['score'], p['count']) for p in data['principles']],
+            [(2, 4.0, 2), (3, 3.0, 1), (1, 1.0, 1)],
+        )
+        self.assertEqual(data['principles'][0]['principle']['name'], 'Principle 2')
+        self.assertEqual(data['contradictions'][1], {'improving': 1, 'worsening': 3, 'principles': [2, 3]})
+
+    def test_invalid_requests_are_rejected(self):
+        for contradictions in [
+            [],
+            [{'improving': 1}],
+            [{'improving': 1, 'worsening': 40}],
+            [{'improving': 1, 'worsening': 2, 'weight': 'heavy'}],
+        ]:
+            response = self._rank(contradictions)
+            self.assertEqual(response.status_code, 400, contradictions)
+            self.assertIn('error', response.json())
+
+
+class ReferenceCacheTests(TestCase):
+    """Cached TRIZ reference responses, their validators and invalidation."""
+
+    URL = '/api/triz/principles/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        TrizPrinciple.objects.create(number=1, name='Segmentation', description='', examples='')
+
+    def test_repeated_request_is_served_from_cache(self):
+        first = self.client.get(self.URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.URL)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('Last-Modified', second)
+
+    def test_conditional_requests_get_not_modified(self):
+        response = self.client.get(self.URL)
+        etag_match = self.client.get(self.URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(etag_match.status_code, 304)
+        date_match = self.client.get(
+            self.URL, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(date_match.status_code, 304)
+
+    def test_query_params_are_cached_separately(self):
+        first, second = (
+            EngineeringParameter.objects.create(number=n, name=f'Parameter {n}', description='')
+            for n in (1, 2)
+        )
+        ContradictionMatrix.objects.create(improving_parameter=first, worsening_parameter=second)
+        ContradictionMatrix.objects.create(improving_parameter=second, worsening_parameter=first)
+        whole = self.client.get('/api/triz/matrix/')
+        page = self.client.get('/api/triz/matrix/', {'page_size': 1})
+        self.assertEqual(len(whole.json()['results']), 2)
+        self.assertEqual(len(page.json()['results']), 1)
+
+    def test_permissions_apply_to_cached_responses(self):
+        self.assertEqual(self.client.get(self.URL).status_code, 200)
+        with mock.patch.object(TrizPrincipleViewSet, 'permission_classes', [IsAuthenticated]):
+            self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+    def test_load_triz_invalidates(self):
+        response = self.client.get(self.URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('load_triz', stdout=io.StringIO())
+        refreshed = self.client.get(self.URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(len(refreshed.json()), 40)
+
+    def test_model_change_invalidates(self):
+        response = self.client.get(self.URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            TrizPrinciple.objects.filter(number=1).update(name='ignored')
+            TrizPrinciple.objects.get(number=1).save()
+        refreshed = self.client.get(self.URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(refreshed.json()[0]['name'], 'ignored')
+
+
+class ORJSONRendererTests(TestCase):
+    """The orjson renderer and parser behave like DRF's JSON pair."""
+
+    def test_output_matches_drf_renderer(self):
+        data = {
+            'date': date(2021, 6, 1),
+            'datetime': datetime(2021, 6, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            'decimal': Decimal('1.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'nested': [{'number': 1, 'name': 'Segmentation'}],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_accept_parameter(self):
+        rendered = ORJSONRenderer().render({'a': [1]}, 'application/json; indent=4')
+        self.assertEqual(rendered, b'{\n  "a": [\n    1\n  ]\n}')
+        response = APIClient().get(
+            '/api/triz/parameters/', HTTP_ACCEPT='application/json; indent=2'
+        )
+        self.assertEqual(response.content, b'[]')
+
+    def test_malformed_body_is_a_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"title": '))
+        response = APIClient().post(
+            '/api/patents/', data=b'{"title": ', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+class PatentImportTests(TestCase):
+    """Bulk NDJSON/JSON-array import with upsert on patent_number."""
+
+    URL = '/api/patents/import/'
+
+    def setUp(self):
+        self.client = APIClient()
+        Patent.objects.create(
+            patent_number='US00000001',
+            title='Old title',
+            abstract='',
+            filing_date=date(2020, 1, 1),
+            publication_date=date(2021, 1, 1),
+            inventors='Inventor',
+            assignee='Assignee',
+        )
+
+    def _record(self, number, title):
+        return {
+            'patent_number': number,
+            'title': title,
+            'abstract': 'Abstract',
+            'filing_date': '2020-01-01',
+            'publication_date': '2021-01-01',
+            'inventors': 'Inventor',
+            'assignee': 'Assignee',
+        }
+
+    def _import(self, body, content_type, **params):
+        url = self.URL
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        response = self.client.generic('POST', url, body, content_type=content_type)
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_ndjson_upserts_and_reports_row_errors(self):
+        body = '\n'.join([
+            json.dumps(self._record('US00000001', 'Updated title')),
+            json.dumps(self._record('US00000002', 'Wireless charger')),
+            json.dumps({'patent_number': 'US00000003'}),
+            '{not json',
+            '',
+        ])
+        progress = self._import(body, 'application/x-ndjson', batch_size=2)
+
+        self.assertEqual([line.get('batch') for line in progress], [1, 2, None])
+        summary = progress[-1]
+        self.assertEqual(
+            {key: summary[key] for key in ('done', 'rows', 'created', 'updated', 'failed')},
+            {'done': True, 'rows': 4, 'created': 1, 'updated': 1, 'failed': 2},
+        )
+        self.assertEqual([error['row'] for error in progress[1]['errors']], [3, 4])
+        self.assertIn('title', progress[1]['errors'][0]['errors'])
+        self.assertEqual(Patent.objects.get(patent_number='US00000001').title, 'Updated title')
+        self.assertEqual(Patent.objects.count(), 2)
+
+        search = self.client.get('/api/patents/', {'q': 'wireless'})
+        self.assertEqual([p['patent_number'] for p in search.data['results']], ['US00000002'])
+
+    def test_database_error_is_reported_and_later_batches_are_written(self):
+        bulk_create = Patent.objects.bulk_create
+        calls = []
+
+        def failing_first(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise DatabaseError('database is locked')
+            return bulk_create(*args, **kwargs)
+
+        body = '\n'.join(
+            json.dumps(self._record(f'US2000000{n}', f'Patent {n}')) for n in range(3)
+        )
+        with mock.patch.object(Patent.objects, 'bulk_create', side_effect=failing_first):
+            progress = self._import(body, 'application/x-ndjson', batch_size=2)
+
+        self.assertEqual(progress[0]['error'], 'Database error: database is locked')
+        self.assertEqual(progress[0]['failed'], 2)
+        self.assertNotIn('error', progress[1])
+        summary = progress[-1]
+        self.assertEqual(
+            {key: summary[key] for key in ('done', 'rows', 'created', 'failed')},
+            {'done': True, 'rows': 3, 'created': 1, 'failed': 2},
+        )
+        self.assertEqual(
+            list(Patent.objects.filter(patent_number__startswith='US2').values_list(
+                'patent_number', flat=True
+            )),
+            ['US20000002'],
+        )
+
+    def test_json_array(self):
+        body = json.dumps([self._record(f'US1000000{n}', f'Patent {n}') for n in range(3)])
+        summary = self._import(body, 'application/json')[-1]
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(Patent.objects.count(), 4)
+
+    def test_rejects_non_array_json(self):
+        response = self.client.post(self.URL, {'patent_number': 'US1'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class LoadTrizTests(TestCase):
+    """load_triz makes the reference tables match its source."""
+
+    def _load(self):
+        stderr = io.StringIO()
+        call_command('load_triz', stdout=io.StringIO(), stderr=stderr)
+        return stderr.getvalue()
+
+    def _snapshot(self):
+        return (
+            sorted(TrizPrinciple.objects.values_list('number', 'name')),
+            sorted(EngineeringParameter.objects.values_list('number', 'name')),
+            sorted(
+                ContradictionMatrix.principles.through.objects.values_list(
+                    'contradictionmatrix__improving_parameter__number',
+                    'contradictionmatrix__worsening_parameter__number',
+                    'trizprinciple__number',
+                )
+            ),
+        )
+
+    def test_reloading_is_idempotent(self):
+        self._load()
+        loaded = self._snapshot()
+        self.assertEqual(len(loaded[0]), 40)
+        self.assertTrue(loaded[2])
+        self._load()
+        self.assertEqual(self._snapshot(), loaded)
+
+    def test_rows_missing_from_the_source_are_removed_unless_in_use(self):
+        self._load()
+        loaded = self._snapshot()
+        cells = ContradictionMatrix.objects.count()
+
+        TrizPrinciple.objects.create(number=99, name='Stale', description='', examples='')
+        used_principle = TrizPrinciple.objects.create(
+            number=98, name='Used', description='', examples=''
+        )
+        stale_parameter = EngineeringParameter.objects.create(
+            number=99, name='Stale', description=''
+        )
+        used_parameter = EngineeringParameter.objects.create(
+            number=98, name='Used', description=''
+        )
+        first = EngineeringParameter.objects.get(number=1)
+        ContradictionMatrix.objects.create(
+            improving_parameter=first, worsening_parameter=stale_parameter
+        )
+        existing = set(
+            ContradictionMatrix.objects.values_list(
+                'improving_parameter__number', 'worsening_parameter__number'
+            )
+        )
+        improving, worsening = next(
+            (i, w) for i in range(1, 40) for w in range(1, 40) if (i, w) not in existing
+        )
+        ContradictionMatrix.objects.create(
+            improving_parameter=EngineeringParameter.objects.get(number=improving),
+            worsening_parameter=EngineeringParameter.objects.get(number=worsening),
+        ).principles.add(used_principle)
+        patent = Patent.objects.create(
+            patent_number='US00000001',
+            title='Pump',
+            abstract='',
+            filing_date=date(2020, 1, 1),
+            publication_date=date(2021, 1, 1),
+            inventors='Inventor',
+            assignee='Assignee',
+        )
+        PatentAnalysis.objects.create(
+            patent=patent, improving_parameter=used_parameter, worsening_parameter=first
+        ).applied_principles.add(used_principle)
+
+        warnings = self._load()
+
+        self.assertEqual(ContradictionMatrix.objects.count(), cells)
+        self.assertEqual(self._snapshot()[2], loaded[2])
+        self.assertFalse(TrizPrinciple.objects.filter(number=99).exists())
+        self.assertFalse(EngineeringParameter.objects.filter(number=99).exists())
+        self.assertTrue(TrizPrinciple.objects.filter(number=98).exists())
+        self.assertTrue(EngineeringParameter.objects.filter(number=98).exists())
+        self.assertIn('[98]', warnings)
+
+
+class ExportTests(TestCase):
+    """Streaming NDJSON/CSV exports."""
+
+    def setUp(self):
+        self.client = APIClient()
+        improving = EngineeringParameter.objects.create(number=9, name='Speed', description='')
+        worsening = EngineeringParameter.objects.create(number=1, name='Weight', description='')
+        principles = [
+            TrizPrinciple.objects.create(number=n, name=f'Principle {n}', description='', examples='')
+            for n in (15, 1)
+        ]
+        for n, title in enumerate(['Wireless sensor', 'Pump', 'Valve']):
+            patent = Patent.objects.create(
+                patent_number=f'US{n:08d}',
+                title=title,
+                abstract='',
+                filing_date=date(2020, 1, 1),
+                publication_date=date(2021, 1, 1),
+                inventors='Inventor',
+                assignee='Assignee',
+            )
+            analysis = PatentAnalysis.objects.create(
+                patent=patent, improving_parameter=improving, worsening_parameter=worsening
+            )
+            analysis.applied_principles.add(*principles)
+
+    def _content(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_patents_ndjson_uses_list_filters(self):
+        content = self._content('/api/patents/export/', {'q': 'pump'})
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Pump'])
+        self.assertEqual(rows[0]['filing_date'], '2020-01-01')
+
+    def test_patents_csv_newest_first(self):
+        with self.assertNumQueries(1):
+            content = self._content('/api/patents/export/', {'file_format': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['title'] for row in rows], ['Valve', 'Pump', 'Wireless sensor'])
+
+    def test_analyses_export(self):
+        with self.assertNumQueries(2):
+            content = self._content('/api/analyses/export/', {'file_format': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['patent_number'], 'US00000002')
+        self.assertEqual(rows[0]['applied_principles'], '1;15')
+        self.assertEqual(rows[0]['improving_parameter'], '9')
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/patents/export/', {'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncAnalyzeTests(TestCase):
+    """The async analyze view, through the async test client."""
+
+    async def test_analyze_file_url(self):
+        response = await self.async_client.post(
+            '/api/patents/analyze/',
+            {'file_url': 'https://example.com/patent.pdf'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['fileUrl'], 'https://example.com/patent.pdf')
+        self.assertTrue(1 <= len(data['contradictions']) <= 3)
+
+    async def test_analyze_stored_patent(self):
+        patent = await Patent.objects.acreate(
+            patent_number='US00000001',
+            title='Pump',
+            abstract='',
+            filing_date=date(2020, 1, 1),
+            publication_date=date(2021, 1, 1),
+            inventors='Inventor',
+            assignee='Assignee',
+            pdf_file='https://example.com/pump.pdf',
+        )
+        response = await self.async_client.post('/api/analyze-patent/', {'patent': patent.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['metadata']['patent_number'], 'US00000001')
+
+        missing = await self.async_client.post('/api/analyze-patent/', {'patent': patent.pk + 1})
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_analyze_requires_a_file(self):
+        response = await self.async_client.post('/api/analyze-patent/', {})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'No file or file URL provided'})
+
+
+class DatabaseProfileStressTests(SimpleTestCase):
+    """
+    Readers and queued writers hammer a file database with each database
+    profile for a few seconds; none may fail with "database is locked", and
+    each profile must sustain a minimum throughput.
+    """
+
+    READERS = 8
+    WRITERS = 4
+    DURATION = 2.0
+    ROWS_PER_WRITE = 50
+    # Floors far below what either profile reaches on a laptop, so only a
+    # stalled workload fails
+    MIN_READS_PER_SECOND = 50
+    MIN_WRITES_PER_SECOND = 5
+
+    def test_sustained_mixed_read_write_throughput(self):
+        for profile, journal_mode in [('default', 'delete'), ('concurrent', 'wal')]:
+            with self.subTest(profile=profile), tempfile.TemporaryDirectory() as directory:
+                result = run_mixed_workload(
+                    profile,
+                    directory,
+                    readers=self.READERS,
+                    writers=self.WRITERS,
+                    duration=self.DURATION,
+                    rows_per_write=self.ROWS_PER_WRITE,
+                )
+                self.assertEqual(result['errors'], [])
+                self.assertEqual(result['journal_mode'], journal_mode)
+                self.assertEqual(result['rows'], result['writes'] * self.ROWS_PER_WRITE)
+                self.assertGreater(result['reads_per_second'], self.MIN_READS_PER_SECOND)
+                self.assertGreater(result['writes_per_second'], self.MIN_WRITES_PER_SECOND)
@@ -9,6 +9,7 @@ from .views import (
     PatentCitationViewSet,
     health_check
 )
+from .async_views import analyze_patent
 
 router = DefaultRouter()
 router.register(r'triz/principles', TrizPrincipleViewSet)
@@ -19,7 +20,9 @@ router.register(r'analyses', PatentAnalysisViewSet)
 router.register(r'citations', PatentCitationViewSet)
 
 urlpatterns = [
+    # Async, ahead of the router's patents/<pk>/ routes
+    path('patents/analyze/', analyze_patent, name='patent_analyze'),
     path('', include(router.urls)),
     path('health/', health_check, name='health_check'),
-    path('analyze-patent/', PatentViewSet.as_view({'post': 'analyze'}), name='analyze_patent'),
+    path('analyze-patent/', analyze_patent, name='analyze_patent'),
 ] 
\ No newline at end of file
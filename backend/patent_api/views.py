@@ -2,8 +2,7 @@ from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action, parser_classes
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.shortcuts import get_object_or_404
+from rest_framework.parsers import MultiPartParser, FormParser
 from .models import TrizPrinciple, EngineeringParameter, ContradictionMatrix, Patent, PatentAnalysis, PatentCitation
 from .serializers import (
     TrizPrincipleSerializer,
@@ -13,37 +12,107 @@ from .serializers import (
     PatentAnalysisSerializer,
     PatentCitationSerializer
 )
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from .analysis import mock_cdn_url
+from .bulk_import import (
+    IMPORT_BATCH_SIZE,
+    MAX_IMPORT_BATCH_SIZE,
+    import_patents,
+    read_json_array,
+    read_ndjson,
+)
+from .cooccurrence import get_principle_cooccurrence
+from .export import (
+    ANALYSIS_EXPORT_COLUMNS,
+    PATENT_EXPORT_COLUMNS,
+    analysis_rows,
+    export_response,
+    patent_rows,
+)
+from .matrix_snapshot import get_matrix_snapshot
+from .reference_cache import ReferenceCacheMixin
+from .renderers import ORJSONParser
+from .search import fts_available, search_patents
+from services.triz.contradiction_solver import solve_contradiction
 import json
-from datetime import datetime
-import random
+import orjson
 
 # Health check endpoint
 def health_check(request):
     return JsonResponse({"status": "ok", "message": "Patent Analytics Hub API is running"})
 
+# Querysets that load everything their serializers nest in a fixed number of
+# queries, whatever the number of rows
+MATRIX_QUERYSET = ContradictionMatrix.objects.select_related(
+    'improving_parameter', 'worsening_parameter'
+).prefetch_related('principles')
+
+ANALYSIS_QUERYSET = PatentAnalysis.objects.select_related(
+    'patent', 'improving_parameter', 'worsening_parameter'
+).prefetch_related('applied_principles')
+
+CITATION_QUERYSET = PatentCitation.objects.select_related(
+    'citing_patent', 'cited_patent'
+)
+
 # Create your views here.
 
-class TrizPrincipleViewSet(viewsets.ModelViewSet):
+class TrizPrincipleViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows TRIZ principles to be viewed.
     """
     queryset = TrizPrinciple.objects.all().order_by('number')
     serializer_class = TrizPrincipleSerializer
+    # 40 fixed rows, returned whole
+    pagination_class = None
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """
+        Principles most often used together with this one, across the
+        contradiction matrix and stored analyses. Accepts ?limit=<n>.
+        """
+        principle = self.get_object()
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response(
+                {"error": "limit must be a number"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class EngineeringParameterViewSet(viewsets.ModelViewSet):
+        related = get_principle_cooccurrence().related(principle.number, limit)
+        principles = TrizPrinciple.objects.in_bulk(
+            [entry['principle'] for entry in related], field_name='number'
+        )
+        return Response([
+            {
+                "principle": TrizPrincipleSerializer(principles[entry['principle']]).data,
+                "count": entry['count'],
+            }
+            for entry in related
+            if entry['principle'] in principles
+        ])
+
+class EngineeringParameterViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows engineering parameters to be viewed.
     """
     queryset = EngineeringParameter.objects.all().order_by('number')
     serializer_class = EngineeringParameterSerializer
+    # 39 fixed rows, returned whole
+    pagination_class = None
 
-class ContradictionMatrixViewSet(viewsets.ModelViewSet):
+class ContradictionMatrixViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows contradiction matrix to be viewed.
     """
-    queryset = ContradictionMatrix.objects.all()
+    queryset = MATRIX_QUERYSET
     serializer_class = ContradictionMatrixSerializer
+    cached_actions = (
+        'list', 'retrieve', 'get_principles', 'cells', 'by_principle',
+        'by_principle_pair', 'by_parameter', 'what_if',
+    )
 
     @action(detail=False, methods=['get'])
     def get_principles(self, request):
@@ -56,14 +125,172 @@ class ContradictionMatrixViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        contradiction = get_object_or_404(
-            ContradictionMatrix,
-            improving_parameter__number=improving,
-            worsening_parameter__number=worsening
+        try:
+            contradiction = get_matrix_snapshot().cell(improving, worsening)
+        except ValueError:
+            return Response(
+                {"error": "Parameters must be numbers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if contradiction is None:
+            raise Http404("No contradiction matches the given parameters.")
+
+        return Response(contradiction)
+
+    def _matrix_engine(self):
+        """Bitmask engine from the materialized matrix snapshot"""
+        return get_matrix_snapshot().engine
+
+    def _cells_response(self, cells):
+        """Render (improving, worsening) pairs with their principles"""
+        index = self._matrix_engine().reverse_index
+        cells = [
+            {
+                "improving": improving,
+                "worsening": worsening,
+                "principles": list(index.principles(improving, worsening)),
+            }
+            for improving, worsening in cells
+        ]
+        return Response({"cells": cells, "count": len(cells)})
+
+    @action(detail=False, methods=['get'])
+    def cells(self, request):
+        """
+        Find all (improving, worsening) cells that recommend every principle
+        passed as ?principle=<number> (repeatable).
+        """
+        principles = request.query_params.getlist('principle')
+        if not principles:
+            return Response(
+                {"error": "At least one principle is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            cells = self._matrix_engine().cells_with_principles(principles)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return self._cells_response(cells)
+
+    @action(detail=False, methods=['get'], url_path=r'by_principle/(?P<principle>\d+)')
+    def by_principle(self, request, principle=None):
+        """Contradictions resolved by a principle, from the reverse index"""
+        index = self._matrix_engine().reverse_index
+        try:
+            cells = index.cells_for_principle(principle)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._cells_response(cells)
+
+    @action(
+        detail=False, methods=['get'],
+        url_path=r'by_principle_pair/(?P<first>\d+)/(?P<second>\d+)'
+    )
+    def by_principle_pair(self, request, first=None, second=None):
+        """Contradictions where two principles are recommended together"""
+        index = self._matrix_engine().reverse_index
+        try:
+            cells = index.cells_for_principle_pair(first, second)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._cells_response(cells)
+
+    @action(detail=False, methods=['get'], url_path=r'by_parameter/(?P<parameter>\d+)')
+    def by_parameter(self, request, parameter=None):
+        """
+        Row (parameter improving) and column (parameter worsening) of the
+        matrix, each ordered by how many principles a cell offers.
+        """
+        index = self._matrix_engine().reverse_index
+        try:
+            improving, worsening = index.improving_cells(parameter), index.worsening_cells(parameter)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "improving": self._cells_response(improving).data,
+            "worsening": self._cells_response(worsening).data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def what_if(self, request):
+        """
+        Explore one parameter's whole row (?improving=<n>) or column
+        (?worsening=<n>): opposite parameters ranked by principle coverage,
+        principles ranked by how many cells they appear in, and a greedy set
+        cover of principles. Optional ?limit= and ?max_principles=.
+        """
+        improving = request.query_params.get('improving')
+        worsening = request.query_params.get('worsening')
+        if bool(improving) == bool(worsening):
+            return Response(
+                {"error": "Exactly one of improving or worsening is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = request.query_params.get('limit')
+            max_principles = request.query_params.get('max_principles')
+            result = solve_contradiction(
+                self._matrix_engine(),
+                improving or worsening,
+                role='improving' if improving else 'worsening',
+                limit=int(limit) if limit else None,
+                max_principles=int(max_principles) if max_principles else None,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result)
+
+    @action(detail=False, methods=['post'])
+    def rank_principles(self, request):
+        """
+        Rank principles across several contradictions in one request.
+
+        Expects {"contradictions": [{"improving": 9, "worsening": 10, "weight": 2}, ...]}
+        where "weight" is optional and defaults to 1.
+        """
+        contradictions = request.data.get('contradictions')
+        if not isinstance(contradictions, list) or not contradictions:
+            return Response(
+                {"error": "A non-empty list of contradictions is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        engine = self._matrix_engine()
+        try:
+            pairs = [(c['improving'], c['worsening']) for c in contradictions]
+            weights = [float(c.get('weight', 1)) for c in contradictions]
+            ranking = engine.rank_principles(pairs, weights)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            return Response(
+                {"error": f"Invalid contradiction: {e}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        principles = TrizPrinciple.objects.in_bulk(
+            [entry['principle'] for entry in ranking], field_name='number'
         )
-        
-        serializer = self.get_serializer(contradiction)
-        return Response(serializer.data)
+        for entry in ranking:
+            principle = principles.get(entry['principle'])
+            entry['principle'] = (
+                TrizPrincipleSerializer(principle).data if principle
+                else {"number": entry['principle']}
+            )
+
+        return Response({
+            "contradictions": [
+                {
+                    "improving": int(improving),
+                    "worsening": int(worsening),
+                    "principles": engine.lookup(improving, worsening),
+                }
+                for improving, worsening in pairs
+            ],
+            "principles": ranking,
+        })
 
 class PatentViewSet(viewsets.ModelViewSet):
     """
@@ -71,7 +298,40 @@ class PatentViewSet(viewsets.ModelViewSet):
     """
     queryset = Patent.objects.all()
     serializer_class = PatentSerializer
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [ORJSONParser, MultiPartParser, FormParser]
+
+    def get_queryset(self):
+        """
+        Full-text search with ?q=<words> on list requests. Every word must
+        match a prefix of a word in the title, abstract, inventors or
+        assignee, and results are ordered by BM25 relevance.
+        """
+        queryset = super().get_queryset()
+        query = self.request.query_params.get('q')
+        if query and self.action in ('list', 'export'):
+            queryset = search_patents(queryset, query)
+            if fts_available():
+                self.pagination_ordering = ('rank', '-id')
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every patent matching the list filters (?q=) as
+        ?file_format=ndjson (default) or csv, in list order.
+        """
+        queryset = self.get_queryset()
+        if not queryset.query.order_by:
+            queryset = queryset.order_by('-id')
+        try:
+            return export_response(
+                PATENT_EXPORT_COLUMNS,
+                patent_rows(queryset),
+                request.query_params.get('file_format', 'ndjson'),
+                'patents',
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     def create(self, request, *args, **kwargs):
         """
@@ -154,8 +414,7 @@ class PatentViewSet(viewsets.ModelViewSet):
     
     def _generate_mock_cdn_url(self, filename):
         """Generate a mock CDN URL for testing"""
-        timestamp = int(datetime.now().timestamp())
-        return f"https://mock-cdn.example.com/patents/{timestamp}-{filename}"
+        return mock_cdn_url(filename)
     
     def _process_analysis(self, patent, analysis_data):
         """Process and store analysis data"""
@@ -168,98 +427,90 @@ class PatentViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def analyses(self, request, pk=None):
         patent = self.get_object()
-        analyses = PatentAnalysis.objects.filter(patent=patent)
+        analyses = ANALYSIS_QUERYSET.filter(patent=patent)
         serializer = PatentAnalysisSerializer(analyses, many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def citations(self, request, pk=None):
         patent = self.get_object()
-        citations = PatentCitation.objects.filter(citing_patent=patent)
+        citations = CITATION_QUERYSET.filter(citing_patent=patent)
         serializer = PatentCitationSerializer(citations, many=True)
         return Response(serializer.data)
-        
-    @action(detail=False, methods=['post'])
-    def analyze(self, request):
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
         """
-        Analyze a patent PDF and extract TRIZ contradictions.
-        This is a mock implementation that returns random contradictions.
+        Create or update many patents in one request, matched on
+        patent_number. The body is NDJSON (application/x-ndjson) or a JSON
+        array; ?batch_size=<n> sets how many rows are validated and written
+        together. The response streams one NDJSON progress line per batch,
+        with per-row errors, then a summary line.
         """
-        # Mock implementation for testing
-        # In a real system, this would use a language model to analyze the patent
-        
-        # Check if we have a file URL
-        file_url = request.data.get('file_url')
-        
-        # Or if we have a direct file upload
-        if not file_url and 'file' in request.FILES:
-            # Generate a mock URL for the uploaded file
-            filename = request.FILES['file'].name
-            file_url = self._generate_mock_cdn_url(filename)
-        
-        if not file_url:
+        try:
+            batch_size = int(request.query_params.get('batch_size', IMPORT_BATCH_SIZE))
+        except ValueError:
             return Response(
-                {"error": "No file or file URL provided"},
+                {"error": "batch_size must be a number"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-            
-        # Mock response with random contradictions
-        improving_params = ["Speed", "Reliability", "Accuracy", "Strength", "Power"]
-        worsening_params = ["Weight", "Complexity", "Cost", "Size", "Energy consumption"]
-        principles = [
-            "Segmentation", "Asymmetry", "Merging", "Nested doll", 
-            "Feedback", "Intermediary", "Dynamicity", "Mechanical vibration",
-            "Preliminary action", "Composite materials", "Counterweight"
-        ]
-        
-        contradictions = []
-        num_contradictions = random.randint(1, 3)
-        
-        for _ in range(num_contradictions):
-            improving = random.choice(improving_params)
-            worsening = random.choice(worsening_params)
-            
-            # Make sure they're different
-            while improving == worsening:
-                worsening = random.choice(worsening_params)
-                
-            # Select 1-4 random principles
-            num_principles = random.randint(1, 4)
-            selected_principles = random.sample(principles, num_principles)
-            
-            contradictions.append({
-                "contradiction": {
-                    "improving_parameter": improving,
-                    "worsening_parameter": worsening
-                },
-                "suggested_principles": selected_principles
-            })
-            
-        # Create a mock response with the file URL
-        response_data = {
-            "fileUrl": file_url,
-            "contradictions": contradictions,
-            "metadata": {
-                "title": f"Patent {datetime.now().strftime('%Y%m%d%H%M%S')}",
-                "abstract": "This patent describes an innovative solution using TRIZ principles.",
-                "inventors": "John Smith, Jane Doe",
-                "assignee": "Tech Innovations Inc.",
-                "patent_number": f"US{random.randint(10000000, 99999999)}"
-            }
-        }
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        batch_size = max(1, min(batch_size, MAX_IMPORT_BATCH_SIZE))
+
+        # Read the raw stream: request.data would hold the whole body in
+        # memory and is capped at DATA_UPLOAD_MAX_MEMORY_SIZE
+        stream = request.stream
+        if request.content_type.startswith('application/x-ndjson'):
+            rows = read_ndjson(stream) if stream is not None else iter(())
+        elif request.content_type.startswith('application/json'):
+            try:
+                records = orjson.loads(stream.read()) if stream is not None else []
+            except orjson.JSONDecodeError as e:
+                return Response(
+                    {"error": f"Invalid JSON: {e}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not isinstance(records, list):
+                return Response(
+                    {"error": "Expected a JSON array of patents"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            rows = read_json_array(records)
+        else:
+            return Response(
+                {"error": "Unsupported content type"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return StreamingHttpResponse(
+            import_patents(rows, batch_size), content_type='application/x-ndjson'
+        )
 
 class PatentAnalysisViewSet(viewsets.ModelViewSet):
     """
     API endpoint that allows patent analyses to be viewed or edited.
     """
-    queryset = PatentAnalysis.objects.all()
+    queryset = ANALYSIS_QUERYSET
     serializer_class = PatentAnalysisSerializer
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every analysis, newest first, as ?file_format=ndjson (default)
+        or csv. Parameters and principles are given by their TRIZ numbers.
+        """
+        try:
+            return export_response(
+                ANALYSIS_EXPORT_COLUMNS,
+                analysis_rows(self.get_queryset().order_by('-id')),
+                request.query_params.get('file_format', 'ndjson'),
+                'analyses',
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 class PatentCitationViewSet(viewsets.ModelViewSet):
     """
     API endpoint that allows patent citations to be viewed or edited.
     """
-    queryset = PatentCitation.objects.all()
+    queryset = CITATION_QUERYSET
     serializer_class = PatentCitationSerializer
@@ -0,0 +1,391 @@
+"""
+Append-only, segmented log of analysis records.
+
+The log is the Flask service's recovery journal: every stored, updated or
+deleted analysis is appended here as well as written to the SQLite store, and
+a newly created store is rebuilt by replaying it. Reads are served by the store.
+
+Each record is written once to the end of the active segment file and never
+rewritten in place. Updating an analysis appends a new version, and deleting
+one appends a tombstone. When a segment reaches SEGMENT_SIZE a new one is
+started. Compaction copies only the live versions into fresh segments and
+removes the old ones once most of the log is superseded.
+
+Record layout (little-endian):
+
+    header   "<BIIHH"  flags, CRC32 of the body, payload length,
+                       id length, patent_id length
+    body     id, patent_id (UTF-8) and the payload: compact JSON,
+             zlib-compressed when that saves space
+
+The id and patent_id sit in front of the payload, so opening the log builds
+its offset index (analysis id -> location of the newest version) by reading
+headers and skipping payloads. The index tells scans and compaction which
+records are live. A torn record at the end of the last
+segment, left by a crash mid-write, is truncated away. Tombstones are kept
+through compaction, so the log remembers which analyses were deleted even when
+they also exist in seed data outside it.
+
+Several processes may share a log directory. Every operation holds an
+exclusive ``fcntl`` lock on the directory's LOCK file, and a process whose
+index is stale (the segment files changed since its last operation, because
+another process appended or compacted) rebuilds the index first. Without
+``fcntl`` (Windows) only one process may use a log directory.
+"""
+
+import contextlib
+import datetime
+import glob
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process locking
+    fcntl = None
+
+HEADER = struct.Struct("<BIIHH")
+
+FLAG_TOMBSTONE = 0x01
+FLAG_COMPRESSED = 0x02
+
+SEGMENT_SIZE = 8 * 1024 * 1024
+SEGMENT_PATTERN = "segment-{:08d}.log"
+LOCK_FILE = "LOCK"
+
+# Payloads shorter than this are stored uncompressed
+COMPRESS_THRESHOLD = 256
+
+# Compact once superseded records make up this share of a log of at least
+# COMPACT_MIN_BYTES
+COMPACT_RATIO = 0.5
+COMPACT_MIN_BYTES = 1024 * 1024
+
+# (segment number, offset of the record header, total record length)
+Location = Tuple[int, int, int]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode(record_id: str, patent_id: str, record: Optional[Dict[str, Any]]) -> bytes:
+    """Encode one record, or a tombstone when record is None"""
+    flags = 0
+    payload = b""
+    if record is None:
+        flags |= FLAG_TOMBSTONE
+    else:
+        payload = json.dumps(
+            record, separators=(",", ":"), default=_json_default
+        ).encode("utf-8")
+        if len(payload) >= COMPRESS_THRESHOLD:
+            compressed = zlib.compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= FLAG_COMPRESSED
+    record_id_bytes = record_id.encode("utf-8")
+    patent_id_bytes = (patent_id or "").encode("utf-8")
+    body = record_id_bytes + patent_id_bytes + payload
+    return (
+        HEADER.pack(
+            flags,
+            zlib.crc32(body),
+            len(payload),
+            len(record_id_bytes),
+            len(patent_id_bytes),
+        )
+        + body
+    )
+
+
+def _decode_payload(flags: int, payload: bytes) -> Dict[str, Any]:
+    if flags & FLAG_COMPRESSED:
+        payload = zlib.decompress(payload)
+    return json.loads(payload)
+
+
+class AnalysisLog:
+    """
+    Analysis records in append-only segment files with an in-memory index.
+
+    Args:
+        directory: Directory holding the segment files, created if missing
+        segment_size: Size at which the active segment is closed
+    """
+
+    def __init__(self, directory: str, segment_size: int = SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._locations: Dict[str, Location] = {}
+        # Deleted analysis id -> tombstone length
+        self._deleted: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._live_bytes = 0
+        self._segments: List[int] = []
+        self._lock_file = open(os.path.join(directory, LOCK_FILE), "a")
+        self._lock_depth = 0
+        # Segment files and the size of the last one as of this process's
+        # last operation; None until the index is first loaded
+        self._signature: Optional[Tuple[Tuple[str, ...], int]] = None
+        with self._locked():
+            pass
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._locations
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, SEGMENT_PATTERN.format(segment))
+
+    def _disk_signature(self) -> Tuple[Tuple[str, ...], int]:
+        paths = tuple(sorted(glob.glob(os.path.join(self.directory, "segment-*.log"))))
+        return paths, os.path.getsize(paths[-1]) if paths else 0
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Hold the thread lock and the inter-process file lock, reloading the
+        index first if another process changed the segments.
+        """
+        with self._lock:
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1:
+                    if fcntl is not None:
+                        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+                    if self._disk_signature() != self._signature:
+                        self._reset()
+                        self._load()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    self._signature = self._disk_signature()
+                    if fcntl is not None:
+                        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _reset(self) -> None:
+        self._locations.clear()
+        self._deleted.clear()
+        self._total_bytes = 0
+        self._live_bytes = 0
+
+    def _load(self) -> None:
+        """Build the index from the record headers of every segment"""
+        paths = sorted(glob.glob(os.path.join(self.directory, "segment-*.log")))
+        self._segments = [
+            int(os.path.basename(path)[len("segment-") : -len(".log")])
+            for path in paths
+        ]
+        for position, segment in enumerate(self._segments):
+            last = position == len(self._segments) - 1
+            with open(self._path(segment), "rb") as f:
+                offset = 0
+                while True:
+                    header = f.read(HEADER.size)
+                    if len(header) < HEADER.size:
+                        break
+                    flags, crc, payload_length, id_length, patent_length = (
+                        HEADER.unpack(header)
+                    )
+                    keys = f.read(id_length + patent_length)
+                    length = HEADER.size + id_length + patent_length + payload_length
+                    if len(keys) < id_length + patent_length:
+                        break
+                    if last:
+                        # Only the tail of the last segment can be torn, so
+                        # only its records are checked against their CRC
+                        payload = f.read(payload_length)
+                        if (
+                            len(payload) < payload_length
+                            or zlib.crc32(keys + payload) != crc
+                        ):
+                            break
+                    else:
+                        f.seek(payload_length, os.SEEK_CUR)
+                    record_id = keys[:id_length].decode("utf-8")
+                    if flags & FLAG_TOMBSTONE:
+                        self._apply_tombstone(record_id, length)
+                    else:
+                        self._apply(record_id, (segment, offset, length))
+                    self._total_bytes += length
+                    offset += length
+            if last and offset < os.path.getsize(self._path(segment)):
+                with open(self._path(segment), "r+b") as f:
+                    f.truncate(offset)
+
+    def _apply(self, record_id: str, location: Optional[Location]) -> None:
+        """Point the index at a record's newest version, or drop it"""
+        deleted = self._deleted.pop(record_id, None)
+        if deleted is not None:
+            self._live_bytes -= deleted
+        previous = self._locations.pop(record_id, None)
+        if previous is not None:
+            self._live_bytes -= previous[2]
+        if location is not None:
+            self._locations[record_id] = location
+            self._live_bytes += location[2]
+
+    def _apply_tombstone(self, record_id: str, length: int) -> None:
+        """Drop a record from the index and remember it was deleted"""
+        self._apply(record_id, None)
+        self._deleted[record_id] = length
+        self._live_bytes += length
+
+    def _write(self, data: bytes) -> Tuple[int, int]:
+        """Append encoded records to the active segment, rolling it if full"""
+        if not self._segments:
+            self._segments.append(1)
+        segment = self._segments[-1]
+        path = self._path(segment)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size and size + len(data) > self.segment_size:
+            segment += 1
+            self._segments.append(segment)
+            path = self._path(segment)
+            size = 0
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._total_bytes += len(data)
+        return segment, size
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Write a new version of an analysis record."""
+        data = _encode(record["id"], record.get("patent_id"), record)
+        with self._locked():
+            segment, offset = self._write(data)
+            self._apply(record["id"], (segment, offset, len(data)))
+            self.maybe_compact()
+
+    def delete(self, record_id: str) -> bool:
+        """
+        Write a tombstone for an analysis, returning whether it was in the log.
+
+        Analyses that were never written to the log, such as seed data, get a
+        tombstone too, so they stay deleted when the store is rebuilt.
+        """
+        with self._locked():
+            if record_id in self._deleted:
+                return False
+            existed = record_id in self._locations
+            data = _encode(record_id, "", None)
+            self._write(data)
+            self._apply_tombstone(record_id, len(data))
+            self.maybe_compact()
+            return existed
+
+    def deleted_ids(self) -> List[str]:
+        """Ids of the analyses whose newest record is a tombstone."""
+        with self._locked():
+            return list(self._deleted)
+
+    def scan(self) -> Iterator[Dict[str, Any]]:
+        """
+        Every live analysis, read sequentially segment by segment.
+
+        Superseded versions and tombstones are skipped without decoding. The
+        log stays locked until the iteration finishes, so consume it promptly.
+        """
+        with self._locked():
+            live = {location[:2] for location in self._locations.values()}
+            for segment in list(self._segments):
+                path = self._path(segment)
+                if not os.path.exists(path):
+                    continue
+                with open(path, "rb") as f:
+                    offset = 0
+                    while True:
+                        header = f.read(HEADER.size)
+                        if len(header) < HEADER.size:
+                            break
+                        flags, _, payload_length, id_length, patent_length = (
+                            HEADER.unpack(header)
+                        )
+                        length = HEADER.size + id_length + patent_length + payload_length
+                        if (segment, offset) in live:
+                            f.seek(id_length + patent_length, os.SEEK_CUR)
+                            yield _decode_payload(flags, f.read(payload_length))
+                        else:
+                            f.seek(length - HEADER.size, os.SEEK_CUR)
+                        offset += length
+
+    def maybe_compact(self) -> bool:
+        """Compact when superseded records dominate the log."""
+        with self._locked():
+            garbage = self._total_bytes - self._live_bytes
+            if (
+                self._total_bytes < COMPACT_MIN_BYTES
+                or garbage < self._total_bytes * COMPACT_RATIO
+            ):
+                return False
+            self.compact()
+            return True
+
+    def compact(self) -> None:
+        """
+        Rewrite the live records and tombstones into new segments and remove
+        the old ones.
+
+        The copies are written and synced before any old segment is removed,
+        oldest first, so a crash at any point leaves a log that loads to the
+        same records.
+        """
+        with self._locked():
+            old_segments = list(self._segments)
+            records = list(self.scan())
+            deleted = list(self._deleted)
+
+            self._segments = [old_segments[-1] + 1] if old_segments else []
+            self._reset()
+            for record in records:
+                data = _encode(record["id"], record.get("patent_id"), record)
+                segment, offset = self._write(data)
+                self._apply(record["id"], (segment, offset, len(data)))
+            for record_id in deleted:
+                data = _encode(record_id, "", None)
+                self._write(data)
+                self._apply_tombstone(record_id, len(data))
+
+            for segment in old_segments:
+                os.remove(self._path(segment))
+
+    def import_json_files(self, directory: str) -> List[Dict[str, Any]]:
+        """
+        Import analyses saved as one JSON file each by older versions.
+
+        Imported files are renamed to ``*.json.imported`` so they are only
+        imported once.
+
+        Args:
+            directory: Directory holding ``<analysis id>.json`` files
+
+        Returns:
+            The imported analysis records
+        """
+        imported = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            try:
+                with open(path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable analysis file {path}: {str(e)}")
+                continue
+            if not isinstance(record, dict) or "id" not in record:
+                continue
+            self.append(record)
+            imported.append(record)
+            os.replace(path, path + ".imported")
+        return imported
@@ -0,0 +1,98 @@
+"""
+"What-if" queries over a whole row or column of the contradiction matrix.
+
+Given a parameter to improve (or one that must not get worse), rank the
+opposite parameters by how many principles their cell offers, rank principles
+by how many of those cells they appear in, and pick a small set of principles
+that together cover every cell with a recommendation (greedy set cover).
+Everything runs on the bitmask engine's arrays, so a query over 39 cells and
+40 principles is a handful of NumPy operations.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .matrix_engine import PARAMETER_COUNT
+
+ROLES = ("improving", "worsening")
+
+
+def solve_contradiction(
+    engine,
+    parameter: Any,
+    role: str = "improving",
+    limit: Optional[int] = None,
+    max_principles: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Analyse one parameter's row (improving) or column (worsening).
+
+    Args:
+        engine: ContradictionMatrixEngine to query
+        parameter: Parameter number to improve, or to keep from worsening
+        role: "improving" to scan the row, "worsening" to scan the column
+        limit: Maximum number of opposite parameters to return
+        max_principles: Maximum number of principles in the selected cover
+
+    Returns:
+        Dictionary with the ranked opposite "parameters", the ranked
+        "principles" with their coverage, the greedy "cover" selection and the
+        opposite parameters it leaves "uncovered"
+    """
+    if role not in ROLES:
+        raise ValueError(f"Role must be one of: {', '.join(ROLES)}")
+    number = int(parameter)
+    if not 1 <= number <= PARAMETER_COUNT:
+        raise ValueError(f"Invalid engineering parameter number: {parameter}")
+
+    bits = engine.principle_bits()[1:, 1:, 1:]
+    # bits[k, n]: opposite parameter k + 1 has principle n + 1 in its cell
+    bits = bits[number - 1] if role == "improving" else bits[:, number - 1]
+    counts = bits.sum(axis=1)
+
+    opposite = np.flatnonzero(counts)
+    opposite = opposite[np.argsort(-counts[opposite], kind="stable")]
+    if limit is not None:
+        opposite = opposite[: max(limit, 0)]
+
+    coverage = bits.sum(axis=0)
+    ranked_principles = np.flatnonzero(coverage)
+    ranked_principles = ranked_principles[
+        np.argsort(-coverage[ranked_principles], kind="stable")
+    ]
+
+    cover = []
+    uncovered = counts > 0
+    while uncovered.any() and (max_principles is None or len(cover) < max_principles):
+        gains = bits[uncovered].sum(axis=0)
+        best = int(np.argmax(gains))
+        if not gains[best]:
+            break
+        covered_now = uncovered & bits[:, best]
+        cover.append(
+            {
+                "principle": best + 1,
+                "covers": [int(k) + 1 for k in np.flatnonzero(covered_now)],
+            }
+        )
+        uncovered &= ~covered_now
+
+    return {
+        "parameter": number,
+        "role": role,
+        "parameters": [
+            {
+                "parameter": int(k) + 1,
+                "principles": [int(n) + 1 for n in np.flatnonzero(bits[k])],
+                "count": int(counts[k]),
+            }
+            for k in opposite
+        ],
+        "principles": [
+            {"principle": int(n) + 1, "coverage": int(coverage[n])}
+            for n in ranked_principles
+        ],
+        "cover": cover,
+        "uncovered": [int(k) + 1 for k in np.flatnonzero(uncovered)],
+    }
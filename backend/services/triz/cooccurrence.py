@@ -0,0 +1,144 @@
+"""
+Principle co-occurrence counts for "often used together with" recommendations.
+
+``counts[a - 1, b - 1]`` is the number of principle sets that contain both
+principle ``a`` and principle ``b``; the diagonal holds how often each principle
+appears at all. The contradiction matrix contributes one set per cell and is
+added in a single matrix product. Analyses contribute keyed sets that can be
+replaced or removed one at a time, so storing a new analysis only adds its own
+outer product instead of recomputing the whole matrix.
+"""
+
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Union
+
+import numpy as np
+
+from .matrix_engine import PRINCIPLE_COUNT
+from .triz_constants import TRIZ_PRINCIPLES
+
+
+def _principle_vectors(principle_sets: Iterable[Iterable[Any]]) -> np.ndarray:
+    """One row of 0/1 flags per principle set"""
+    principle_sets = list(principle_sets)
+    vectors = np.zeros((len(principle_sets), PRINCIPLE_COUNT), dtype=np.int64)
+    for row, principles in enumerate(principle_sets):
+        for principle in principles:
+            number = int(principle)
+            if not 1 <= number <= PRINCIPLE_COUNT:
+                raise ValueError(f"Invalid TRIZ principle number: {principle}")
+            vectors[row, number - 1] = 1
+    return vectors
+
+
+# Principle numbers by lower-cased name, for LLM output that names principles
+_PRINCIPLE_NUMBERS_BY_NAME = {
+    principle["name"].lower(): number for number, principle in TRIZ_PRINCIPLES.items()
+}
+
+
+def analysis_principle_sets(extracted_data: Union[str, Dict[str, Any], None]) -> List[List[int]]:
+    """
+    Get the principles used together in each contradiction of an analysis.
+
+    Args:
+        extracted_data: The analysis extracted_data as a dict or JSON string
+
+    Returns:
+        List of principle number lists, one per contradiction
+    """
+    if not extracted_data:
+        return []
+    if isinstance(extracted_data, str):
+        extracted_data = json.loads(extracted_data)
+
+    principle_sets = []
+    for contradiction in extracted_data.get("triz_contradictions") or []:
+        if not isinstance(contradiction, dict):
+            continue
+        principles = contradiction.get("principles") or contradiction.get(
+            "suggested_principles", []
+        )
+        numbers = set()
+        for principle in principles:
+            principle = str(principle).strip()
+            if principle.isdigit():
+                numbers.add(int(principle))
+            elif principle.lower() in _PRINCIPLE_NUMBERS_BY_NAME:
+                numbers.add(_PRINCIPLE_NUMBERS_BY_NAME[principle.lower()])
+        if numbers:
+            principle_sets.append(sorted(numbers))
+    return principle_sets
+
+
+class PrincipleCooccurrence:
+    """
+    40x40 principle co-occurrence matrix with incremental updates.
+    """
+
+    def __init__(self):
+        self._counts = np.zeros((PRINCIPLE_COUNT, PRINCIPLE_COUNT), dtype=np.int64)
+        self._entries: Dict[Any, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_matrix(cls, engine):
+        """Start from the co-occurrences of a contradiction matrix engine's cells."""
+        cooccurrence = cls()
+        bits = engine.principle_bits()[..., 1:].reshape(-1, PRINCIPLE_COUNT)
+        bits = bits.astype(np.int64)
+        cooccurrence._counts += bits.T @ bits
+        return cooccurrence
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Read-only view of the co-occurrence counts."""
+        view = self._counts.view()
+        view.flags.writeable = False
+        return view
+
+    def update(self, key: Any, principle_sets: Iterable[Iterable[Any]]) -> None:
+        """
+        Set the principle sets recorded for a key, e.g. one analysis.
+
+        Any sets previously recorded under the key are subtracted first, so
+        calling this again after an edit keeps the counts exact.
+
+        Args:
+            key: Identifier of the source, such as an analysis id
+            principle_sets: Principle numbers used together, one iterable per set
+        """
+        vectors = _principle_vectors(principle_sets)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._counts -= previous.T @ previous
+            if len(vectors):
+                self._counts += vectors.T @ vectors
+                self._entries[key] = vectors
+
+    def remove(self, key: Any) -> None:
+        """Remove the principle sets recorded for a key."""
+        self.update(key, [])
+
+    def related(self, principle: Any, limit: int = 10) -> List[Dict[str, int]]:
+        """
+        Principles most often used together with the given principle.
+
+        Args:
+            principle: Principle number
+            limit: Maximum number of principles to return
+
+        Returns:
+            List of ``{"principle", "count"}`` dictionaries, most frequent first
+        """
+        number = int(principle)
+        if not 1 <= number <= PRINCIPLE_COUNT:
+            raise ValueError(f"Invalid TRIZ principle number: {principle}")
+        row = self._counts[number - 1].copy()
+        row[number - 1] = 0
+        ranked = np.argsort(-row, kind="stable")[: max(limit, 0)]
+        return [
+            {"principle": int(i) + 1, "count": int(row[i])} for i in ranked if row[i]
+        ]
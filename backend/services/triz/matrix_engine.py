@@ -0,0 +1,276 @@
+"""
+Dense contradiction matrix engine backed by principle bitmasks.
+
+The matrix is stored as a NumPy array of unsigned 64-bit integers indexed
+directly by parameter number (``cells[improving, worsening]``). Bit ``n`` of a
+cell is set when principle ``n`` is recommended for that contradiction, so a
+cell lookup is a single array read and "which cells recommend principle X"
+style questions become vectorized bitwise operations over the whole matrix.
+"""
+
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Number of engineering parameters and inventive principles in classic TRIZ
+PARAMETER_COUNT = 39
+PRINCIPLE_COUNT = 40
+
+# Row/column 0 and bit 0 are unused so numbers can be used as indices directly
+MATRIX_SHAPE = (PARAMETER_COUNT + 1, PARAMETER_COUNT + 1)
+
+
+def principles_to_mask(principles: Iterable[Any]) -> int:
+    """
+    Convert principle numbers to a bitmask.
+
+    Args:
+        principles: Principle numbers as ints or numeric strings
+
+    Returns:
+        Integer bitmask with bit ``n`` set for each principle ``n``
+    """
+    mask = 0
+    for principle in principles:
+        number = int(principle)
+        if not 1 <= number <= PRINCIPLE_COUNT:
+            raise ValueError(f"Invalid TRIZ principle number: {principle}")
+        mask |= 1 << number
+    return mask
+
+
+def mask_to_principles(mask: int) -> List[int]:
+    """
+    Convert a bitmask back to a sorted list of principle numbers.
+
+    Args:
+        mask: Integer bitmask
+
+    Returns:
+        List of principle numbers in ascending order
+    """
+    mask = int(mask)
+    return [n for n in range(1, PRINCIPLE_COUNT + 1) if mask >> n & 1]
+
+
+def _principle_number(value: Any) -> int:
+    number = int(value)
+    if not 1 <= number <= PRINCIPLE_COUNT:
+        raise ValueError(f"Invalid TRIZ principle number: {value}")
+    return number
+
+
+def _parameter_number(value: Any) -> int:
+    number = int(value)
+    if not 1 <= number <= PARAMETER_COUNT:
+        raise ValueError(f"Invalid engineering parameter number: {value}")
+    return number
+
+
+class ContradictionMatrixEngine:
+    """
+    In-memory 39x39 contradiction matrix with O(1) lookups and vectorized
+    principle queries.
+
+    Principles are stored as a set per cell, so lookups return them in
+    ascending order rather than in the order they were listed in the source.
+    """
+
+    def __init__(self, cells: Optional[np.ndarray] = None):
+        if cells is None:
+            cells = np.zeros(MATRIX_SHAPE, dtype=np.uint64)
+        if cells.shape != MATRIX_SHAPE or cells.dtype != np.uint64:
+            raise ValueError(
+                f"Matrix cells must be a uint64 array of shape {MATRIX_SHAPE}"
+            )
+        self._cells = cells
+
+    @classmethod
+    def from_dict(cls, matrix: Dict[Any, Dict[Any, Iterable[Any]]]):
+        """
+        Build an engine from a nested ``{improving: {worsening: [principles]}}``
+        mapping such as ``TRIZ_MATRIX``, ``CONTRADICTION_MATRIX`` or the
+        contents of ``data/triz/matrix.json``. Keys and principles may be ints
+        or numeric strings.
+        """
+        cells = np.zeros(MATRIX_SHAPE, dtype=np.uint64)
+        for improving, row in matrix.items():
+            row_idx = _parameter_number(improving)
+            for worsening, principles in row.items():
+                col_idx = _parameter_number(worsening)
+                cells[row_idx, col_idx] = principles_to_mask(principles)
+        return cls(cells)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Any, Any, Any]]):
+        """
+        Build an engine from flat ``(improving, worsening, principle)`` rows,
+        e.g. a ``values_list`` over the ``ContradictionMatrix`` principles join.
+        Rows with a ``None`` principle mark an empty cell.
+        """
+        cells = np.zeros(MATRIX_SHAPE, dtype=np.uint64)
+        for improving, worsening, principle in rows:
+            row_idx = _parameter_number(improving)
+            col_idx = _parameter_number(worsening)
+            if principle is not None:
+                cells[row_idx, col_idx] |= np.uint64(principles_to_mask([principle]))
+        return cls(cells)
+
+    @classmethod
+    def from_queryset(cls, queryset=None):
+        """
+        Build an engine from ``ContradictionMatrix`` rows in a single query.
+
+        Args:
+            queryset: Optional ``ContradictionMatrix`` queryset, defaults to all rows
+        """
+        if queryset is None:
+            from patent_api.models import ContradictionMatrix
+
+            queryset = ContradictionMatrix.objects.all()
+        return cls.from_rows(
+            queryset.values_list(
+                "improving_parameter__number",
+                "worsening_parameter__number",
+                "principles__number",
+            )
+        )
+
+    @property
+    def cells(self) -> np.ndarray:
+        """Read-only view of the underlying bitmask array."""
+        view = self._cells.view()
+        view.flags.writeable = False
+        return view
+
+    @cached_property
+    def reverse_index(self):
+        """Reverse indexes over this matrix, built on first use."""
+        from .matrix_index import MatrixReverseIndex
+
+        return MatrixReverseIndex(self)
+
+    def mask(self, improving: Any, worsening: Any) -> int:
+        """Get the principle bitmask for a single cell."""
+        return int(
+            self._cells[_parameter_number(improving), _parameter_number(worsening)]
+        )
+
+    def lookup(self, improving: Any, worsening: Any) -> List[int]:
+        """
+        Get the principles recommended for a contradiction.
+
+        Args:
+            improving: Improving parameter number
+            worsening: Worsening parameter number
+
+        Returns:
+            List of principle numbers, empty if the cell has no recommendation
+        """
+        return mask_to_principles(self.mask(improving, worsening))
+
+    def cells_with_principles(self, principles: Iterable[Any]) -> List[Tuple[int, int]]:
+        """
+        Find all cells that recommend every one of the given principles.
+
+        Args:
+            principles: Principle numbers that must all be present
+
+        Returns:
+            List of ``(improving, worsening)`` pairs
+        """
+        mask = np.uint64(principles_to_mask(principles))
+        rows, cols = np.nonzero((self._cells & mask) == mask)
+        return [(int(i), int(w)) for i, w in zip(rows, cols) if i and w]
+
+    def rows_with_principles(self, principles: Iterable[Any]) -> List[int]:
+        """
+        Find improving parameters whose row has at least one cell recommending
+        every one of the given principles, e.g. rows where 1 and 10 co-occur.
+        """
+        mask = np.uint64(principles_to_mask(principles))
+        hits = ((self._cells & mask) == mask)[1:, 1:].any(axis=1)
+        return [int(i) + 1 for i in np.flatnonzero(hits)]
+
+    def columns_with_principles(self, principles: Iterable[Any]) -> List[int]:
+        """Column counterpart of ``rows_with_principles`` for worsening parameters."""
+        mask = np.uint64(principles_to_mask(principles))
+        hits = ((self._cells & mask) == mask)[1:, 1:].any(axis=0)
+        return [int(w) + 1 for w in np.flatnonzero(hits)]
+
+    def rank_principles(
+        self,
+        pairs: Iterable[Tuple[Any, Any]],
+        weights: Optional[Iterable[float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank principles by how often they are recommended across several
+        contradictions, looking up every cell in one vectorized pass.
+
+        Args:
+            pairs: ``(improving, worsening)`` parameter pairs
+            weights: Optional weight per pair, defaults to 1.0 each
+
+        Returns:
+            List of ``{"principle", "score", "count"}`` dictionaries sorted by
+            descending score, then count, then principle number
+        """
+        pairs = [(_parameter_number(i), _parameter_number(w)) for i, w in pairs]
+        if not pairs:
+            return []
+        if weights is None:
+            weights = np.ones(len(pairs), dtype=np.float64)
+        else:
+            weights = np.asarray(list(weights), dtype=np.float64)
+            if weights.shape != (len(pairs),):
+                raise ValueError("Exactly one weight is required per contradiction")
+
+        rows, cols = np.array(pairs).T
+        shifts = np.arange(PRINCIPLE_COUNT + 1, dtype=np.uint64)
+        bits = (self._cells[rows, cols][:, np.newaxis] >> shifts) & np.uint64(1)
+        bits = bits.astype(bool)
+        counts = bits.sum(axis=0)
+        scores = weights @ bits
+
+        ranked = sorted(
+            np.flatnonzero(counts),
+            key=lambda n: (-scores[n], -counts[n], n),
+        )
+        return [
+            {"principle": int(n), "score": float(scores[n]), "count": int(counts[n])}
+            for n in ranked
+        ]
+
+    def principle_bits(self) -> np.ndarray:
+        """
+        Expand the matrix into a boolean array of shape (40, 40, 41) where
+        ``bits[i, w, n]`` is true when cell ``(i, w)`` recommends principle ``n``.
+        """
+        shifts = np.arange(PRINCIPLE_COUNT + 1, dtype=np.uint64)
+        return ((self._cells[..., np.newaxis] >> shifts) & np.uint64(1)).astype(bool)
+
+    def principle_counts(self) -> np.ndarray:
+        """Number of principles recommended by each cell."""
+        return self.principle_bits().sum(axis=-1)
+
+    def to_dict(self, as_strings: bool = True) -> Dict[Any, Dict[Any, List[Any]]]:
+        """
+        Convert back to the nested dictionary representation, skipping empty
+        cells.
+
+        Args:
+            as_strings: Use string keys and principle values like ``TRIZ_MATRIX``
+
+        Returns:
+            Nested ``{improving: {worsening: [principles]}}`` dictionary
+        """
+        convert = str if as_strings else int
+        matrix = {}
+        rows, cols = np.nonzero(self._cells)
+        for improving, worsening in zip(rows, cols):
+            principles = mask_to_principles(self._cells[improving, worsening])
+            matrix.setdefault(convert(improving), {})[convert(worsening)] = [
+                convert(p) for p in principles
+            ]
+        return matrix
@@ -0,0 +1,78 @@
+"""
+Precomputed reverse indexes over the contradiction matrix.
+
+Answering "which cells recommend principle 28" or "what does Speed conflict
+with" from the forward matrix means scanning all 1,521 cells. The reverse index
+is built once per ContradictionMatrixEngine, so it is rebuilt whenever the
+engine is, and turns those questions into dictionary lookups.
+"""
+
+from itertools import combinations
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .matrix_engine import _parameter_number, _principle_number, mask_to_principles
+
+Cell = Tuple[int, int]
+
+
+class MatrixReverseIndex:
+    """
+    Reverse indexes for a contradiction matrix engine:
+
+    - principle -> cells recommending it
+    - principle pair -> cells recommending both
+    - parameter -> cells in its row (as improving) and column (as worsening),
+      ordered by how many principles each cell offers
+
+    Lookups raise ValueError for principle or parameter numbers outside the
+    matrix.
+    """
+
+    def __init__(self, engine):
+        cells = engine.cells
+        self._principles: Dict[Cell, Tuple[int, ...]] = {}
+        self._by_principle: Dict[int, List[Cell]] = {}
+        self._by_pair: Dict[Tuple[int, int], List[Cell]] = {}
+        self._by_improving: Dict[int, List[Cell]] = {}
+        self._by_worsening: Dict[int, List[Cell]] = {}
+
+        for improving, worsening in zip(*np.nonzero(cells)):
+            cell = (int(improving), int(worsening))
+            principles = tuple(mask_to_principles(cells[cell]))
+            self._principles[cell] = principles
+            self._by_improving.setdefault(cell[0], []).append(cell)
+            self._by_worsening.setdefault(cell[1], []).append(cell)
+            for principle in principles:
+                self._by_principle.setdefault(principle, []).append(cell)
+            for pair in combinations(principles, 2):
+                self._by_pair.setdefault(pair, []).append(cell)
+
+        for index in (self._by_improving, self._by_worsening):
+            for parameter, parameter_cells in index.items():
+                parameter_cells.sort(key=lambda c: (-len(self._principles[c]), c))
+
+    def principles(self, improving: Any, worsening: Any) -> Tuple[int, ...]:
+        """Principles recommended for a cell, empty if it has none."""
+        return self._principles.get((int(improving), int(worsening)), ())
+
+    def cells_for_principle(self, principle: Any) -> List[Cell]:
+        """Cells that recommend the given principle."""
+        return list(self._by_principle.get(_principle_number(principle), ()))
+
+    def cells_for_principle_pair(self, first: Any, second: Any) -> List[Cell]:
+        """Cells that recommend both principles; a principle paired with itself
+        gives the cells recommending it."""
+        first, second = _principle_number(first), _principle_number(second)
+        if first == second:
+            return self.cells_for_principle(first)
+        return list(self._by_pair.get((min(first, second), max(first, second)), ()))
+
+    def improving_cells(self, parameter: Any) -> List[Cell]:
+        """Cells where the parameter is improving, richest coverage first."""
+        return list(self._by_improving.get(_parameter_number(parameter), ()))
+
+    def worsening_cells(self, parameter: Any) -> List[Cell]:
+        """Cells where the parameter is worsening, richest coverage first."""
+        return list(self._by_worsening.get(_parameter_number(parameter), ()))
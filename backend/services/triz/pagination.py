@@ -0,0 +1,131 @@
+"""
+Cursor pagination and field projection for the Flask list endpoints.
+
+Records are ordered by a sort key that always ends with the record id, so the
+order is total and stable. A cursor is the opaque, URL-safe encoding of the
+last returned record's sort key; the next page starts right after that key, so
+inserts and deletes elsewhere in the list never shift or repeat records the
+way offset pagination would.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Encode a sort key as an opaque cursor string."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor string, raising ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def parse_page_size(value: Any) -> int:
+    """Parse a requested page size, clamped to 1..MAX_PAGE_SIZE."""
+    if value in (None, ""):
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a number")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def paginate(
+    records: Iterable[Dict[str, Any]],
+    sort_key: Callable[[Dict[str, Any]], Tuple],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+    """
+    Sort records and return one page of them.
+
+    Args:
+        records: Records to paginate
+        sort_key: Function returning a JSON-serializable tuple ending in the
+            record id
+        cursor: Cursor returned with the previous page, None for the first
+        limit: Page size, None for every remaining record
+        descending: Sort from the highest key to the lowest
+
+    Returns:
+        Tuple of (page records, cursor for the next page or None, total count)
+    """
+    keyed = sorted(
+        ((list(sort_key(r)), r) for r in records),
+        key=lambda item: item[0],
+        reverse=descending,
+    )
+
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor)
+        try:
+            if descending:
+                start = next(i for i, (k, _) in enumerate(keyed) if k < after)
+            else:
+                start = next(i for i, (k, _) in enumerate(keyed) if k > after)
+        except StopIteration:
+            start = len(keyed)
+        except TypeError:
+            raise ValueError("Invalid cursor")
+
+    end = len(keyed) if limit is None else start + limit
+    page = keyed[start:end]
+    next_cursor = None
+    if page and end < len(keyed):
+        next_cursor = encode_cursor(page[-1][0])
+    return [record for _, record in page], next_cursor, len(keyed)
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated ``fields=`` parameter, None if not given."""
+    if not value:
+        return None
+    return [field.strip() for field in value.split(",") if field.strip()]
+
+
+def check_fields(fields: Optional[List[str]], allowed: Iterable[str]) -> None:
+    """Raise ValueError naming any requested field not in ``allowed``."""
+    if fields is None:
+        return
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+
+def project(
+    record: Dict[str, Any],
+    fields: Optional[List[str]] = None,
+    exclude: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Keep only the requested fields of a record.
+
+    Args:
+        record: The record to project
+        fields: Fields to keep, or None to keep everything but ``exclude``
+        exclude: Heavy fields left out unless explicitly requested
+
+    Returns:
+        The projected record
+    """
+    if fields is None:
+        return {k: v for k, v in record.items() if k not in exclude}
+    return {k: record[k] for k in fields if k in record}
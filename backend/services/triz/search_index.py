@@ -0,0 +1,169 @@
+"""
+In-memory inverted index with BM25 ranking for patent search.
+
+Records are tokenized into case-folded Unicode word terms across the title,
+abstract, inventor and assignee fields. Each query term is treated as a prefix,
+so "sens" matches "sensor" and "sensing"; prefixes are expanded with a binary
+search over the sorted vocabulary. A document must match every query term, and
+matches are scored with BM25 over field-weighted term frequencies.
+"""
+
+import bisect
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Title matches count more than the same term in the abstract or metadata
+DEFAULT_FIELD_WEIGHTS = {
+    "title": 3.0,
+    "abstract": 1.0,
+    "inventor": 1.0,
+    "assignee": 1.0,
+}
+
+
+def tokenize(text: Any) -> List[str]:
+    """Split text into case-folded word terms, in any script."""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(t) for t in text)
+    return TOKEN_RE.findall(str(text).casefold())
+
+
+class PatentSearchIndex:
+    """
+    Incrementally maintained inverted index over patent records.
+
+    Args:
+        field_weights: Fields to index and the weight of a term in each
+        k1: BM25 term frequency saturation
+        b: BM25 document length normalization
+    """
+
+    def __init__(
+        self,
+        field_weights: Optional[Dict[str, float]] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.field_weights = dict(field_weights or DEFAULT_FIELD_WEIGHTS)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Any, float]] = {}
+        self._vocabulary: List[str] = []
+        self._doc_lengths: Dict[Any, float] = {}
+        self._doc_terms: Dict[Any, Tuple[str, ...]] = {}
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: Any, record: Dict[str, Any]) -> None:
+        """Index a record, replacing any previous version with the same id."""
+        frequencies: Dict[str, float] = {}
+        length = 0.0
+        for field, weight in self.field_weights.items():
+            for term in tokenize(record.get(field)):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+                length += weight
+
+        with self._lock:
+            self._remove(doc_id)
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[doc_id] = frequency
+            self._doc_terms[doc_id] = tuple(frequencies)
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def clear(self) -> None:
+        """Remove every record from the index."""
+        with self._lock:
+            self._postings.clear()
+            self._vocabulary.clear()
+            self._doc_lengths.clear()
+            self._doc_terms.clear()
+            self._total_length = 0.0
+
+    def remove(self, doc_id: Any) -> None:
+        """Remove a record from the index."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: Any) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Vocabulary terms starting with the prefix."""
+        start = end = bisect.bisect_left(self._vocabulary, prefix)
+        while end < len(self._vocabulary) and self._vocabulary[end].startswith(prefix):
+            end += 1
+        return self._vocabulary[start:end]
+
+    def search(self, query: str) -> List[Tuple[Any, float]]:
+        """
+        Find records matching every term of the query.
+
+        Args:
+            query: Free-text query, each term matched as a prefix
+
+        Returns:
+            ``(doc_id, score)`` pairs, best match first; empty if the query
+            has no searchable terms
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count or 1.0
+
+            scores: Optional[Dict[Any, float]] = None
+            for query_term in query_terms:
+                term_scores: Dict[Any, float] = {}
+                for term in self._expand(query_term):
+                    postings = self._postings[term]
+                    idf = math.log(
+                        1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5)
+                    )
+                    for doc_id, frequency in postings.items():
+                        if scores is not None and doc_id not in scores:
+                            continue
+                        norm = self.k1 * (
+                            1 - self.b + self.b * self._doc_lengths[doc_id] / average_length
+                        )
+                        term_scores[doc_id] = term_scores.get(doc_id, 0.0) + idf * (
+                            frequency * (self.k1 + 1) / (frequency + norm)
+                        )
+
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        doc_id: scores[doc_id] + score
+                        for doc_id, score in term_scores.items()
+                    }
+                if not scores:
+                    return []
+
+        return sorted(scores.items(), key=lambda item: -item[1])
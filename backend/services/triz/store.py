@@ -0,0 +1,500 @@
+"""
+SQLite storage for the Flask TRIZ service's patents, analyses and citations.
+
+The database runs in WAL mode so readers never block the writer, and every
+lookup the service makes is backed by an index: ids, patent_id, status, and
+(date, id) pairs that serve the keyset pagination used by the list endpoints.
+Statements are always parameterized, and each thread keeps its own connection
+whose statement cache reuses the compiled statements.
+
+Dates are stored as ISO 8601 text, which sorts chronologically, and the
+structured analysis fields as JSON text, so rows come back in the same shape
+the service has always returned.
+"""
+
+import datetime
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+PATENT_COLUMNS = (
+    "id",
+    "patent_number",
+    "filename",
+    "title",
+    "filing_date",
+    "upload_date",
+    "raw_text",
+    "is_prior_art",
+    "is_competitor",
+    "abstract",
+    "inventor",
+    "assignee",
+    "status",
+)
+ANALYSIS_COLUMNS = (
+    "id",
+    "patent_id",
+    "analysis_date",
+    "extracted_data",
+    "feedback_date",
+    "user_feedback",
+    "status",
+)
+CITATION_COLUMNS = (
+    "id",
+    "patent_id",
+    "cited_patent_number",
+    "citation_context",
+    "citation_date",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patents (
+    id TEXT PRIMARY KEY,
+    patent_number TEXT,
+    filename TEXT,
+    title TEXT,
+    filing_date TEXT,
+    upload_date TEXT NOT NULL DEFAULT '',
+    raw_text TEXT,
+    is_prior_art INTEGER NOT NULL DEFAULT 0,
+    is_competitor INTEGER NOT NULL DEFAULT 0,
+    abstract TEXT,
+    inventor TEXT,
+    assignee TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS patents_filename ON patents (filename);
+CREATE INDEX IF NOT EXISTS patents_status ON patents (status);
+CREATE INDEX IF NOT EXISTS patents_upload_date ON patents (upload_date, id);
+CREATE INDEX IF NOT EXISTS patents_filing_date ON patents (filing_date);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    patent_id TEXT NOT NULL,
+    analysis_date TEXT NOT NULL DEFAULT '',
+    extracted_data TEXT,
+    feedback_date TEXT,
+    user_feedback TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS analyses_patent ON analyses (patent_id, analysis_date, id);
+CREATE INDEX IF NOT EXISTS analyses_status ON analyses (status);
+CREATE INDEX IF NOT EXISTS analyses_analysis_date ON analyses (analysis_date, id);
+
+CREATE TABLE IF NOT EXISTS citations (
+    id INTEGER PRIMARY KEY,
+    patent_id TEXT NOT NULL,
+    cited_patent_number TEXT,
+    citation_context TEXT,
+    citation_date TEXT
+);
+CREATE INDEX IF NOT EXISTS citations_patent ON citations (patent_id);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_IN_BATCH_SIZE = 500
+
+
+def _text_date(value: Any) -> Any:
+    """Dates as ISO 8601 text"""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _json_text(value: Any) -> Any:
+    """Structured fields as JSON text"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _columns(requested: Optional[Iterable[str]], allowed: Sequence[str]) -> List[str]:
+    """Known columns from a requested list, in table order; all if None"""
+    if requested is None:
+        return list(allowed)
+    requested = set(requested)
+    return [column for column in allowed if column in requested]
+
+
+def _patent_row(patent: Dict[str, Any]) -> List[Any]:
+    row = []
+    for column in PATENT_COLUMNS:
+        value = patent.get(column)
+        if column in ("filing_date", "upload_date"):
+            value = _text_date(value)
+        elif column in ("is_prior_art", "is_competitor"):
+            value = int(bool(value))
+        row.append(value)
+    if row[PATENT_COLUMNS.index("upload_date")] is None:
+        row[PATENT_COLUMNS.index("upload_date")] = ""
+    return row
+
+
+def _analysis_row(analysis: Dict[str, Any]) -> List[Any]:
+    row = []
+    for column in ANALYSIS_COLUMNS:
+        value = analysis.get(column)
+        if column in ("analysis_date", "feedback_date"):
+            value = _text_date(value)
+        elif column in ("extracted_data", "user_feedback"):
+            value = _json_text(value)
+        row.append(value)
+    if row[ANALYSIS_COLUMNS.index("analysis_date")] is None:
+        row[ANALYSIS_COLUMNS.index("analysis_date")] = ""
+    return row
+
+
+def _patent_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    patent = dict(row)
+    for column in ("is_prior_art", "is_competitor"):
+        if column in patent:
+            patent[column] = bool(patent[column])
+    return patent
+
+
+class TrizStore:
+    """
+    Patents, analyses and citations in a SQLite database.
+
+    Args:
+        path: Database file path, created if it does not exist
+        timeout: Seconds to wait for another connection's write lock
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, cached_statements=256
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def seed(
+        self,
+        patents: Iterable[Dict[str, Any]],
+        analyses: Iterable[Dict[str, Any]],
+        citations: Iterable[Dict[str, Any]],
+    ) -> bool:
+        """
+        Load initial records, once per database.
+
+        Returns:
+            True if the records were loaded, False if the database was
+            already seeded
+        """
+        connection = self.connection()
+        with connection:
+            # Take the write lock first so concurrent workers seed only once
+            connection.execute("BEGIN IMMEDIATE")
+            seeded = connection.execute(
+                "SELECT 1 FROM store_meta WHERE key = 'seeded'"
+            ).fetchone()
+            if seeded:
+                return False
+            self._upsert_patents(connection, patents)
+            self._upsert_analyses(connection, analyses)
+            connection.executemany(
+                "INSERT OR IGNORE INTO citations VALUES (?, ?, ?, ?, ?)",
+                (
+                    [
+                        citation.get("id"),
+                        citation["patent_id"],
+                        citation.get("cited_patent_number"),
+                        citation.get("citation_context"),
+                        _text_date(citation.get("citation_date")),
+                    ]
+                    for citation in citations
+                ),
+            )
+            connection.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('seeded', ?)",
+                (datetime.datetime.now().isoformat(),),
+            )
+        return True
+
+    # Patents
+
+    def _upsert_patents(self, connection, patents: Iterable[Dict[str, Any]]) -> None:
+        placeholders = ", ".join("?" for _ in PATENT_COLUMNS)
+        connection.executemany(
+            f"INSERT OR REPLACE INTO patents ({', '.join(PATENT_COLUMNS)}) "
+            f"VALUES ({placeholders})",
+            (_patent_row(patent) for patent in patents),
+        )
+
+    def upsert_patent(self, patent: Dict[str, Any]) -> None:
+        """Insert a patent, replacing any patent with the same id."""
+        connection = self.connection()
+        with connection:
+            self._upsert_patents(connection, [patent])
+
+    def get_patent(
+        self, patent_id: str, columns: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """A patent by id, or None."""
+        selected = ", ".join(_columns(columns, PATENT_COLUMNS))
+        row = (
+            self.connection()
+            .execute(f"SELECT {selected} FROM patents WHERE id = ?", (patent_id,))
+            .fetchone()
+        )
+        return _patent_dict(row) if row else None
+
+    def get_patent_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
+        """A patent by filename, or None."""
+        row = (
+            self.connection()
+            .execute("SELECT * FROM patents WHERE filename = ? LIMIT 1", (filename,))
+            .fetchone()
+        )
+        return _patent_dict(row) if row else None
+
+    def get_patents(
+        self, patent_ids: Iterable[str], columns: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Patents by id, for the ids that exist."""
+        selected = _columns(columns, PATENT_COLUMNS)
+        if "id" not in selected:
+            selected.insert(0, "id")
+        patent_ids = list(patent_ids)
+        patents = {}
+        for start in range(0, len(patent_ids), _IN_BATCH_SIZE):
+            batch = patent_ids[start : start + _IN_BATCH_SIZE]
+            placeholders = ", ".join("?" for _ in batch)
+            for row in self.connection().execute(
+                f"SELECT {', '.join(selected)} FROM patents "
+                f"WHERE id IN ({placeholders})",
+                batch,
+            ):
+                patents[row["id"]] = _patent_dict(row)
+        return patents
+
+    def list_patents(
+        self,
+        status: Optional[Sequence[str]] = None,
+        descending: bool = True,
+        after: Optional[Sequence[Any]] = None,
+        limit: Optional[int] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Patents ordered by (upload_date, id).
+
+        Args:
+            status: Optional status values to filter by
+            descending: Newest first
+            after: (upload_date, id) of the last patent already returned
+            limit: Maximum number of patents
+            columns: Columns to select, all if None
+
+        Returns:
+            List of patent dictionaries
+        """
+        where, params = self._status_filter(status)
+        if after is not None:
+            where.append(f"(upload_date, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT {', '.join(_columns(columns, PATENT_COLUMNS))} FROM patents"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY upload_date {direction}, id {direction}"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_patent_dict(row) for row in self.connection().execute(sql, params)]
+
+    def count_patents(self, status: Optional[Sequence[str]] = None) -> int:
+        """Number of patents, optionally only those with the given statuses."""
+        where, params = self._status_filter(status)
+        sql = "SELECT COUNT(*) FROM patents" + (
+            f" WHERE {' AND '.join(where)}" if where else ""
+        )
+        return self.connection().execute(sql, params).fetchone()[0]
+
+    def iter_patents(
+        self, columns: Optional[Iterable[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Every patent, streamed from the database."""
+        selected = ", ".join(_columns(columns, PATENT_COLUMNS))
+        for row in self.connection().execute(f"SELECT {selected} FROM patents"):
+            yield _patent_dict(row)
+
+    @staticmethod
+    def _status_filter(status: Optional[Sequence[str]]) -> tuple:
+        if not status:
+            return [], []
+        status = list(status)
+        return [f"status IN ({', '.join('?' for _ in status)})"], status
+
+    # Analyses
+
+    def _upsert_analyses(
+        self, connection, analyses: Iterable[Dict[str, Any]]
+    ) -> None:
+        placeholders = ", ".join("?" for _ in ANALYSIS_COLUMNS)
+        connection.executemany(
+            f"INSERT OR REPLACE INTO analyses ({', '.join(ANALYSIS_COLUMNS)}) "
+            f"VALUES ({placeholders})",
+            (_analysis_row(analysis) for analysis in analyses),
+        )
+
+    def upsert_analysis(self, analysis: Dict[str, Any]) -> None:
+        """Insert an analysis, replacing any analysis with the same id."""
+        self.upsert_analyses([analysis])
+
+    def upsert_analyses(self, analyses: Iterable[Dict[str, Any]]) -> None:
+        """Insert analyses in one transaction, replacing any with the same ids."""
+        connection = self.connection()
+        with connection:
+            self._upsert_analyses(connection, analyses)
+
+    def update_analysis(self, analysis_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Update fields of an analysis.
+
+        Args:
+            analysis_id: The analysis ID
+            updates: New values by column; unknown columns and "id" are ignored
+
+        Returns:
+            True if the analysis exists
+        """
+        values = {}
+        for column, value in updates.items():
+            if column not in ANALYSIS_COLUMNS or column == "id":
+                continue
+            if column in ("analysis_date", "feedback_date"):
+                value = _text_date(value)
+            elif column in ("extracted_data", "user_feedback"):
+                value = _json_text(value)
+            values[column] = value
+
+        connection = self.connection()
+        with connection:
+            if not values:
+                return (
+                    connection.execute(
+                        "SELECT 1 FROM analyses WHERE id = ?", (analysis_id,)
+                    ).fetchone()
+                    is not None
+                )
+            assignments = ", ".join(f"{column} = ?" for column in values)
+            cursor = connection.execute(
+                f"UPDATE analyses SET {assignments} WHERE id = ?",
+                [*values.values(), analysis_id],
+            )
+        return cursor.rowcount > 0
+
+    def delete_analysis(self, analysis_id: str) -> bool:
+        """Delete an analysis, returning whether it existed."""
+        connection = self.connection()
+        with connection:
+            cursor = connection.execute(
+                "DELETE FROM analyses WHERE id = ?", (analysis_id,)
+            )
+        return cursor.rowcount > 0
+
+    def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """An analysis by id, or None."""
+        row = (
+            self.connection()
+            .execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,))
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    def list_analyses(
+        self,
+        patent_id: Optional[str] = None,
+        after: Optional[Sequence[Any]] = None,
+        limit: Optional[int] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyses ordered newest first by (analysis_date, id).
+
+        Args:
+            patent_id: Optional patent ID to restrict the analyses to
+            after: (analysis_date, id) of the last analysis already returned
+            limit: Maximum number of analyses
+            columns: Columns to select, all if None
+
+        Returns:
+            List of analysis dictionaries
+        """
+        where, params = [], []
+        if patent_id is not None:
+            where.append("patent_id = ?")
+            params.append(patent_id)
+        if after is not None:
+            where.append("(analysis_date, id) < (?, ?)")
+            params.extend(after)
+        sql = (
+            f"SELECT {', '.join(_columns(columns, ANALYSIS_COLUMNS))} FROM analyses"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY analysis_date DESC, id DESC"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection().execute(sql, params)]
+
+    def count_analyses(self, patent_id: Optional[str] = None) -> int:
+        """Number of analyses, optionally only those of one patent."""
+        if patent_id is None:
+            return self.connection().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return (
+            self.connection()
+            .execute("SELECT COUNT(*) FROM analyses WHERE patent_id = ?", (patent_id,))
+            .fetchone()[0]
+        )
+
+    def iter_analyses(
+        self, columns: Optional[Iterable[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Every analysis, streamed from the database."""
+        selected = ", ".join(_columns(columns, ANALYSIS_COLUMNS))
+        for row in self.connection().execute(f"SELECT {selected} FROM analyses"):
+            yield dict(row)
+
+    # Citations
+
+    def citations_for_patent(self, patent_id: str) -> List[Dict[str, Any]]:
+        """Citations of a patent."""
+        return [
+            dict(row)
+            for row in self.connection().execute(
+                "SELECT * FROM citations WHERE patent_id = ? ORDER BY id",
+                (patent_id,),
+            )
+        ]
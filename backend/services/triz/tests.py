@@ -0,0 +1,540 @@
+"""
+Tests for the Flask TRIZ service: its store, analysis log, indexes and routes.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask, request as flask_request
+
+from api.routes import register_routes
+from api.static_responses import PrecompressedBody
+from services.triz import triz_service
+from services.triz.analysis_log import HEADER, AnalysisLog
+from services.triz.contradiction_solver import solve_contradiction
+from services.triz.cooccurrence import analysis_principle_sets
+from services.triz.matrix_engine import ContradictionMatrixEngine
+from services.triz.search_index import PatentSearchIndex
+from services.triz.store import TrizStore
+from services.triz.triz_binary import TrizBinaryData, encode_triz_binary
+
+
+class TrizServiceTestCase(unittest.TestCase):
+    """
+    Runs triz_service against a store and analysis log in a temporary
+    directory, seeded with the mock data on first use.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        for name, value in [
+            ("STORE_PATH", os.path.join(self.directory, "store.sqlite3")),
+            ("ANALYSIS_LOG_DIR", os.path.join(self.directory, "log")),
+            ("ANALYSES_DIR", self.directory),
+        ]:
+            patcher = mock.patch.object(triz_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        triz_service.reset_service_state()
+        self.addCleanup(triz_service.reset_service_state)
+
+    def client(self):
+        """Test client of a Flask app with the service routes"""
+        app = Flask(__name__)
+        register_routes(app)
+        return app.test_client()
+
+
+class PatentSearchIndexTests(unittest.TestCase):
+    def test_matches_non_ascii_terms(self):
+        index = PatentSearchIndex()
+        index.add(
+            "P1", {"title": "Größenverstellbarer Sensor", "inventor": ["José Müller"]}
+        )
+        index.add("P2", {"title": "温度センサー", "assignee": "STRASSE AG"})
+        self.assertEqual([doc for doc, _ in index.search("GRÖSSEN")], ["P1"])
+        self.assertEqual([doc for doc, _ in index.search("müll josé")], ["P1"])
+        self.assertEqual([doc for doc, _ in index.search("温度")], ["P2"])
+        self.assertEqual([doc for doc, _ in index.search("straße")], ["P2"])
+
+    def test_prefix_expansion_includes_astral_characters(self):
+        index = PatentSearchIndex()
+        index.add("P1", {"title": "ab\U00020000"})
+        index.add("P2", {"title": "abc"})
+        index.add("P3", {"title": "ac"})
+        self.assertEqual(index._expand("ab"), ["abc", "ab\U00020000"])
+        self.assertEqual(sorted(doc for doc, _ in index.search("ab")), ["P1", "P2"])
+
+    def test_query_without_terms_matches_nothing(self):
+        index = PatentSearchIndex()
+        index.add("P1", {"title": "Sensor"})
+        self.assertEqual(index.search("?! -"), [])
+
+
+class TrizBinaryTests(unittest.TestCase):
+    def test_matrix_keeps_source_order(self):
+        matrix = {"3": {"9": [2, 8, 15], "1": [1, 29, 17]}, "1": {"2": [35]}}
+        data = TrizBinaryData(encode_triz_binary({}, {}, matrix))
+        served = data.matrix()
+        self.assertEqual(served, matrix)
+        self.assertEqual(list(served), ["3", "1"])
+        self.assertEqual(list(served["3"]), ["9", "1"])
+        self.assertEqual(data.engine().lookup(3, 1), [1, 17, 29])
+
+    def test_service_serves_matrix_json(self):
+        with open(os.path.join(triz_service.TRIZ_DATA_DIR, "matrix.json")) as f:
+            source = json.load(f)
+        self.assertEqual(
+            json.dumps(triz_service.get_triz_matrix()),
+            json.dumps(
+                {
+                    improving: {w: [str(p) for p in ps] for w, ps in row.items()}
+                    for improving, row in source.items()
+                }
+            ),
+        )
+
+
+class ContradictionMatrixEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.matrix = {
+            "1": {"2": ["1", "40"], "3": ["1", "10", "40"]},
+            "39": {"3": ["10"]},
+        }
+        self.engine = ContradictionMatrixEngine.from_dict(self.matrix)
+
+    def test_lookup_and_round_trip(self):
+        self.assertEqual(self.engine.lookup(1, "3"), [1, 10, 40])
+        self.assertEqual(self.engine.lookup(2, 1), [])
+        self.assertEqual(self.engine.mask(1, 2), (1 << 1) | (1 << 40))
+        self.assertEqual(self.engine.to_dict(), self.matrix)
+
+    def test_principle_queries(self):
+        self.assertEqual(self.engine.cells_with_principles([1, 40]), [(1, 2), (1, 3)])
+        self.assertEqual(self.engine.cells_with_principles(["10"]), [(1, 3), (39, 3)])
+        self.assertEqual(self.engine.rows_with_principles([10]), [1, 39])
+        self.assertEqual(self.engine.columns_with_principles([1, 10]), [3])
+        self.assertEqual(self.engine.cells_with_principles([2]), [])
+
+    def test_rank_principles_weights_and_ties(self):
+        ranking = self.engine.rank_principles([(1, 2), (1, 3), (39, 3)], [1, 1, 3])
+        self.assertEqual(
+            ranking,
+            [
+                {"principle": 10, "score": 4.0, "count": 2},
+                {"principle": 1, "score": 2.0, "count": 2},
+                {"principle": 40, "score": 2.0, "count": 2},
+            ],
+        )
+        unweighted = self.engine.rank_principles([(1, 3), (39, 3), (2, 2)])
+        self.assertEqual([entry["principle"] for entry in unweighted], [10, 1, 40])
+        self.assertEqual(self.engine.rank_principles([]), [])
+        with self.assertRaises(ValueError):
+            self.engine.rank_principles([(1, 2)], [1, 2])
+        with self.assertRaises(ValueError):
+            self.engine.rank_principles([(1, 40)])
+
+    def test_from_rows_matches_from_dict(self):
+        rows = [
+            (improving, worsening, principle)
+            for improving, row in self.matrix.items()
+            for worsening, principles in row.items()
+            for principle in principles
+        ]
+        engine = ContradictionMatrixEngine.from_rows(rows + [(5, 6, None)])
+        self.assertTrue((engine.cells == self.engine.cells).all())
+
+    def test_rejects_out_of_range_numbers_and_writes(self):
+        for matrix in [{"1": {"2": [41]}}, {"0": {"2": [1]}}, {"1": {"40": [1]}}]:
+            with self.assertRaises(ValueError):
+                ContradictionMatrixEngine.from_dict(matrix)
+        with self.assertRaises(ValueError):
+            self.engine.cells_with_principles([0])
+        with self.assertRaises(ValueError):
+            self.engine.cells[1, 2] = 0
+
+
+class ContradictionSolverTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = ContradictionMatrixEngine.from_dict(
+            {
+                "1": {"2": [1, 2], "3": [2, 3], "4": [4], "5": [2]},
+                "6": {"3": [5]},
+            }
+        )
+
+    def test_improving_row_is_ranked_and_covered(self):
+        result = solve_contradiction(self.engine, "1")
+        self.assertEqual(
+            [(p["parameter"], p["count"]) for p in result["parameters"]],
+            [(2, 2), (3, 2), (4, 1), (5, 1)],
+        )
+        self.assertEqual(result["principles"][0], {"principle": 2, "coverage": 3})
+        self.assertEqual(
+            result["cover"],
+            [{"principle": 2, "covers": [2, 3, 5]}, {"principle": 4, "covers": [4]}],
+        )
+        self.assertEqual(result["uncovered"], [])
+
+    def test_worsening_column_and_limits(self):
+        result = solve_contradiction(self.engine, 3, role="worsening")
+        self.assertEqual([p["parameter"] for p in result["parameters"]], [1, 6])
+
+        limited = solve_contradiction(self.engine, 1, limit=1, max_principles=1)
+        self.assertEqual(len(limited["parameters"]), 1)
+        self.assertEqual(limited["cover"], [{"principle": 2, "covers": [2, 3, 5]}])
+        self.assertEqual(limited["uncovered"], [4])
+
+    def test_rejects_bad_role_and_parameter(self):
+        with self.assertRaises(ValueError):
+            solve_contradiction(self.engine, 1, role="sideways")
+        with self.assertRaises(ValueError):
+            solve_contradiction(self.engine, 40)
+
+    def test_service_uses_the_cached_reference_engine(self):
+        with mock.patch.object(triz_service, "solve_contradiction") as solve:
+            triz_service.what_if_contradiction("1")
+        self.assertIs(solve.call_args.args[0], triz_service.get_matrix_engine())
+
+
+class PrecompressedResponseTests(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.body = PrecompressedBody({"1": "Weight of moving object"})
+
+    def _get(self, **headers):
+        with self.app.test_request_context(headers=headers):
+            return self.body.response(flask_request)
+
+    def test_each_encoding_has_its_own_etag(self):
+        identity = self._get()
+        gzipped = self._get(**{"Accept-Encoding": "gzip"})
+        self.assertEqual(gzipped.headers["Content-Encoding"], "gzip")
+        self.assertNotEqual(identity.headers["ETag"], gzipped.headers["ETag"])
+        self.assertEqual(gzip.decompress(gzipped.get_data()), identity.get_data())
+
+    def test_if_none_match_compares_the_selected_representation(self):
+        identity_etag = self._get().headers["ETag"]
+        gzip_etag = self._get(**{"Accept-Encoding": "gzip"}).headers["ETag"]
+
+        self.assertEqual(self._get(**{"If-None-Match": identity_etag}).status_code, 304)
+        stale = self._get(**{"Accept-Encoding": "gzip", "If-None-Match": identity_etag})
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.headers["Content-Encoding"], "gzip")
+        fresh = self._get(**{"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+        self.assertEqual(fresh.status_code, 304)
+
+
+class MatrixCellsRouteTests(TrizServiceTestCase):
+    def test_cells_recommending_every_principle(self):
+        engine = triz_service.get_matrix_engine()
+        response = self.client().get("/api/triz/matrix/cells?principle=1&principle=8")
+        self.assertEqual(response.status_code, 200)
+        expected = engine.cells_with_principles([1, 8])
+        self.assertTrue(expected)
+        self.assertEqual(
+            [
+                (int(cell["improving"]), int(cell["worsening"]))
+                for cell in response.json["cells"]
+            ],
+            expected,
+        )
+
+    def test_rejects_missing_and_invalid_principles(self):
+        client = self.client()
+        self.assertEqual(client.get("/api/triz/matrix/cells").status_code, 400)
+        response = client.get("/api/triz/matrix/cells?principle=41")
+        self.assertEqual(response.status_code, 400)
+
+
+class RecordLookupTests(TrizServiceTestCase):
+    """Lookups of single patents, analyses and citations by key"""
+
+    def test_seeded_records_by_id(self):
+        for patent in triz_service.PATENTS:
+            found = triz_service.get_patent_by_id(patent["id"])
+            self.assertEqual(found["title"], patent["title"])
+        analysis = triz_service.PATENT_ANALYSES[0]
+        found = triz_service.get_analysis_by_id(analysis["id"])
+        self.assertEqual(found["patent_id"], analysis["patent_id"])
+        self.assertIsNone(triz_service.get_patent_by_id("PAT-MISSING"))
+        self.assertIsNone(triz_service.get_analysis_by_id("ANA-MISSING"))
+        self.assertIsNone(triz_service.get_patent_file("PAT-MISSING"))
+
+    def test_analyses_and_citations_for_a_patent(self):
+        for patent in triz_service.PATENTS:
+            analyses = triz_service.get_analyses_for_patent(patent["id"])
+            self.assertEqual(
+                sorted(a["id"] for a in analyses),
+                sorted(
+                    a["id"]
+                    for a in triz_service.PATENT_ANALYSES
+                    if a["patent_id"] == patent["id"]
+                ),
+            )
+            citations = triz_service.get_patent_citations(patent["id"])
+            self.assertEqual(
+                sorted(c["cited_patent_number"] for c in citations),
+                sorted(
+                    c["cited_patent_number"]
+                    for c in triz_service.PATENT_CITATIONS
+                    if c["patent_id"] == patent["id"]
+                ),
+            )
+        self.assertEqual(triz_service.get_analyses_for_patent("PAT-MISSING"), [])
+
+    def test_new_records_are_found_immediately(self):
+        triz_service.upload_patent(
+            b"", "gearbox.pdf", {"id": "PAT900", "title": "Helical gearbox"}
+        )
+        patent = triz_service.get_patent_by_id("PAT900")
+        self.assertEqual(patent["title"], "Helical gearbox")
+        self.assertEqual(
+            triz_service.get_patent_file("PAT900"), "data/patents/gearbox.pdf"
+        )
+        matches = triz_service.get_all_patents("helical")
+        self.assertEqual([p["id"] for p in matches], ["PAT900"])
+
+        analysis = dict(
+            triz_service.PATENT_ANALYSES[0], id="ANA900", patent_id="PAT900"
+        )
+        self.assertTrue(triz_service.store_analysis(analysis))
+        analyses = triz_service.get_analyses_for_patent("PAT900")
+        self.assertEqual([a["id"] for a in analyses], ["ANA900"])
+
+
+class SerializedRecordTests(TrizServiceTestCase):
+    """Records are returned in their JSON-ready form"""
+
+    def test_dates_are_iso_strings_and_json_columns_are_parsed(self):
+        source = triz_service.PATENT_ANALYSES[0]
+        analysis = triz_service.get_analysis_by_id(source["id"])
+        self.assertEqual(
+            analysis["analysis_date"], source["analysis_date"].isoformat()
+        )
+        for column in ("extracted_data", "user_feedback"):
+            self.assertEqual(analysis[column], json.loads(source[column]))
+
+        patent = triz_service.get_patent_by_id(source["patent_id"])
+        self.assertIsInstance(patent["upload_date"], str)
+        citation = triz_service.get_patent_citations(source["patent_id"])[0]
+        self.assertIsInstance(citation["citation_date"], str)
+
+    def test_routes_return_the_records_unchanged(self):
+        client = self.client()
+        analysis_id = triz_service.PATENT_ANALYSES[0]["id"]
+        response = client.get(f"/api/analyses/{analysis_id}")
+        self.assertEqual(response.json, triz_service.get_analysis_by_id(analysis_id))
+        patent_id = triz_service.PATENTS[0]["id"]
+        response = client.get(f"/api/patents/{patent_id}")
+        self.assertEqual(response.json, triz_service.get_patent_by_id(patent_id))
+
+    def test_each_read_returns_a_new_record(self):
+        analysis_id = triz_service.PATENT_ANALYSES[0]["id"]
+        first = triz_service.get_analysis_by_id(analysis_id)
+        first["status"] = "changed"
+        second = triz_service.get_analysis_by_id(analysis_id)
+        self.assertNotEqual(second["status"], "changed")
+        # The parsed JSON columns are shared and documented as read-only
+        self.assertIs(first["extracted_data"], second["extracted_data"])
+
+
+class TrizStoreTests(TrizServiceTestCase):
+    """The SQLite store behind the service"""
+
+    def _store(self):
+        store = TrizStore(os.path.join(self.directory, "records.sqlite3"))
+        self.addCleanup(store.close)
+        return store
+
+    def test_seeds_once_per_database(self):
+        records = (
+            triz_service.PATENTS,
+            triz_service.PATENT_ANALYSES,
+            triz_service.PATENT_CITATIONS,
+        )
+        self.assertTrue(self._store().seed(*records))
+        store = self._store()
+        self.assertFalse(store.seed(*records))
+        self.assertEqual(store.count_patents(), len(triz_service.PATENTS))
+
+    def test_update_analysis(self):
+        store = self._store()
+        store.upsert_analysis(dict(triz_service.PATENT_ANALYSES[0], id="A1"))
+        self.assertTrue(
+            store.update_analysis(
+                "A1", {"status": "approved", "user_feedback": {"ok": 1}, "id": "A2"}
+            )
+        )
+        self.assertTrue(store.update_analysis("A1", {"unknown": 1}))
+        self.assertFalse(store.update_analysis("A-MISSING", {"status": "approved"}))
+        analysis = store.get_analysis("A1")
+        self.assertEqual(analysis["status"], "approved")
+        self.assertEqual(json.loads(analysis["user_feedback"]), {"ok": 1})
+        self.assertIsNone(store.get_analysis("A2"))
+
+    def test_pages_cover_every_patent_once(self):
+        for n in range(5):
+            triz_service.upload_patent(b"", f"p{n}.pdf", {"id": f"PAT90{n}"})
+        expected = [p["id"] for p in triz_service.get_all_patents()]
+        for sort_order in ("newest", "oldest"):
+            seen, cursor = [], None
+            while True:
+                page = triz_service.list_patents(
+                    sort_order=sort_order, cursor=cursor, limit=2
+                )
+                self.assertEqual(page["count"], len(expected))
+                seen += [p["id"] for p in page["patents"]]
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            if sort_order == "oldest":
+                seen.reverse()
+            self.assertEqual(seen, expected)
+
+    def test_records_survive_a_restart(self):
+        triz_service.upload_patent(b"", "kept.pdf", {"id": "PAT900"})
+        analysis_id = triz_service.PATENT_ANALYSES[0]["id"]
+        triz_service.update_analysis(analysis_id, {"status": "rejected"})
+
+        triz_service.reset_service_state()
+        self.assertIsNotNone(triz_service.get_patent_by_id("PAT900"))
+        self.assertEqual(
+            triz_service.get_analysis_by_id(analysis_id)["status"], "rejected"
+        )
+
+
+class PatentSearchTests(TrizServiceTestCase):
+    def test_punctuation_only_search_returns_no_patents(self):
+        self.assertTrue(triz_service.get_all_patents())
+        self.assertEqual(triz_service.get_all_patents("?!"), [])
+        self.assertEqual(
+            len(triz_service.get_all_patents("  ")), len(triz_service.get_all_patents())
+        )
+
+
+class FieldProjectionTests(TrizServiceTestCase):
+    def test_projects_known_fields(self):
+        response = self.client().get("/api/patents?fields=title")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json["patents"])
+        self.assertTrue(all(set(p) == {"title"} for p in response.json["patents"]))
+
+    def test_rejects_unknown_fields(self):
+        client = self.client()
+        for url in ["/api/patents?fields=title,bogus", "/api/analyses?fields=bogus"]:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn("bogus", response.json["error"])
+
+
+class AnalysisLogTests(TrizServiceTestCase):
+    """Crash recovery, tombstones and sharing of the analysis log"""
+
+    def _record(self, analysis_id, notes="notes"):
+        return {"id": analysis_id, "patent_id": "PAT1", "notes": notes}
+
+    def _notes(self, log):
+        return {record["id"]: record["notes"] for record in log.scan()}
+
+    def test_torn_tail_is_truncated(self):
+        log = AnalysisLog(self.directory)
+        log.append(self._record("A1"))
+        log.append(self._record("A2"))
+        segment = os.path.join(self.directory, "segment-00000001.log")
+        size = os.path.getsize(segment)
+        with open(segment, "ab") as f:
+            # A crash after writing half of a third record
+            f.write(HEADER.pack(0, 0, 100, 2, 4) + b'A3PAT1{"id"')
+
+        reopened = AnalysisLog(self.directory)
+        self.assertEqual(
+            sorted(record["id"] for record in reopened.scan()), ["A1", "A2"]
+        )
+        self.assertEqual(os.path.getsize(segment), size)
+        reopened.append(self._record("A3"))
+        self.assertEqual(self._notes(AnalysisLog(self.directory))["A3"], "notes")
+
+    def test_corrupt_tail_record_is_dropped(self):
+        log = AnalysisLog(self.directory)
+        log.append(self._record("A1"))
+        log.append(self._record("A2", notes="original"))
+        segment = os.path.join(self.directory, "segment-00000001.log")
+        with open(segment, "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b"xxx")
+        self.assertEqual(
+            [record["id"] for record in AnalysisLog(self.directory).scan()], ["A1"]
+        )
+
+    def test_tombstones_survive_compaction(self):
+        log = AnalysisLog(self.directory)
+        log.append(self._record("A1"))
+        log.delete("A1")
+        log.delete("SEEDED")
+        log.compact()
+        reopened = AnalysisLog(self.directory)
+        self.assertEqual(sorted(reopened.deleted_ids()), ["A1", "SEEDED"])
+        self.assertNotIn("A1", reopened)
+
+    def test_sees_writes_and_compaction_of_another_instance(self):
+        first = AnalysisLog(self.directory)
+        second = AnalysisLog(self.directory)
+        first.append(self._record("A1", notes="v1"))
+        first.append(self._record("A1", notes="v2"))
+        self.assertEqual(self._notes(second), {"A1": "v2"})
+        second.compact()
+        self.assertEqual(self._notes(first), {"A1": "v2"})
+        first.append(self._record("A2"))
+        self.assertEqual(sorted(record["id"] for record in second.scan()), ["A1", "A2"])
+
+    def test_deleted_seed_analysis_stays_deleted_after_store_rebuild(self):
+        analysis_id = triz_service.PATENT_ANALYSES[0]["id"]
+        self.assertTrue(triz_service.delete_analysis(analysis_id))
+
+        triz_service.reset_service_state()
+        os.remove(triz_service.STORE_PATH)
+        self.assertIsNone(triz_service.get_analysis_by_id(analysis_id))
+
+
+class PrincipleCooccurrenceTests(TrizServiceTestCase):
+    """The service's model over the matrix and its own stored analyses"""
+
+    def _count(self, first, second):
+        related = triz_service.get_principle_cooccurrence().related(first, 40)
+        return {entry["principle"]: entry["count"] for entry in related}.get(second, 0)
+
+    def _expected(self, first, second):
+        bits = triz_service.get_matrix_engine().principle_bits()
+        cells = bits[..., 1:].reshape(-1, 40)
+        matrix = sum(bool(row[first - 1] and row[second - 1]) for row in cells)
+        analyses = sum(
+            first in numbers and second in numbers
+            for analysis in triz_service.get_all_analyses()
+            for numbers in analysis_principle_sets(analysis.get("extracted_data"))
+        )
+        return matrix + analyses
+
+    def test_counts_matrix_and_stored_analyses(self):
+        self.assertGreater(self._expected(15, 35), 0)
+        self.assertEqual(self._count(15, 35), self._expected(15, 35))
+
+    def test_follows_stored_and_deleted_analyses(self):
+        before = self._count(11, 12)
+        analysis = dict(
+            triz_service.PATENT_ANALYSES[0],
+            id="ANA-NEW",
+            extracted_data=json.dumps(
+                {"triz_contradictions": [{"principles": ["11", "12"]}]}
+            ),
+        )
+        self.assertTrue(triz_service.store_analysis(analysis))
+        self.assertEqual(self._count(11, 12), before + 1)
+        self.assertTrue(triz_service.delete_analysis("ANA-NEW"))
+        self.assertEqual(self._count(11, 12), before)
@@ -0,0 +1,314 @@
+"""
+Compact binary format for the TRIZ reference data.
+
+``create_triz_data.py`` writes ``triz.bin`` next to the JSON files. The file is
+loaded through ``mmap`` so every worker process shares the same pages and the
+matrix is used in place as a NumPy array without any parsing. Strings are only
+decoded when they are accessed.
+
+Layout (all integers little-endian, sections padded to 8 bytes):
+
+    header      magic "TRIZ", format version, flags, principle count,
+                parameter count, payload size, CRC32 of the payload
+    matrix      uint64[40 * 40] principle bitmasks, see matrix_engine
+    cells       uint32 length, uint16[length] of the matrix.json cells in file
+                order, each as improving, worsening, count, principles...
+    principles  uint16[count] numbers, string table of name/description/examples
+    parameters  uint16[count] numbers, string table of names
+
+A string table is ``uint32[n + 1]`` offsets followed by a UTF-8 blob.
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from .matrix_engine import MATRIX_SHAPE, ContradictionMatrixEngine
+
+MAGIC = b"TRIZ"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHHIIQII")
+BINARY_FILENAME = "triz.bin"
+
+# Separates principle examples inside a single string table entry
+EXAMPLE_SEPARATOR = "\x1f"
+
+
+def _pad(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 8)
+
+
+def _string_table(strings: List[str]) -> bytes:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    return _pad(offsets.tobytes() + b"".join(encoded))
+
+
+def _ordered_cells(matrix: Dict[Any, Dict[Any, List[Any]]]) -> bytes:
+    values = []
+    for improving, row in matrix.items():
+        for worsening, principles in row.items():
+            values += [int(improving), int(worsening), len(principles)]
+            values += [int(p) for p in principles]
+    data = np.array(values, dtype="<u2").tobytes()
+    return _pad(struct.pack("<I", len(values)) + data)
+
+
+def encode_triz_binary(
+    principles: Dict[Any, Dict[str, Any]],
+    parameters: Dict[Any, str],
+    matrix: Dict[Any, Dict[Any, List[Any]]],
+) -> bytes:
+    """
+    Encode the TRIZ reference data into the binary format.
+
+    Args:
+        principles: Principles keyed by number, as in principles.json
+        parameters: Parameter names keyed by number, as in parameters.json
+        matrix: Nested contradiction matrix, as in matrix.json
+
+    Returns:
+        The encoded file contents
+    """
+    principle_numbers = sorted(int(n) for n in principles)
+    parameter_numbers = sorted(int(n) for n in parameters)
+    principles = {int(n): p for n, p in principles.items()}
+    parameters = {int(n): p for n, p in parameters.items()}
+
+    principle_strings = []
+    for number in principle_numbers:
+        principle = principles[number]
+        examples = principle.get("examples", [])
+        if isinstance(examples, str):
+            examples = [examples]
+        principle_strings += [
+            principle.get("name", ""),
+            principle.get("description", ""),
+            EXAMPLE_SEPARATOR.join(examples),
+        ]
+
+    cells = ContradictionMatrixEngine.from_dict(matrix).cells
+    payload = b"".join(
+        [
+            cells.astype("<u8").tobytes(),
+            _ordered_cells(matrix),
+            _pad(np.array(principle_numbers, dtype="<u2").tobytes()),
+            _string_table(principle_strings),
+            _pad(np.array(parameter_numbers, dtype="<u2").tobytes()),
+            _string_table([parameters[n] for n in parameter_numbers]),
+        ]
+    )
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        len(principle_numbers),
+        len(parameter_numbers),
+        len(payload),
+        zlib.crc32(payload),
+        0,
+    )
+    return header + payload
+
+
+def write_triz_binary(
+    path: str,
+    principles: Dict[Any, Dict[str, Any]],
+    parameters: Dict[Any, str],
+    matrix: Dict[Any, Dict[Any, List[Any]]],
+) -> str:
+    """
+    Write the binary reference data file.
+
+    The file is written to a temporary path and renamed into place so workers
+    that still have the previous version mapped keep reading valid pages.
+
+    Returns:
+        The path that was written
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_triz_binary(principles, parameters, matrix))
+    os.replace(tmp_path, path)
+    return path
+
+
+class TrizBinaryData:
+    """
+    Read-only view over an encoded TRIZ reference data buffer.
+
+    Args:
+        buffer: The encoded data, typically an ``mmap`` of ``triz.bin``
+        verify: Validate the payload checksum before use
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], verify: bool = True):
+        if len(buffer) < HEADER.size:
+            raise ValueError("TRIZ binary data is truncated")
+        (
+            magic,
+            version,
+            _flags,
+            principle_count,
+            parameter_count,
+            payload_size,
+            checksum,
+            _reserved,
+        ) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a TRIZ binary data file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported TRIZ binary format version: {version}")
+        if len(buffer) != HEADER.size + payload_size:
+            raise ValueError("TRIZ binary data is truncated")
+        if verify and zlib.crc32(memoryview(buffer)[HEADER.size :]) != checksum:
+            raise ValueError("TRIZ binary data checksum mismatch")
+
+        self._buffer = buffer
+        offset = HEADER.size
+
+        cell_count = MATRIX_SHAPE[0] * MATRIX_SHAPE[1]
+        self._cells = np.frombuffer(
+            buffer, dtype="<u8", count=cell_count, offset=offset
+        ).reshape(MATRIX_SHAPE)
+        offset += cell_count * 8
+
+        (length,) = struct.unpack_from("<I", buffer, offset)
+        self._ordered_cells = np.frombuffer(
+            buffer, dtype="<u2", count=length, offset=offset + 4
+        )
+        offset += 4 + length * 2 + (-(4 + length * 2) % 8)
+
+        self._principle_numbers, offset = self._read_numbers(principle_count, offset)
+        self._principle_strings, offset = self._read_table(principle_count * 3, offset)
+        self._parameter_numbers, offset = self._read_numbers(parameter_count, offset)
+        self._parameter_strings, offset = self._read_table(parameter_count, offset)
+
+        self._principle_index = {
+            int(n): i for i, n in enumerate(self._principle_numbers)
+        }
+        self._parameter_index = {
+            int(n): i for i, n in enumerate(self._parameter_numbers)
+        }
+
+    def _read_numbers(self, count: int, offset: int):
+        numbers = np.frombuffer(self._buffer, dtype="<u2", count=count, offset=offset)
+        return numbers, offset + count * 2 + (-count * 2 % 8)
+
+    def _read_table(self, count: int, offset: int):
+        offsets = np.frombuffer(
+            self._buffer, dtype="<u4", count=count + 1, offset=offset
+        )
+        blob_start = offset + (count + 1) * 4
+        size = (count + 1) * 4 + int(offsets[-1])
+        return (offsets, blob_start), offset + size + (-size % 8)
+
+    def _string(self, table, index: int) -> str:
+        offsets, blob_start = table
+        start = blob_start + int(offsets[index])
+        end = blob_start + int(offsets[index + 1])
+        return bytes(self._buffer[start:end]).decode("utf-8")
+
+    def engine(self) -> ContradictionMatrixEngine:
+        """Contradiction matrix engine backed directly by the buffer."""
+        cells = self._cells
+        if cells.dtype != np.uint64:
+            # Big-endian hosts need a native copy
+            cells = cells.astype(np.uint64)
+        return ContradictionMatrixEngine(cells)
+
+    def principle(self, number: Any) -> Optional[Dict[str, Any]]:
+        """Get a single principle in the principles.json shape."""
+        index = self._principle_index.get(int(number))
+        if index is None:
+            return None
+        name, description, examples = (
+            self._string(self._principle_strings, index * 3 + i) for i in range(3)
+        )
+        return {
+            "name": name,
+            "description": description,
+            "examples": examples.split(EXAMPLE_SEPARATOR) if examples else [],
+        }
+
+    def parameter(self, number: Any) -> Optional[str]:
+        """Get a single engineering parameter name."""
+        index = self._parameter_index.get(int(number))
+        if index is None:
+            return None
+        return self._string(self._parameter_strings, index)
+
+    def principles(self) -> Dict[str, Dict[str, Any]]:
+        """All principles keyed by string number, as in principles.json."""
+        return {str(n): self.principle(n) for n in self._principle_index}
+
+    def parameters(self) -> Dict[str, str]:
+        """All parameter names keyed by string number, as in parameters.json."""
+        return {str(n): self.parameter(n) for n in self._parameter_index}
+
+    def matrix(self) -> Dict[str, Dict[str, List[int]]]:
+        """Nested matrix as in matrix.json, with its cell and principle order."""
+        values = self._ordered_cells.tolist()
+        matrix: Dict[str, Dict[str, List[int]]] = {}
+        i = 0
+        while i < len(values):
+            improving, worsening, count = values[i : i + 3]
+            matrix.setdefault(str(improving), {})[str(worsening)] = values[
+                i + 3 : i + 3 + count
+            ]
+            i += 3 + count
+        return matrix
+
+
+def open_triz_binary(path: str, verify: bool = True) -> TrizBinaryData:
+    """
+    Memory-map a binary reference data file.
+
+    Args:
+        path: Path to the triz.bin file
+        verify: Validate the payload checksum before use
+
+    Returns:
+        TrizBinaryData over the mapped file
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return TrizBinaryData(buffer, verify=verify)
+
+
+def load_triz_reference_data(data_dir: str, verify: bool = True) -> TrizBinaryData:
+    """
+    Load the TRIZ reference data, preferring the binary file.
+
+    Falls back to principles.json, parameters.json and matrix.json when the
+    binary file is missing, from an unsupported version or fails validation.
+
+    Args:
+        data_dir: Directory containing the TRIZ data files
+        verify: Validate the binary checksum before use
+
+    Returns:
+        TrizBinaryData over the mapped file or over data encoded from JSON
+    """
+    try:
+        return open_triz_binary(os.path.join(data_dir, BINARY_FILENAME), verify)
+    except FileNotFoundError:
+        # Not generated yet, as in a fresh checkout; the JSON files are the source
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Falling back to JSON TRIZ data: {str(e)}")
+
+    data = {}
+    for name in ("principles", "parameters", "matrix"):
+        with open(os.path.join(data_dir, f"{name}.json")) as f:
+            data[name] = json.load(f)
+    return TrizBinaryData(
+        encode_triz_binary(data["principles"], data["parameters"], data["matrix"]),
+        verify=False,
+    )
@@ -6,15 +6,30 @@ import os
 import json
 import uuid
 import datetime
+import functools
 import random
 import shutil
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 from .triz_constants import (
-    TRIZ_PRINCIPLES,
-    ENGINEERING_PARAMETERS,
     CONTRADICTION_MATRIX,
+    TRIZ_PRINCIPLES as PRINCIPLE_DEFINITIONS,
 )
+from .contradiction_solver import solve_contradiction
+from .cooccurrence import PrincipleCooccurrence, analysis_principle_sets
+from .matrix_engine import ContradictionMatrixEngine
+from .analysis_log import AnalysisLog
+from .pagination import (
+    DEFAULT_PAGE_SIZE,
+    check_fields,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    project,
+)
+from .search_index import DEFAULT_FIELD_WEIGHTS, PatentSearchIndex
+from .store import ANALYSIS_COLUMNS, PATENT_COLUMNS, TrizStore
+from .triz_binary import TrizBinaryData, load_triz_reference_data
 
 # Define directories for data
 PATENT_DIR = os.path.join(
@@ -40,9 +55,6 @@ os.makedirs(TRIZ_DATA_DIR, exist_ok=True)
 
 # Import mock data
 from data.mock_data import (
-    TRIZ_PRINCIPLES,
-    ENGINEERING_PARAMETERS,
-    TRIZ_MATRIX,
     PATENTS,
     PATENT_ANALYSES,
     PATENT_CITATIONS,
@@ -57,7 +69,9 @@ def get_triz_principles() -> Dict[str, Dict[str, Any]]:
     Returns:
         Dictionary of TRIZ principles with principle ID as key.
     """
-    return TRIZ_PRINCIPLES
+    if "principles" not in _reference_views:
+        _reference_views["principles"] = get_reference_data().principles()
+    return _reference_views["principles"]
 
 
 def get_engineering_parameters() -> Dict[str, str]:
@@ -67,7 +81,9 @@ def get_engineering_parameters() -> Dict[str, str]:
     Returns:
         Dictionary of engineering parameters with parameter ID as key.
     """
-    return ENGINEERING_PARAMETERS
+    if "parameters" not in _reference_views:
+        _reference_views["parameters"] = get_reference_data().parameters()
+    return _reference_views["parameters"]
 
 
 def get_triz_matrix() -> Dict[str, Dict[str, List[str]]]:
@@ -77,7 +93,411 @@ def get_triz_matrix() -> Dict[str, Dict[str, List[str]]]:
     Returns:
         Dictionary representation of the TRIZ matrix.
     """
-    return TRIZ_MATRIX
+    if "matrix" not in _reference_views:
+        _reference_views["matrix"] = {
+            improving: {
+                worsening: [str(principle) for principle in principles]
+                for worsening, principles in row.items()
+            }
+            for improving, row in get_reference_data().matrix().items()
+        }
+    return _reference_views["matrix"]
+
+
+_matrix_engine: Optional[ContradictionMatrixEngine] = None
+_reference_data: Optional[TrizBinaryData] = None
+
+# Dictionaries decoded from the reference data, built once per process
+_reference_views: Dict[str, Any] = {}
+
+
+def get_reference_data() -> TrizBinaryData:
+    """
+    Get the TRIZ reference data from data/triz.
+
+    The memory-mapped triz.bin is used when present, falling back to the JSON
+    files otherwise.
+
+    Returns:
+        TrizBinaryData with principles, parameters and the matrix engine
+    """
+    global _reference_data
+    if _reference_data is None:
+        _reference_data = load_triz_reference_data(TRIZ_DATA_DIR)
+    return _reference_data
+
+
+def get_matrix_engine() -> ContradictionMatrixEngine:
+    """
+    Get the bitmask-backed engine for the TRIZ contradiction matrix.
+
+    Returns:
+        ContradictionMatrixEngine over the reference data, see get_triz_matrix
+    """
+    global _matrix_engine
+    if _matrix_engine is None:
+        _matrix_engine = get_reference_data().engine()
+    return _matrix_engine
+
+
+def _matrix_cells(cells: List[tuple]) -> List[Dict[str, Any]]:
+    """Convert (improving, worsening) pairs to TRIZ_MATRIX-style cell dictionaries"""
+    index = get_matrix_engine().reverse_index
+    return [
+        {
+            "improving": str(improving),
+            "worsening": str(worsening),
+            "principles": [str(p) for p in index.principles(improving, worsening)],
+        }
+        for improving, worsening in cells
+    ]
+
+
+def find_matrix_cells(principles: List[str]) -> List[Dict[str, Any]]:
+    """
+    Find the contradiction matrix cells that recommend all given principles.
+
+    Args:
+        principles: Principle numbers that must all be recommended
+
+    Returns:
+        List of cell dictionaries with improving/worsening parameters and principles
+    """
+    return _matrix_cells(get_matrix_engine().cells_with_principles(principles))
+
+
+def get_principle_contradictions(principle_id: str) -> List[Dict[str, Any]]:
+    """
+    Get the contradictions a principle resolves, from the reverse index.
+
+    Args:
+        principle_id: The principle number
+
+    Returns:
+        List of cell dictionaries recommending the principle
+    """
+    index = get_matrix_engine().reverse_index
+    return _matrix_cells(index.cells_for_principle(principle_id))
+
+
+def get_principle_pair_contradictions(
+    first_id: str, second_id: str
+) -> List[Dict[str, Any]]:
+    """
+    Get the contradictions where two principles are recommended together.
+
+    Args:
+        first_id: The first principle number
+        second_id: The second principle number
+
+    Returns:
+        List of cell dictionaries recommending both principles
+    """
+    index = get_matrix_engine().reverse_index
+    return _matrix_cells(index.cells_for_principle_pair(first_id, second_id))
+
+
+def get_parameter_contradictions(parameter_id: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the matrix row and column of a parameter, from the reverse index.
+
+    Args:
+        parameter_id: The parameter number
+
+    Returns:
+        Dictionary with "improving" cells (the parameter's row) and "worsening"
+        cells (its column), each ordered by number of principles
+    """
+    index = get_matrix_engine().reverse_index
+    return {
+        "improving": _matrix_cells(index.improving_cells(parameter_id)),
+        "worsening": _matrix_cells(index.worsening_cells(parameter_id)),
+    }
+
+
+_constants_engine: Optional[ContradictionMatrixEngine] = None
+
+
+def what_if_contradiction(
+    parameter_id: str,
+    role: str = "improving",
+    source: str = "reference",
+    limit: Optional[int] = None,
+    max_principles: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Explore a parameter's whole matrix row or column.
+
+    Args:
+        parameter_id: The parameter number
+        role: "improving" to scan its row, "worsening" to scan its column
+        source: "reference" for the data/triz files, "constants" for
+            triz_constants.CONTRADICTION_MATRIX
+        limit: Maximum number of opposite parameters to return
+        max_principles: Maximum number of principles in the selected cover
+
+    Returns:
+        Ranked opposite parameters, principle coverage and a set-cover
+        selection of principles, see contradiction_solver.solve_contradiction
+    """
+    global _constants_engine
+    if source == "reference":
+        engine = get_matrix_engine()
+    elif source == "constants":
+        if _constants_engine is None:
+            _constants_engine = ContradictionMatrixEngine.from_dict(CONTRADICTION_MATRIX)
+        engine = _constants_engine
+    else:
+        raise ValueError("Source must be 'reference' or 'constants'")
+
+    return solve_contradiction(engine, parameter_id, role, limit, max_principles)
+
+
+_principle_cooccurrence: Optional[PrincipleCooccurrence] = None
+
+def iter_analysis_principle_sets():
+    """
+    Iterate over the principle sets of every stored analysis.
+
+    Yields:
+        ``(analysis id, principle sets)`` pairs, see analysis_principle_sets
+    """
+    for analysis in get_store().iter_analyses(("id", "extracted_data")):
+        yield analysis["id"], analysis_principle_sets(analysis.get("extracted_data"))
+
+
+def get_principle_cooccurrence() -> PrincipleCooccurrence:
+    """
+    Get the principle co-occurrence matrix built from the contradiction matrix
+    and the stored analyses, the mock ones included. It is kept up to date by
+    store_analysis, update_analysis and delete_analysis.
+
+    Returns:
+        PrincipleCooccurrence instance
+    """
+    global _principle_cooccurrence
+    if _principle_cooccurrence is None:
+        cooccurrence = PrincipleCooccurrence.from_matrix(get_matrix_engine())
+        for analysis_id, principle_sets in iter_analysis_principle_sets():
+            cooccurrence.update(analysis_id, principle_sets)
+        _principle_cooccurrence = cooccurrence
+    return _principle_cooccurrence
+
+
+def get_related_principles(principle_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Get the principles most often used together with a principle.
+
+    Args:
+        principle_id: The principle number
+        limit: Maximum number of principles to return
+
+    Returns:
+        List of dictionaries with principle ID, name and co-occurrence count
+    """
+    related = get_principle_cooccurrence().related(principle_id, limit)
+    return [
+        {
+            "id": str(entry["principle"]),
+            "name": (
+                get_triz_principles().get(str(entry["principle"]))
+                or PRINCIPLE_DEFINITIONS.get(entry["principle"], {})
+            ).get("name"),
+            "count": entry["count"],
+        }
+        for entry in related
+    ]
+
+
+# Patents, analyses and citations are kept in a SQLite store next to the other
+# data directories; a new database is seeded with the mock records
+STORE_PATH = os.environ.get(
+    "TRIZ_STORE_PATH",
+    os.path.join(os.path.dirname(ANALYSES_DIR), "triz_service.sqlite3"),
+)
+
+# Every stored, updated or deleted analysis is also appended to this log, from
+# which a new store database recovers its analyses
+ANALYSIS_LOG_DIR = os.path.join(ANALYSES_DIR, "log")
+
+_store: Optional[TrizStore] = None
+_analysis_log: Optional[AnalysisLog] = None
+_patent_search_index: Optional[PatentSearchIndex] = None
+
+# Patent columns the search index needs
+_SEARCH_COLUMNS = ("id",) + tuple(DEFAULT_FIELD_WEIGHTS)
+
+
+def get_store() -> TrizStore:
+    """
+    Get the record store, creating and seeding the database on first use.
+
+    Returns:
+        TrizStore for STORE_PATH
+    """
+    global _store
+    if _store is None:
+        store = TrizStore(STORE_PATH)
+        log = get_analysis_log()
+        if store.seed(PATENTS, PATENT_ANALYSES, PATENT_CITATIONS):
+            store.upsert_analyses(log.scan())
+            # Seeded mock analyses that were deleted before the rebuild
+            for analysis_id in log.deleted_ids():
+                store.delete_analysis(analysis_id)
+        # Analyses saved as loose JSON files by older versions
+        store.upsert_analyses(log.import_json_files(ANALYSES_DIR))
+        _store = store
+    return _store
+
+
+def get_analysis_log() -> AnalysisLog:
+    """
+    Get the append-only analysis log.
+
+    Returns:
+        AnalysisLog in ANALYSIS_LOG_DIR
+    """
+    global _analysis_log
+    if _analysis_log is None:
+        _analysis_log = AnalysisLog(ANALYSIS_LOG_DIR)
+    return _analysis_log
+
+
+def get_patent_search_index() -> PatentSearchIndex:
+    """
+    Get the patent search index, built from the store on first use and kept
+    up to date by upload_patent.
+
+    Returns:
+        PatentSearchIndex over every stored patent
+    """
+    global _patent_search_index
+    if _patent_search_index is None:
+        index = PatentSearchIndex()
+        for patent in get_store().iter_patents(_SEARCH_COLUMNS):
+            index.add(patent["id"], patent)
+        _patent_search_index = index
+    return _patent_search_index
+
+
+def reset_service_state() -> None:
+    """
+    Close the store and forget it, the analysis log and the indexes built from
+    them, so the next call opens STORE_PATH and ANALYSIS_LOG_DIR afresh.
+    """
+    global _store, _analysis_log, _patent_search_index, _principle_cooccurrence
+    if _store is not None:
+        _store.close()
+    _store = None
+    _analysis_log = None
+    _patent_search_index = None
+    _principle_cooccurrence = None
+
+
+# JSON columns of analyses, parsed through a bounded cache keyed by the stored
+# string, so an edited row (from this or another process) is parsed afresh and
+# only the most recently read values stay in memory
+_ANALYSIS_JSON_COLUMNS = ("extracted_data", "user_feedback")
+ANALYSIS_JSON_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=ANALYSIS_JSON_CACHE_SIZE)
+def _parsed_json(raw: str) -> Any:
+    """The parsed form of a stored JSON column, shared between callers"""
+    return json.loads(raw)
+
+
+def _serialize_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the JSON-ready form of a stored analysis.
+
+    extracted_data and user_feedback come from the parse cache and are shared
+    between calls, so callers must treat them as read-only.
+    """
+    result = dict(analysis)
+    for column in _ANALYSIS_JSON_COLUMNS:
+        if result.get(column):
+            result[column] = _parsed_json(result[column])
+    return result
+
+
+# Heavy fields left out of list responses unless requested with ``fields=``
+PATENT_LIST_EXCLUDE = ("raw_text",)
+
+
+def _keyset_after(cursor: Optional[str]) -> Optional[List[str]]:
+    """Decode a (date, id) cursor for keyset pagination in the store"""
+    if not cursor:
+        return None
+    after = decode_cursor(cursor)
+    if len(after) != 2 or not all(isinstance(value, str) for value in after):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def _keyset_page(
+    rows: List[Dict[str, Any]], limit: Optional[int], date_field: str
+) -> tuple:
+    """Trim the extra row fetched to detect a next page and build its cursor"""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor((rows[-1][date_field], rows[-1]["id"]))
+
+
+def _query_patents(
+    search_term: str = "",
+    status_filter: List[str] = None,
+    sort_order: str = "newest",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+) -> tuple:
+    """
+    Filter, sort and paginate patents.
+
+    Without a search term the page comes straight from the store's
+    (upload_date, id) index. With one, only the matching patents' dates and
+    statuses are loaded to order them, then the page's rows are fetched.
+
+    Returns:
+        Tuple of (patent rows, cursor for the next page or None, total count)
+    """
+    store = get_store()
+    descending = sort_order != "oldest"
+
+    if not (search_term and search_term.strip()):
+        rows = store.list_patents(
+            status_filter,
+            descending,
+            _keyset_after(cursor),
+            None if limit is None else limit + 1,
+            columns,
+        )
+        rows, next_cursor = _keyset_page(rows, limit, "upload_date")
+        return rows, next_cursor, store.count_patents(status_filter)
+
+    scores = dict(get_patent_search_index().search(search_term))
+    candidates = list(
+        store.get_patents(scores, ("id", "upload_date", "status")).values()
+    )
+
+    # Apply status filter if provided
+    if status_filter:
+        candidates = [p for p in candidates if p["status"] in status_filter]
+
+    # The id breaks ties so the order is total and cursors never skip records
+    def sort_key(patent):
+        key = (patent["upload_date"], patent["id"])
+        if sort_order == "relevance":
+            return (scores[patent["id"]],) + key
+        return key
+
+    page, next_cursor, count = paginate(
+        candidates, sort_key, cursor, limit, descending=descending
+    )
+    rows = store.get_patents([p["id"] for p in page], columns)
+    return [rows[p["id"]] for p in page if p["id"] in rows], next_cursor, count
 
 
 def get_all_patents(
@@ -87,48 +507,58 @@ def get_all_patents(
     Get all patents, with optional filtering and sorting.
 
     Args:
-        search_term: Optional term to filter patents by title or content
+        search_term: Optional terms to match against title, abstract, inventor
+            and assignee; every term must match a word prefix
         status_filter: Optional list of status values to filter by
         sort_order: Sort order ('newest', 'oldest', 'relevance')
 
     Returns:
         List of patent dictionaries
     """
-    # Create a deep copy of the patents to avoid modifying the original data
-    patents = [patent.copy() for patent in PATENTS]
-
-    # Apply search filter if provided
-    if search_term:
-        search_term = search_term.lower()
-        patents = [
-            patent
-            for patent in patents
-            if search_term in patent["title"].lower()
-            or search_term in patent.get("abstract", "").lower()
-            or search_term in patent.get("inventor", "").lower()
-            or search_term in patent.get("assignee", "").lower()
-        ]
+    patents, _, _ = _query_patents(search_term, status_filter, sort_order)
+    return patents
 
-    # Apply status filter if provided
-    if status_filter:
-        patents = [
-            patent for patent in patents if patent.get("status") in status_filter
-        ]
-
-    # Sort patents
-    if sort_order == "newest":
-        patents.sort(key=lambda p: p["upload_date"], reverse=True)
-    elif sort_order == "oldest":
-        patents.sort(key=lambda p: p["upload_date"])
-
-    # Convert datetime objects to strings for JSON serialization
-    for patent in patents:
-        if "filing_date" in patent and patent["filing_date"]:
-            patent["filing_date"] = serialize_datetime(patent["filing_date"])
-        if "upload_date" in patent and patent["upload_date"]:
-            patent["upload_date"] = serialize_datetime(patent["upload_date"])
 
-    return patents
+def list_patents(
+    search_term: str = "",
+    status_filter: List[str] = None,
+    sort_order: str = "newest",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Get one page of patents, with optional filtering, sorting and projection.
+
+    Args:
+        search_term: Optional terms to match against title, abstract, inventor
+            and assignee; every term must match a word prefix
+        status_filter: Optional list of status values to filter by
+        sort_order: Sort order ('newest', 'oldest', 'relevance')
+        cursor: Cursor returned with the previous page
+        limit: Maximum number of patents in the page
+        fields: Fields to return; defaults to everything except raw_text.
+            Unknown field names raise ValueError
+
+    Returns:
+        Dictionary with the page of "patents", the total "count" and the
+        "next_cursor" (None on the last page)
+    """
+    check_fields(fields, PATENT_COLUMNS)
+    # Only the projected columns are read, plus the pagination key
+    if fields is None:
+        columns = [c for c in PATENT_COLUMNS if c not in PATENT_LIST_EXCLUDE]
+    else:
+        columns = list(fields) + ["id", "upload_date"]
+
+    patents, next_cursor, count = _query_patents(
+        search_term, status_filter, sort_order, cursor, limit, columns
+    )
+    return {
+        "patents": [project(p, fields, PATENT_LIST_EXCLUDE) for p in patents],
+        "count": count,
+        "next_cursor": next_cursor,
+    }
 
 
 def get_patent_by_id(patent_id: str) -> Optional[Dict[str, Any]]:
@@ -141,19 +571,7 @@ def get_patent_by_id(patent_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Patent dictionary or None if not found
     """
-    for patent in PATENTS:
-        if patent["id"] == patent_id:
-            result = patent.copy()
-
-            # Convert datetime objects to strings for JSON serialization
-            if "filing_date" in result and result["filing_date"]:
-                result["filing_date"] = serialize_datetime(result["filing_date"])
-            if "upload_date" in result and result["upload_date"]:
-                result["upload_date"] = serialize_datetime(result["upload_date"])
-
-            return result
-
-    return None
+    return get_store().get_patent(patent_id)
 
 
 def get_patent_citations(patent_id: str) -> List[Dict[str, Any]]:
@@ -166,18 +584,7 @@ def get_patent_citations(patent_id: str) -> List[Dict[str, Any]]:
     Returns:
         List of citation dictionaries
     """
-    citations = [
-        citation.copy()
-        for citation in PATENT_CITATIONS
-        if citation["patent_id"] == patent_id
-    ]
-
-    # Convert datetime objects to strings for JSON serialization
-    for citation in citations:
-        if "citation_date" in citation and citation["citation_date"]:
-            citation["citation_date"] = serialize_datetime(citation["citation_date"])
-
-    return citations
+    return get_store().citations_for_patent(patent_id)
 
 
 def get_analyses_for_patent(patent_id: str) -> List[Dict[str, Any]]:
@@ -188,22 +595,10 @@ def get_analyses_for_patent(patent_id: str) -> List[Dict[str, Any]]:
         patent_id: The patent ID
 
     Returns:
-        List of analysis dictionaries
+        List of analysis dictionaries, with extracted_data and user_feedback
+        as the stored JSON strings
     """
-    analyses = [
-        analysis.copy()
-        for analysis in PATENT_ANALYSES
-        if analysis["patent_id"] == patent_id
-    ]
-
-    # Convert datetime objects to strings for JSON serialization
-    for analysis in analyses:
-        if "analysis_date" in analysis and analysis["analysis_date"]:
-            analysis["analysis_date"] = serialize_datetime(analysis["analysis_date"])
-        if "feedback_date" in analysis and analysis["feedback_date"]:
-            analysis["feedback_date"] = serialize_datetime(analysis["feedback_date"])
-
-    return analyses
+    return get_store().list_analyses(patent_id)
 
 
 def get_all_analyses() -> List[Dict[str, Any]]:
@@ -211,24 +606,45 @@ def get_all_analyses() -> List[Dict[str, Any]]:
     Get all patent analyses.
 
     Returns:
-        List of analysis dictionaries
+        List of analysis dictionaries, whose parsed extracted_data and
+        user_feedback are shared and must not be modified
     """
-    analyses = [analysis.copy() for analysis in PATENT_ANALYSES]
+    return [_serialize_analysis(a) for a in get_store().list_analyses()]
 
-    # Convert datetime objects to strings for JSON serialization
-    for analysis in analyses:
-        if "analysis_date" in analysis and analysis["analysis_date"]:
-            analysis["analysis_date"] = serialize_datetime(analysis["analysis_date"])
-        if "feedback_date" in analysis and analysis["feedback_date"]:
-            analysis["feedback_date"] = serialize_datetime(analysis["feedback_date"])
 
-        # Parse the JSON strings to dictionaries
-        if "extracted_data" in analysis and analysis["extracted_data"]:
-            analysis["extracted_data"] = json.loads(analysis["extracted_data"])
-        if "user_feedback" in analysis and analysis["user_feedback"]:
-            analysis["user_feedback"] = json.loads(analysis["user_feedback"])
+def list_analyses(
+    patent_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Get one page of analyses, newest first.
 
-    return analyses
+    Args:
+        patent_id: Optional patent ID to restrict the analyses to
+        cursor: Cursor returned with the previous page
+        limit: Maximum number of analyses in the page
+        fields: Fields to return; defaults to every field. Unknown field
+            names raise ValueError
+
+    Returns:
+        Dictionary with the page of "analyses", the total "count" and the
+        "next_cursor" (None on the last page). Parsed extracted_data and
+        user_feedback values are shared and must not be modified
+    """
+    check_fields(fields, ANALYSIS_COLUMNS)
+    store = get_store()
+    columns = None if fields is None else list(fields) + ["id", "analysis_date"]
+    analyses = store.list_analyses(
+        patent_id, _keyset_after(cursor), limit + 1, columns
+    )
+    analyses, next_cursor = _keyset_page(analyses, limit, "analysis_date")
+    return {
+        "analyses": [project(_serialize_analysis(a), fields) for a in analyses],
+        "count": store.count_analyses(patent_id),
+        "next_cursor": next_cursor,
+    }
 
 
 def get_analysis_by_id(analysis_id: str) -> Optional[Dict[str, Any]]:
@@ -239,27 +655,14 @@ def get_analysis_by_id(analysis_id: str) -> Optional[Dict[str, Any]]:
         analysis_id: The analysis ID
 
     Returns:
-        Analysis dictionary or None if not found
+        Analysis dictionary or None if not found. Its parsed extracted_data
+        and user_feedback are shared and must not be modified
     """
-    for analysis in PATENT_ANALYSES:
-        if analysis["id"] == analysis_id:
-            result = analysis.copy()
-
-            # Convert datetime objects to strings for JSON serialization
-            if "analysis_date" in result and result["analysis_date"]:
-                result["analysis_date"] = serialize_datetime(result["analysis_date"])
-            if "feedback_date" in result and result["feedback_date"]:
-                result["feedback_date"] = serialize_datetime(result["feedback_date"])
-
-            # Parse the JSON strings to dictionaries
-            if "extracted_data" in result and result["extracted_data"]:
-                result["extracted_data"] = json.loads(result["extracted_data"])
-            if "user_feedback" in result and result["user_feedback"]:
-                result["user_feedback"] = json.loads(result["user_feedback"])
-
-            return result
+    analysis = get_store().get_analysis(analysis_id)
+    if analysis is None:
+        return None
 
-    return None
+    return _serialize_analysis(analysis)
 
 
 def analyze_patent(patent_filename: str) -> Dict[str, Any]:
@@ -273,11 +676,7 @@ def analyze_patent(patent_filename: str) -> Dict[str, Any]:
         Analysis result dictionary
     """
     # Find the patent by filename
-    patent = None
-    for p in PATENTS:
-        if p["filename"] == patent_filename:
-            patent = p
-            break
+    patent = get_store().get_patent_by_filename(patent_filename)
 
     if not patent:
         raise ValueError(f"Patent with filename {patent_filename} not found")
@@ -337,22 +736,21 @@ def update_analysis(
     Returns:
         Updated analysis dictionary or None if not found
     """
-    # In a real implementation, this would update the database
-    # For now, we'll just pretend to update and return the mock data
-
-    analysis = get_analysis_by_id(analysis_id)
-    if not analysis:
-        return None
-
-    # Update the fields
-    for key, value in updates.items():
-        if key in analysis:
-            analysis[key] = value
+    updates = dict(updates)
 
     # Set the feedback date if user_feedback is provided
     if "user_feedback" in updates:
-        analysis["feedback_date"] = serialize_datetime(datetime.datetime.now())
+        updates["feedback_date"] = serialize_datetime(datetime.datetime.now())
 
+    if not get_store().update_analysis(analysis_id, updates):
+        return None
+
+    analysis = get_analysis_by_id(analysis_id)
+    get_analysis_log().append(analysis)
+    if "extracted_data" in updates and _principle_cooccurrence is not None:
+        _principle_cooccurrence.update(
+            analysis_id, analysis_principle_sets(analysis.get("extracted_data"))
+        )
     return analysis
 
 
@@ -364,11 +762,13 @@ def delete_analysis(analysis_id: str) -> bool:
         analysis_id: The analysis ID
 
     Returns:
-        Boolean indicating success
+        True if the analysis was deleted, False if it was not found
     """
-    # In a real implementation, this would delete from the database
-    # For now, we'll just pretend it was successful
-    return True
+    deleted = get_store().delete_analysis(analysis_id)
+    get_analysis_log().delete(analysis_id)
+    if deleted and _principle_cooccurrence is not None:
+        _principle_cooccurrence.remove(analysis_id)
+    return deleted
 
 
 def approve_analysis(analysis_id: str) -> Optional[Dict[str, Any]]:
@@ -381,13 +781,12 @@ def approve_analysis(analysis_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Updated analysis dictionary or None if not found
     """
-    analysis = get_analysis_by_id(analysis_id)
-    if not analysis:
-        return None
-
     # Update the status
-    analysis["status"] = "approved"
+    if not get_store().update_analysis(analysis_id, {"status": "approved"}):
+        return None
 
+    analysis = get_analysis_by_id(analysis_id)
+    get_analysis_log().append(analysis)
     return analysis
 
 
@@ -424,10 +823,8 @@ def upload_patent(
     Returns:
         The new patent dictionary
     """
-    # In a real implementation, this would save the file and create a database entry
-    # For now, we'll just return a mock patent
-
-    patent_id = metadata.get("id", f"PAT{len(PATENTS) + 1}")
+    # In a real implementation, this would also save the file
+    patent_id = metadata.get("id", f"PAT{get_store().count_patents() + 1}")
 
     new_patent = {
         "id": patent_id,
@@ -446,6 +843,9 @@ def upload_patent(
         "is_competitor": metadata.get("is_competitor", False),
         "status": "pending",
     }
+    get_store().upsert_patent(new_patent)
+    if _patent_search_index is not None:
+        _patent_search_index.add(patent_id, new_patent)
 
     return new_patent
 
@@ -454,10 +854,13 @@ def upload_patent(
 def store_analysis(analysis: dict) -> bool:
     """Store an analysis result"""
     try:
-        # Save to a JSON file
-        analysis_file = os.path.join(ANALYSES_DIR, f"{analysis['id']}.json")
-        with open(analysis_file, "w") as f:
-            json.dump(analysis, f, indent=2)
+        get_analysis_log().append(analysis)
+        get_store().upsert_analysis(analysis)
+
+        if _principle_cooccurrence is not None:
+            _principle_cooccurrence.update(
+                analysis["id"], analysis_principle_sets(analysis.get("extracted_data"))
+            )
         return True
     except Exception as e:
         print(f"Error storing analysis: {str(e)}")
@@ -52,6 +52,14 @@ interface PatentCitation {
   citation_type: string;
 }
 
+// Cursor-paginated list response; `count` is only present with ?count=true
+interface Paginated<T> {
+  next: string | null;
+  previous: string | null;
+  count?: number;
+  results: T[];
+}
+
 interface PatentAnalysisResult {
   metadata?: {
     title?: string;
@@ -102,7 +110,7 @@ export const getContradictionPrinciples = (improving: number, worsening: number)
   api.get(`/triz/matrix/get_principles/?improving=${improving}&worsening=${worsening}`);
 
 // Get all patents
-export const getPatents = () => api.get<Patent[]>('/patents/');
+export const getPatents = () => api.get<Paginated<Patent>>('/patents/');
 export const getPatent = (id: number) => api.get<Patent>(`/patents/${id}/`);
 export const createPatent = (data: Omit<Patent, 'id'> | FormData) => {
   // If it's a FormData object, we need to handle it differently
@@ -206,7 +214,7 @@ export const uploadFileToStorage = async (file: File): Promise<string> => {
 };
 
 // Get all analyses
-export const getAnalyses = () => api.get<PatentAnalysis[]>('/analyses/');
+export const getAnalyses = () => api.get<Paginated<PatentAnalysis>>('/analyses/');
 export const getAnalysis = (id: number) => api.get<PatentAnalysis>(`/analyses/${id}/`);
 export const createAnalysis = (data: Omit<PatentAnalysis, 'id' | 'analysis_date'>) => 
   api.post<PatentAnalysis>('/analyses/', data);
@@ -215,7 +223,7 @@ export const updateAnalysis = (id: number, data: Partial<PatentAnalysis>) =>
 export const deleteAnalysis = (id: number) => api.delete(`/analyses/${id}/`);
 
 // Patent Citations
-export const getCitations = () => api.get<PatentCitation[]>('/citations/');
+export const getCitations = () => api.get<Paginated<PatentCitation>>('/citations/');
 export const getCitation = (id: number) => api.get<PatentCitation>(`/citations/${id}/`);
 export const createCitation = (data: Omit<PatentCitation, 'id'>) => 
   api.post<PatentCitation>('/citations/', data);